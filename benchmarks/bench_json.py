@@ -0,0 +1,35 @@
+"""Benchmark decoding recorded current_conditions payloads.
+
+Compares the old aiohttp ``response.json()`` path (decode to str, then stdlib
+json), stdlib json straight from bytes, and the decoder the integration uses
+(``davis.json_loads``, orjson when installed).
+
+    python benchmarks/bench_json.py --rounds 20000
+"""
+import argparse
+import json
+import timeit
+
+from common import load, recorded_payloads, report
+
+davis = load("davis")
+
+
+def main(rounds):
+    decoders = {
+        "response.json() (str + json)": lambda body: json.loads(body.decode("utf-8")),
+        "json.loads(bytes)": json.loads,
+        f"davis.json_loads ({'orjson' if davis.orjson else 'json'})": davis.json_loads,
+    }
+    for name, body in recorded_payloads().items():
+        rows = []
+        for label, decode in decoders.items():
+            seconds = min(timeit.repeat(lambda: decode(body), number=rounds, repeat=5))
+            rows.append((label, f"{seconds / rounds * 1e6:.2f} µs"))
+        report(f"{name} ({len(body)} bytes)", rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20000)
+    main(parser.parse_args().rounds)
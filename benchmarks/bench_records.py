@@ -0,0 +1,103 @@
+"""Compare raw condition dicts with the parsed __slots__ records.
+
+Measures the memory held by a batch of polls and the CPU time of one update,
+where an update resolves the state of every entity of the recorded payloads.
+
+    python benchmarks/bench_records.py --polls 1000 --updates 20000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from common import load, recorded_payloads, report
+
+models = load("models")
+sensor = load("sensor")
+coordinator = load("coordinator")
+
+LEGACY_RAIN_FACTORS = {1: 0.254, 2: 0.2, 3: 0.1, 4: 0.0254}
+
+
+def legacy_value(cond, key):
+    # The per-read conversion entities did on the raw dict before records
+    info = sensor.SENSOR_TYPES[key]
+    if key not in cond:
+        return None
+    value = cond[key]
+    if key in models.rain_count_keys:
+        return round(value * LEGACY_RAIN_FACTORS[cond.get("rain_size", 1)], 2)
+    if info["device_class"] == "temperature":
+        return round((value - 32) * 5.0 / 9.0, 1)
+    if info["device_class"] == "timestamp" and isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+    return value
+
+
+def load_conditions():
+    conditions = {}
+    for body in recorded_payloads().values():
+        conditions.update(coordinator.index_conditions(json.loads(body)))
+    return conditions
+
+
+def entity_keys(conditions):
+    return [
+        (cond_id, key)
+        for cond_id, cond in conditions.items()
+        for key in sensor.SENSOR_TYPES
+        if cond.get(key) is not None
+    ]
+
+
+def measure_memory(build, polls):
+    tracemalloc.start()
+    kept = [build() for _ in range(polls)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size / polls
+
+
+def measure_cpu(update, updates):
+    started = time.process_time()
+    for _ in range(updates):
+        update()
+    return (time.process_time() - started) / updates * 1e6
+
+
+def main(polls, updates):
+    bodies = list(recorded_payloads().values())
+    conditions = load_conditions()
+    entities = entity_keys(conditions)
+
+    def raw_poll():
+        return [json.loads(body) for body in bodies]
+
+    def record_poll():
+        return [models.parse_conditions(coordinator.index_conditions(json.loads(body))) for body in bodies]
+
+    def dict_update():
+        for cond_id, key in entities:
+            legacy_value(conditions[cond_id], key)
+
+    def record_update():
+        records = models.parse_conditions(conditions)
+        for cond_id, key in entities:
+            getattr(records[cond_id], key)
+
+    report(f"{len(conditions)} conditions, {len(entities)} entities", [
+        ("dict bytes per poll", f"{measure_memory(raw_poll, polls):.0f}"),
+        ("record bytes per poll", f"{measure_memory(record_poll, polls):.0f}"),
+        ("dict update", f"{measure_cpu(dict_update, updates):.1f} µs"),
+        ("record update (incl. parse)", f"{measure_cpu(record_update, updates):.1f} µs"),
+    ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=1000)
+    parser.add_argument("--updates", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.polls, args.updates)
@@ -0,0 +1,131 @@
+"""Drive the API, coordinator and sensor platform against many emulated stations.
+
+Starts ``emulator.py`` in a child process so its CPU time is not counted, sets
+up one coordinator and the sensor entities per station on a bare Home
+Assistant instance, then polls every station together for a number of rounds.
+Reports poll latency percentiles, CPU time per coordinator update and entity
+state writes per second for each station count.
+
+    python benchmarks/bench_scale.py --stations 1 10 100 --rounds 30
+"""
+import argparse
+import asyncio
+import multiprocessing
+import tempfile
+import time
+
+from common import create_hass, load, percentiles, report, setup_sensors
+from emulator import Emulator
+
+const = load("const")
+davis = load("davis")
+coordinator_module = load("coordinator")
+
+
+def run_emulator(connection, options):
+    async def serve():
+        emulator = Emulator(**options)
+        connection.send(await emulator.start())
+        # Block until the parent asks for the counters, then shut down
+        await asyncio.get_running_loop().run_in_executor(None, connection.recv)
+        connection.send((emulator.requests, emulator.failures))
+        await emulator.stop()
+
+    asyncio.run(serve())
+
+
+class EmulatorProcess:
+    def __init__(self, **options):
+        self._connection, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=run_emulator, args=(child, options), daemon=True)
+
+    def __enter__(self):
+        self._process.start()
+        return self._connection.recv()
+
+    def __exit__(self, *exc):
+        self._connection.send("stop")
+        self.requests, self.failures = self._connection.recv()
+        self._process.join(5)
+
+
+async def setup_station(hass, session, host, index, on_write):
+    coordinator = coordinator_module.WeatherlinkCoordinator(hass, host, session)
+    # No coalescing: the rounds run back to back and would otherwise mostly
+    # be served the previous result without touching the network
+    coordinator._api = davis.DavisWeatherlinkApi(host, session, coalesce_window=0)
+    # The harness drives every poll itself
+    coordinator.update_interval = None
+    await coordinator.async_refresh()
+    return coordinator, await setup_sensors(hass, coordinator, index, on_write)
+
+
+async def run(stations, rounds, options):
+    writes = 0
+
+    def on_write(entity):
+        nonlocal writes
+        # Resolve what the state machine would read on a write
+        entity.native_value
+        entity.native_unit_of_measurement
+        entity.extra_state_attributes
+        writes += 1
+
+    emulator = EmulatorProcess(stations=stations, **options)
+    with emulator as hosts, tempfile.TemporaryDirectory() as config_dir:
+        hass = await create_hass(config_dir)
+        session = davis.create_session(const.DEFAULT_CONNECTION_LIMIT_PER_HOST, const.DEFAULT_KEEPALIVE_TIMEOUT)
+        members = [await setup_station(hass, session, host, index, on_write) for index, host in enumerate(hosts)]
+        coordinators = [coordinator for coordinator, _ in members]
+
+        latencies = []
+        writes = 0
+        cpu = 0.0
+        wall = 0.0
+        for _ in range(rounds):
+            started_cpu = time.process_time()
+            started = time.perf_counter()
+            await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+            wall += time.perf_counter() - started
+            cpu += time.process_time() - started_cpu
+            latencies.extend(
+                coordinator.last_poll_latency for coordinator in coordinators
+                if coordinator.last_update_success and coordinator.last_poll_latency is not None
+            )
+
+        await session.close()
+        await hass.async_stop(force=True)
+
+    updates = stations * rounds
+    cuts = percentiles(latencies)
+    report(f"{stations} stations, {sum(len(e) for _, e in members)} entities, {rounds} rounds", [
+        ("poll latency p50", f"{cuts[50]:.1f} ms"),
+        ("poll latency p90", f"{cuts[90]:.1f} ms"),
+        ("poll latency p99", f"{cuts[99]:.1f} ms"),
+        ("CPU per update", f"{cpu / updates * 1e3:.2f} ms"),
+        ("entity writes", f"{writes}"),
+        ("entity writes/s", f"{writes / wall:.0f}" if wall else "0"),
+        ("failed requests", f"{emulator.failures} of {emulator.requests} requests"),
+    ])
+
+
+def main(args):
+    options = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "failure_rate": args.failure_rate,
+        "airlink_ratio": args.airlink_ratio,
+    }
+    for stations in args.stations:
+        asyncio.run(run(stations, args.rounds, options))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.0, help="emulated device latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--airlink-ratio", type=float, default=0.2)
+    main(parser.parse_args())
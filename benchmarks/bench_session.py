@@ -0,0 +1,105 @@
+"""Compare a new ClientSession per poll with the pooled keep-alive session.
+
+Starts a stub ``/v1/current_conditions`` server on localhost and polls it with
+both strategies, reporting per-poll latency and allocated memory.
+
+    python benchmarks/bench_session.py --polls 500
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+import aiohttp
+from aiohttp import web
+
+from common import load, percentiles, report
+
+PAYLOAD = {
+    "data": {
+        "did": "001D0A700002",
+        "ts": 1700000000,
+        "conditions": [
+            {"lsid": 48308, "data_structure_type": 1, "txid": 1, "temp": 62.7, "hum": 1.1},
+            {"lsid": 48307, "data_structure_type": 4, "temp_in": 78.0, "hum_in": 41.1},
+            {"lsid": 48306, "data_structure_type": 3, "bar_sea_level": 30.008, "bar_trend": None},
+        ],
+    },
+    "error": None,
+}
+
+
+async def start_stub_server():
+    served = 0
+
+    async def handler(request):
+        nonlocal served
+        served += 1
+        # A new timestamp on every response, like the device, so the pooled
+        # path cannot skip decoding on an unchanged body
+        data = {**PAYLOAD["data"], "ts": PAYLOAD["data"]["ts"] + served}
+        return web.json_response({**PAYLOAD, "data": data})
+
+    app = web.Application()
+    app.router.add_get("/v1/current_conditions", handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"127.0.0.1:{port}"
+
+
+async def poll_new_session(host):
+    # What DavisWeatherlinkApi used to do on every poll
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"http://{host}/v1/current_conditions") as response:
+            response.raise_for_status()
+            return await response.json()
+
+
+async def measure(poll, polls):
+    latencies = []
+    tracemalloc.start()
+    start_mem = tracemalloc.get_traced_memory()[0]
+    for _ in range(polls):
+        started = time.perf_counter()
+        await poll()
+        latencies.append((time.perf_counter() - started) * 1000)
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+    return latencies, current - start_mem, peak - start_mem, snapshot_blocks
+
+
+async def main(polls):
+    davis = load("davis")
+    runner, host = await start_stub_server()
+    try:
+        results = {"new session per poll": await measure(lambda: poll_new_session(host), polls)}
+
+        # No coalescing, or back to back polls time the cached result
+        api = davis.DavisWeatherlinkApi(host, davis.create_session(), coalesce_window=0)
+        try:
+            results["pooled keep-alive"] = await measure(api.async_get_current_conditions, polls)
+        finally:
+            await api.async_close()
+    finally:
+        await runner.cleanup()
+
+    for name, (latencies, retained, peak, blocks) in results.items():
+        pct = percentiles(latencies)
+        report(f"{name} ({polls} polls)", [
+            ("p50 latency", f"{pct[50]:.3f} ms"),
+            ("p90 latency", f"{pct[90]:.3f} ms"),
+            ("p99 latency", f"{pct[99]:.3f} ms"),
+            ("peak traced memory", f"{peak / 1024:.1f} KiB"),
+            ("retained memory", f"{retained / 1024:.1f} KiB"),
+            ("live allocation blocks", blocks),
+        ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=200)
+    asyncio.run(main(parser.parse_args().polls))
@@ -0,0 +1,91 @@
+"""Shared helpers for the benchmark scripts.
+
+The integration lives in a package with a dash in its name, so it cannot be
+imported with a plain import statement; ``load`` goes through importlib the
+same way Home Assistant does.
+"""
+import importlib
+import statistics
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE = "ha-weatherlink"
+
+if str(ROOT / "custom_components") not in sys.path:
+    sys.path.insert(0, str(ROOT / "custom_components"))
+
+
+def load(module):
+    return importlib.import_module(f"{PACKAGE}.{module}")
+
+
+def percentiles(samples, points=(50, 90, 99)):
+    if not samples:
+        return {p: 0.0 for p in points}
+    if len(samples) == 1:
+        return {p: samples[0] for p in points}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {p: cuts[p - 1] for p in points}
+
+
+def report(title, rows):
+    print(title)
+    width = max(len(name) for name, _ in rows)
+    for name, value in rows:
+        print(f"  {name:<{width}}  {value}")
+
+
+PAYLOADS = Path(__file__).resolve().parent / "payloads"
+
+
+def payload_bytes(name):
+    return (PAYLOADS / f"{name}.json").read_bytes()
+
+
+def recorded_payloads():
+    """Recorded current_conditions bodies of a Weatherlink Live and an AirLink."""
+    return {
+        name: payload_bytes(name)
+        for name in ("wll_current_conditions", "airlink_current_conditions")
+    }
+
+
+async def create_hass(config_dir):
+    """A bare Home Assistant instance, enough for coordinators and entities."""
+    from homeassistant.core import HomeAssistant
+    from homeassistant.util.unit_system import METRIC_SYSTEM
+
+    hass = HomeAssistant(config_dir)
+    hass.config.units = METRIC_SYSTEM
+    hass.data[load("const").DOMAIN] = {}
+    return hass
+
+
+async def setup_sensors(hass, coordinator, index, on_write):
+    """Run the sensor platform for a coordinator without a state machine.
+
+    `on_write(entity)` stands in for every state write, including those of
+    entities discovered later. Returns the (growing) list of entities.
+    """
+    const = load("const")
+    entry = SimpleNamespace(
+        entry_id=f"bench{index}",
+        data={const.CONF_HOST: coordinator.host},
+        options={},
+        async_on_unload=lambda unsub: None,
+    )
+    hass.data[const.DOMAIN][entry.entry_id] = coordinator
+    entities = []
+
+    def add_entities(new):
+        for entity in new:
+            entity.hass = hass
+            entity.entity_id = f"sensor.bench_{index}_{len(entities)}"
+            entity.async_write_ha_state = lambda entity=entity: on_write(entity)
+            coordinator.async_add_listener(entity._handle_coordinator_update)
+            entities.append(entity)
+
+    await load("sensor").async_setup_entry(hass, entry, add_entities)
+    return entities
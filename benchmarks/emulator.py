@@ -0,0 +1,312 @@
+"""Local emulator for Weatherlink Live and AirLink devices.
+
+Every emulated station listens on its own port on 127.0.0.1 and serves
+``/v1/current_conditions`` with slowly drifting ISS, Baro, Temp/Hum or AirLink
+conditions. Latency and failures are configurable. Weatherlink Live stations
+also answer ``/v1/real_time`` and then broadcast real-time packets over UDP.
+
+    python benchmarks/emulator.py --stations 10 --latency 0.05 --failure-rate 0.01
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import socket
+import time
+
+from aiohttp import web
+
+WLL = "wll"
+AIRLINK = "airlink"
+
+
+class Station:
+    """One emulated device with a random walk for every field."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, kind=WLL, seed=None):
+        self.kind = kind
+        self.index = next(self._ids)
+        self.did = f"001D0A{self.index:06X}"
+        self.rng = random.Random(seed if seed is not None else self.index)
+        self.started = time.time()
+        self.rain_daily = 0
+        self.rain_year = self.rng.randint(0, 5000)
+        self.realtime_until = 0.0
+        base = 10000 + self.index * 10
+        self.lsids = {"iss": base + 1, "baro": base + 2, "temp_hum": base + 3, "airlink": base + 4}
+
+    def _walk(self, centre, amplitude, period):
+        now = time.time()
+        return centre + amplitude * math.sin((now + self.index * 97) / period) + self.rng.uniform(-0.1, 0.1) * amplitude
+
+    def iss(self):
+        now = time.time()
+        if self.rng.random() < 0.05:
+            self.rain_daily += 1
+            self.rain_year += 1
+        wind = max(self._walk(6, 5, 40), 0)
+        temp = round(self._walk(60, 8, 3600), 1)
+        hum = round(min(max(self._walk(65, 20, 5400), 5), 100), 1)
+        return {
+            "lsid": self.lsids["iss"],
+            "data_structure_type": 1,
+            "txid": 1,
+            "temp": temp,
+            "hum": hum,
+            "dew_point": round(temp - (100 - hum) / 2.7, 1),
+            "wet_bulb": round(temp - (100 - hum) / 5, 1),
+            "heat_index": temp,
+            "wind_chill": temp,
+            "thw_index": temp,
+            "thsw_index": round(temp + 2, 1),
+            "wind_speed_last": round(wind, 2),
+            "wind_dir_last": int(self._walk(250, 40, 60)) % 360,
+            "wind_speed_avg_last_1_min": round(wind * 0.9, 2),
+            "wind_dir_scalar_avg_last_1_min": 250,
+            "wind_speed_avg_last_2_min": round(wind * 0.85, 2),
+            "wind_dir_scalar_avg_last_2_min": 250,
+            "wind_speed_hi_last_2_min": round(wind * 1.4, 2),
+            "wind_dir_at_hi_speed_last_2_min": 260,
+            "wind_speed_avg_last_10_min": round(wind * 0.8, 2),
+            "wind_dir_scalar_avg_last_10_min": 248,
+            "wind_speed_hi_last_10_min": round(wind * 1.7, 2),
+            "wind_dir_at_hi_speed_last_10_min": 262,
+            "rain_size": 1,
+            "rain_rate_last": self.rng.choice((0, 0, 0, 12)),
+            "rain_rate_hi": 0,
+            "rainfall_last_15_min": 0,
+            "rain_rate_hi_last_15_min": 0,
+            "rainfall_last_60_min": 0,
+            "rainfall_last_24_hr": self.rain_daily,
+            "rain_storm": self.rain_daily or None,
+            "rain_storm_start_at": int(self.started) if self.rain_daily else None,
+            "solar_rad": max(int(self._walk(300, 400, 7200)), 0),
+            "uv_index": round(max(self._walk(2, 3, 7200), 0), 1),
+            "rx_state": 0,
+            "trans_battery_flag": 0,
+            "rainfall_daily": self.rain_daily,
+            "rainfall_monthly": self.rain_daily,
+            "rainfall_year": self.rain_year,
+            "rain_storm_last": 12,
+            "rain_storm_last_start_at": int(now) - 86400 * 3,
+            "rain_storm_last_end_at": int(now) - 86400 * 2,
+        }
+
+    def baro(self):
+        return {
+            "lsid": self.lsids["baro"],
+            "data_structure_type": 3,
+            "bar_sea_level": round(self._walk(30.0, 0.3, 20000), 3),
+            "bar_trend": round(self._walk(0, 0.03, 3000), 3),
+            "bar_absolute": round(self._walk(29.4, 0.3, 20000), 3),
+        }
+
+    def temp_hum(self):
+        temp = round(self._walk(71, 2, 5000), 1)
+        return {
+            "lsid": self.lsids["temp_hum"],
+            "data_structure_type": 4,
+            "temp_in": temp,
+            "hum_in": round(self._walk(42, 5, 5000), 1),
+            "dew_point_in": round(temp - 25, 1),
+            "heat_index_in": temp,
+        }
+
+    def airlink(self):
+        pm = max(self._walk(8, 6, 1800), 0)
+        return {
+            "lsid": self.lsids["airlink"],
+            "data_structure_type": 6,
+            "temp": round(self._walk(64, 6, 3600), 1),
+            "hum": round(self._walk(60, 15, 5400), 1),
+            "dew_point": 51.6,
+            "wet_bulb": 55.8,
+            "heat_index": 64.3,
+            "pm_1_last": int(pm * 0.6),
+            "pm_2p5_last": int(pm),
+            "pm_10_last": int(pm * 1.5),
+            "pm_1": round(pm * 0.6, 2),
+            "pm_2p5": round(pm, 2),
+            "pm_2p5_last_1_hour": round(pm * 0.95, 2),
+            "pm_2p5_last_3_hours": round(pm * 0.9, 2),
+            "pm_2p5_last_24_hours": round(pm * 0.85, 2),
+            "pm_2p5_nowcast": round(pm * 0.97, 2),
+            "pm_10": round(pm * 1.5, 2),
+            "pm_10_last_1_hour": round(pm * 1.45, 2),
+            "pm_10_last_3_hours": round(pm * 1.4, 2),
+            "pm_10_last_24_hours": round(pm * 1.35, 2),
+            "pm_10_nowcast": round(pm * 1.47, 2),
+            "last_report_time": int(time.time()),
+            "pct_pm_data_last_1_hour": 100,
+            "pct_pm_data_last_3_hours": 100,
+            "pct_pm_data_nowcast": 100,
+            "pct_pm_data_last_24_hours": 100,
+        }
+
+    def current_conditions(self):
+        if self.kind == AIRLINK:
+            conditions = [self.airlink()]
+        else:
+            conditions = [self.iss(), self.temp_hum(), self.baro()]
+        return {"data": {"did": self.did, "ts": int(time.time()), "conditions": conditions}, "error": None}
+
+    def realtime_packet(self):
+        iss = self.iss()
+        return {
+            "did": self.did,
+            "ts": int(time.time()),
+            "conditions": [{
+                "lsid": iss["lsid"],
+                "data_structure_type": 1,
+                "txid": 1,
+                "wind_speed_last": iss["wind_speed_last"],
+                "wind_dir_last": iss["wind_dir_last"],
+                "rain_size": 1,
+                "rain_rate_last": iss["rain_rate_last"],
+                "rain_15_min": iss["rainfall_last_15_min"],
+                "rain_60_min": iss["rainfall_last_60_min"],
+                "rain_24_hr": iss["rainfall_last_24_hr"],
+                "rain_storm": iss["rain_storm"],
+                "rain_storm_start_at": iss["rain_storm_start_at"],
+                "rainfall_daily": iss["rainfall_daily"],
+                "rainfall_monthly": iss["rainfall_monthly"],
+                "rainfall_year": iss["rainfall_year"],
+                "wind_speed_hi_last_10_min": iss["wind_speed_hi_last_10_min"],
+                "wind_dir_at_hi_speed_last_10_min": iss["wind_dir_at_hi_speed_last_10_min"],
+            }],
+        }
+
+
+class Emulator:
+    """Serves a set of stations, one port per station."""
+
+    def __init__(
+        self,
+        stations: int = 1,
+        airlink_ratio: float = 0.2,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        udp_target: str | None = None,
+        udp_port: int = 22222,
+        udp_interval: float = 2.5,
+        seed: int = 0,
+    ):
+        rng = random.Random(seed)
+        self.stations = [
+            Station(AIRLINK if rng.random() < airlink_ratio else WLL, seed=seed + index)
+            for index in range(stations)
+        ]
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.udp_target = udp_target
+        self.udp_port = udp_port
+        self.udp_interval = udp_interval
+        self.hosts = []
+        self.requests = 0
+        self.failures = 0
+        self._rng = rng
+        self._runner = None
+        self._by_port = {}
+        self._udp_task = None
+        self._sock = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/v1/current_conditions", self._current_conditions)
+        app.router.add_get("/v1/real_time", self._real_time)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        for station in self.stations:
+            site = web.TCPSite(self._runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            self._by_port[port] = station
+            self.hosts.append(f"127.0.0.1:{port}")
+        if self.udp_target:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            self._udp_task = asyncio.create_task(self._broadcast())
+        return self.hosts
+
+    async def stop(self):
+        if self._udp_task is not None:
+            self._udp_task.cancel()
+        if self._sock is not None:
+            self._sock.close()
+        await self._runner.cleanup()
+
+    def _station(self, request):
+        return self._by_port[request.transport.get_extra_info("sockname")[1]]
+
+    async def _delay(self):
+        delay = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _current_conditions(self, request):
+        self.requests += 1
+        await self._delay()
+        if self._rng.random() < self.failure_rate:
+            self.failures += 1
+            return web.Response(status=503, text="busy")
+        return web.json_response(self._station(request).current_conditions())
+
+    async def _real_time(self, request):
+        station = self._station(request)
+        if station.kind != WLL:
+            return web.Response(status=404)
+        duration = int(request.query.get("duration", 1200))
+        station.realtime_until = time.monotonic() + duration
+        return web.json_response({
+            "data": {"broadcast_port": self.udp_port, "duration": duration},
+            "error": None,
+        })
+
+    async def _broadcast(self):
+        while True:
+            now = time.monotonic()
+            for station in self.stations:
+                if station.realtime_until > now:
+                    payload = json.dumps(station.realtime_packet()).encode()
+                    self._sock.sendto(payload, (self.udp_target, self.udp_port))
+            await asyncio.sleep(self.udp_interval)
+
+
+async def main(args):
+    emulator = Emulator(
+        stations=args.stations,
+        airlink_ratio=args.airlink_ratio,
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        udp_target=args.udp_target,
+        udp_port=args.udp_port,
+    )
+    hosts = await emulator.start()
+    for station, host in zip(emulator.stations, hosts):
+        print(f"{station.kind:8} {station.did}  http://{host}/v1/current_conditions")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await emulator.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=1)
+    parser.add_argument("--airlink-ratio", type=float, default=0.2)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--udp-target", help="send real-time packets to this address, e.g. 255.255.255.255")
+    parser.add_argument("--udp-port", type=int, default=22222)
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
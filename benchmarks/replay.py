@@ -0,0 +1,162 @@
+"""Replay a capture through the coordinator and sensor platform.
+
+Reads a capture made with the ``ha-weatherlink.capture`` service and feeds
+its payloads and real-time packets to coordinators on a bare Home Assistant
+instance, keeping the recorded spacing divided by ``--speed``. With
+``--stations N`` every document is fanned out to N synthetic stations whose
+did, lsid and txid are rewritten, so the entity pipeline can be measured at
+station counts and update rates that no real installation has.
+
+    python benchmarks/replay.py capture.jsonl.gz --speed 100 --stations 50
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+from common import create_hass, load, percentiles, report, setup_sensors
+
+capture = load("capture")
+coordinator_module = load("coordinator")
+davis = load("davis")
+
+# Offsets keep the rewritten ids of different stations apart
+LSID_OFFSET = 1_000_000
+TXID_OFFSET = 100
+
+
+def rewrite_conditions(conditions, station):
+    if station == 0:
+        return [dict(cond) for cond in conditions]
+    rewritten = []
+    for cond in conditions:
+        cond = dict(cond)
+        if cond.get("lsid") is not None:
+            cond["lsid"] += station * LSID_OFFSET
+        if cond.get("txid") is not None:
+            cond["txid"] += station * TXID_OFFSET
+        rewritten.append(cond)
+    return rewritten
+
+
+def rewrite_did(did, station):
+    return did if station == 0 or did is None else f"{did}-{station}"
+
+
+def rewrite_payload(payload, station):
+    data = payload.get("data") or {}
+    return {
+        **payload,
+        "data": {
+            **data,
+            "did": rewrite_did(data.get("did"), station),
+            "conditions": rewrite_conditions(data.get("conditions") or [], station),
+        },
+    }
+
+
+def rewrite_packet(packet, station):
+    return {
+        **packet,
+        "did": rewrite_did(packet.get("did"), station),
+        "conditions": rewrite_conditions(packet.get("conditions") or [], station),
+    }
+
+
+class ReplayApi(davis.DavisWeatherlinkApi):
+    """Returns whatever payload the driver queued instead of calling the device."""
+
+    def __init__(self, host):
+        # No coalescing, replayed polls can be milliseconds apart
+        super().__init__(host, coalesce_window=0)
+        self.next_payload = None
+
+    async def _async_fetch_current_conditions(self):
+        self.payload_unchanged = False
+        return self.next_payload
+
+
+async def run(events, stations, speed):
+    writes = 0
+
+    def on_write(entity):
+        nonlocal writes
+        entity.native_value
+        entity.native_unit_of_measurement
+        entity.extra_state_attributes
+        writes += 1
+
+    payloads = [event for event in events if event[1] == "payload"]
+    if not payloads:
+        raise SystemExit("The capture contains no current_conditions payloads")
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await create_hass(config_dir)
+        coordinators = []
+        entities = []
+        for station in range(stations):
+            coordinator = coordinator_module.WeatherlinkCoordinator(hass, f"replay-{station}")
+            coordinator._api = ReplayApi(coordinator.host)
+            coordinator.update_interval = None
+            coordinator.api.next_payload = rewrite_payload(payloads[0][2], station)
+            await coordinator.async_refresh()
+            entities.extend(await setup_sensors(hass, coordinator, station, on_write))
+            coordinators.append(coordinator)
+
+        writes = 0
+        lag = []
+        update_cpu = []
+        first = events[0][0] or 0.0
+        started = time.perf_counter()
+        for captured_at, kind, document in events:
+            due = ((captured_at or first) - first) / speed
+            delay = due - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            lag.append(max(-delay, 0.0) * 1000)
+
+            if kind == "payload":
+                for station, coordinator in enumerate(coordinators):
+                    coordinator.api.next_payload = rewrite_payload(document, station)
+                cpu = time.process_time()
+                await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+            else:
+                packets = [rewrite_packet(document, station) for station in range(stations)]
+                cpu = time.process_time()
+                for coordinator, packet in zip(coordinators, packets):
+                    coordinator.async_merge_realtime(packet)
+            update_cpu.append((time.process_time() - cpu) / stations * 1000)
+        wall = time.perf_counter() - started
+
+    recorded = (events[-1][0] or first) - first
+    cuts = percentiles(update_cpu)
+    behind = percentiles(lag)
+    report(f"{len(events)} documents x {stations} stations, {len(entities)} entities, {speed:g}x", [
+        ("recorded span", f"{recorded:.0f} s"),
+        ("replay time", f"{wall:.1f} s"),
+        ("updates/s", f"{len(events) * stations / wall:.0f}" if wall else "0"),
+        ("CPU per update p50", f"{cuts[50]:.3f} ms"),
+        ("CPU per update p99", f"{cuts[99]:.3f} ms"),
+        ("entity writes", f"{writes}"),
+        ("entity writes/s", f"{writes / wall:.0f}" if wall else "0"),
+        ("schedule lag p99", f"{behind[99]:.1f} ms"),
+    ])
+
+
+def main(args):
+    events = capture.read_capture(args.capture)
+    if not events:
+        raise SystemExit(f"{args.capture} is empty")
+    for stations in args.stations:
+        asyncio.run(run(events, stations, args.speed))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", help="file written by the ha-weatherlink.capture service")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 replays in real time, up to 1000")
+    parser.add_argument("--stations", type=int, nargs="+", default=[1])
+    args = parser.parse_args()
+    if not 1 <= args.speed <= 1000:
+        parser.error("--speed must be between 1 and 1000")
+    main(args)
@@ -1,26 +1,228 @@
-from .const import DOMAIN
+from functools import partial
+
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+import voluptuous as vol
+
+from .const import (
+    DOMAIN,
+    ARCHIVE_FILENAME,
+    CONF_ADAPTIVE,
+    CONF_AIR_QUALITY,
+    CONF_AQI_STANDARD,
+    CONF_ARCHIVE,
+    CONF_ARCHIVE_RETENTION_DAYS,
+    CONF_DEADBAND,
+    CONF_DEADBANDS,
+    CONF_DERIVED,
+    CONF_RAIN,
+    CONF_RAIN_DAY_START,
+    CONF_RAIN_WINDOWS,
+    CONF_HEARTBEAT,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_METRICS,
+    CONF_PROXY,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_HUB_MODE,
+    CONF_REALTIME,
+    CONF_REQUEST_TIMEOUT,
+    CONF_STALENESS_WINDOW,
+    CONF_STATISTICS,
+    CONF_STATISTICS_WINDOWS,
+    DEFAULT_ADAPTIVE,
+    DEFAULT_AIR_QUALITY,
+    DEFAULT_AQI_STANDARD,
+    DEFAULT_ARCHIVE,
+    DEFAULT_ARCHIVE_RETENTION_DAYS,
+    DEFAULT_CAPTURE_DURATION,
+    DEFAULT_DEADBAND,
+    DEFAULT_DEADBANDS,
+    DEFAULT_DERIVED,
+    DEFAULT_RAIN,
+    DEFAULT_RAIN_DAY_START,
+    DEFAULT_RAIN_WINDOWS,
+    DEFAULT_HEARTBEAT,
+    DEFAULT_HUB_MODE,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_METRICS,
+    DEFAULT_PROXY,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_REALTIME,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_STALENESS_WINDOW,
+    DEFAULT_STATISTICS,
+    DEFAULT_STATISTICS_KEYS,
+    DEFAULT_STATISTICS_WINDOWS,
+    SERVICE_CAPTURE,
+    SERVICE_IMPORT_STATISTICS,
+)
+from .adaptive import AdaptivePollInterval
+from .air import AirQualityEngine
+from .archive import WeatherlinkArchive
+from .backfill import async_handle_import_statistics
+from .cache import WeatherlinkCache, async_remove_cache
+from .capture import async_handle_capture
 from .coordinator import WeatherlinkCoordinator
+from .davis import create_session
+from .deadband import parse_deadbands
+from .derived import DerivedEngine
+from .hub import async_get_hub
+from .metrics import Metrics
+from .proxy import async_get_proxy
+from .rain import RainEngine
+from .realtime import WeatherlinkRealtime
+from .stats import StatisticsEngine, parse_windows
 
 PLATFORMS = ["sensor"]
 
+IMPORT_STATISTICS_SCHEMA = vol.Schema({
+    vol.Optional("entry_id"): cv.string,
+    vol.Optional("file"): cv.string,
+    vol.Optional("start"): cv.datetime,
+    vol.Optional("end"): cv.datetime,
+})
+
+CAPTURE_SCHEMA = vol.Schema({
+    vol.Optional("entry_id"): cv.string,
+    vol.Optional("file"): cv.string,
+    vol.Optional("duration", default=DEFAULT_CAPTURE_DURATION): vol.All(
+        vol.Coerce(float), vol.Range(min=0.1, max=7 * 24 * 60)
+    ),
+})
+
 
 async def async_setup(hass, config):
     hass.data.setdefault(DOMAIN, {})
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_STATISTICS,
+        partial(async_handle_import_statistics, hass),
+        schema=IMPORT_STATISTICS_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CAPTURE,
+        partial(async_handle_capture, hass),
+        schema=CAPTURE_SCHEMA,
+    )
     return True
 
 
 async def async_setup_entry(hass, entry):
+    # The entry owns one keep-alive session that is reused for every poll
+    session = create_session()
+
     # Create and store the coordinator
-    coordinator = WeatherlinkCoordinator(hass, entry.data["host"])
-    await coordinator.async_config_entry_first_refresh()
+    coordinator = WeatherlinkCoordinator(
+        hass,
+        entry.data["host"],
+        session,
+        entry.options.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT),
+    )
+    coordinator.staleness_window = entry.options.get(CONF_STALENESS_WINDOW, DEFAULT_STALENESS_WINDOW)
+    if entry.options.get(CONF_DEADBAND, DEFAULT_DEADBAND):
+        coordinator.deadbands = parse_deadbands(entry.options.get(CONF_DEADBANDS, DEFAULT_DEADBANDS))
+        coordinator.heartbeat = entry.options.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT)
+    if entry.options.get(CONF_METRICS, DEFAULT_METRICS):
+        coordinator.metrics = coordinator.api.metrics = Metrics()
+    if entry.options.get(CONF_ADAPTIVE, DEFAULT_ADAPTIVE):
+        coordinator.adaptive = AdaptivePollInterval(
+            entry.options.get(CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL),
+            entry.options.get(CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL),
+        )
+    if entry.options.get(CONF_STATISTICS, DEFAULT_STATISTICS):
+        coordinator.statistics = StatisticsEngine(
+            DEFAULT_STATISTICS_KEYS,
+            parse_windows(entry.options.get(CONF_STATISTICS_WINDOWS, DEFAULT_STATISTICS_WINDOWS)),
+        )
+        coordinator.engines.append(coordinator.statistics)
+    if entry.options.get(CONF_DERIVED, DEFAULT_DERIVED):
+        coordinator.derived = DerivedEngine()
+        coordinator.engines.append(coordinator.derived)
+    if entry.options.get(CONF_RAIN, DEFAULT_RAIN):
+        coordinator.rain = RainEngine(
+            parse_windows(entry.options.get(CONF_RAIN_WINDOWS, DEFAULT_RAIN_WINDOWS)),
+            entry.options.get(CONF_RAIN_DAY_START, DEFAULT_RAIN_DAY_START),
+            dt_util.get_time_zone(hass.config.time_zone),
+        )
+        coordinator.engines.append(coordinator.rain)
+    if entry.options.get(CONF_AIR_QUALITY, DEFAULT_AIR_QUALITY):
+        coordinator.air_quality = AirQualityEngine(entry.options.get(CONF_AQI_STANDARD, DEFAULT_AQI_STANDARD))
+        coordinator.engines.append(coordinator.air_quality)
+    hub = async_get_hub(hass) if entry.options.get(CONF_HUB_MODE, DEFAULT_HUB_MODE) else None
+
+    # With a cached payload from the previous run the entities come up right
+    # away and the first poll runs in the background; only a brand new entry
+    # has to wait for the device
+    cache = WeatherlinkCache(hass, coordinator, entry.entry_id)
+    cached = await cache.async_load()
+    if cached is not None:
+        coordinator.async_restore(cached)
+    else:
+        try:
+            if hub is not None:
+                await hub.async_first_refresh(coordinator)
+            else:
+                await coordinator.async_config_entry_first_refresh()
+        except Exception:
+            await coordinator.async_close()
+            raise
     hass.data[DOMAIN][entry.entry_id] = coordinator
+    try:
+        coordinator.cache = cache
+        cache.async_start()
+        if hub is not None:
+            hub.async_add(coordinator)
+        if entry.options.get(CONF_PROXY, DEFAULT_PROXY):
+            coordinator.proxy = async_get_proxy(hass)
+            coordinator.proxy.async_add(coordinator)
+
+        if entry.options.get(CONF_ARCHIVE, DEFAULT_ARCHIVE):
+            coordinator.archive = WeatherlinkArchive(
+                hass,
+                coordinator,
+                hass.config.path(ARCHIVE_FILENAME.format(entry_id=entry.entry_id)),
+                entry.options.get(CONF_ARCHIVE_RETENTION_DAYS, DEFAULT_ARCHIVE_RETENTION_DAYS),
+            )
+            await coordinator.archive.async_start()
+
+        if entry.options.get(CONF_REALTIME, DEFAULT_REALTIME):
+            coordinator.realtime = WeatherlinkRealtime(hass, coordinator)
+            await coordinator.realtime.async_start()
+    except Exception:
+        # Close the pooled session and leave the hub, the proxy and
+        # whatever else was started, or they would outlive the entry
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+        await coordinator.async_close()
+        raise
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     # Forward the config entry setup to the sensor platform
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    if cached is not None:
+        if hub is not None:
+            hub.async_poll_soon(coordinator)
+        else:
+            entry.async_create_background_task(
+                hass, coordinator.async_refresh(), f"ha-weatherlink first refresh {coordinator.host}"
+            )
     return True
 
 
+async def async_reload_entry(hass, entry):
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass, entry):
-    await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
-    hass.data[DOMAIN].pop(entry.entry_id)
-    return True
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_close()
+    return unload_ok
+
+
+async def async_remove_entry(hass, entry):
+    # Drop the cached payload so a re-added device starts from scratch
+    await async_remove_cache(hass, entry.entry_id)
@@ -0,0 +1,95 @@
+"""Adaptive poll interval based on device report cadence and weather activity."""
+from .const import (
+    ADAPTIVE_BACKOFF_FACTOR,
+    ADAPTIVE_RAIN_RATE_ACTIVE,
+    ADAPTIVE_WIND_DELTA_ACTIVE,
+    ADAPTIVE_WIND_SPEED_ACTIVE,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_UPDATE_INTERVAL,
+)
+
+# Weight of the newest sample in the per-condition cadence estimate
+CADENCE_SMOOTHING = 0.3
+
+
+class AdaptivePollInterval:
+    """Pick the next poll interval from what the last poll returned.
+
+    - While it rains or the wind is gusting, poll at the lower bound.
+    - When no condition reported anything new, the poll was wasted and the
+      interval backs off towards the upper bound.
+    - Otherwise poll about as often as the fastest reporting condition, as
+      estimated from the spacing of its `last_report_time` / `ts` values.
+      Conditions without a report time fall back to the default interval.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = DEFAULT_MIN_UPDATE_INTERVAL,
+        max_interval: float = DEFAULT_MAX_UPDATE_INTERVAL,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = self._clamp(DEFAULT_UPDATE_INTERVAL)
+        self._report_times = {}
+        self._cadences = {}
+        self._snapshots = {}
+
+    def _clamp(self, seconds):
+        return min(max(seconds, self.min_interval), self.max_interval)
+
+    def update(self, conditions) -> float:
+        """Feed the conditions of a poll, keyed by lsid, and return the next interval."""
+        changed = False
+        active = False
+        cadences = []
+
+        for cond_id, cond in conditions.items():
+            if self._condition_changed(cond_id, cond):
+                changed = True
+            active = active or self._is_active(cond_id, cond)
+            cadence = self._cadences.get(cond_id)
+            cadences.append(cadence if cadence is not None else DEFAULT_UPDATE_INTERVAL)
+            self._snapshots[cond_id] = dict(cond)
+
+        if active:
+            interval = self.min_interval
+        elif not changed:
+            interval = self.interval * ADAPTIVE_BACKOFF_FACTOR
+        else:
+            interval = min(cadences, default=DEFAULT_UPDATE_INTERVAL)
+
+        self.interval = self._clamp(interval)
+        return self.interval
+
+    def _condition_changed(self, cond_id, cond):
+        report_time = cond.get("last_report_time") or cond.get("ts")
+        if report_time is None:
+            return cond != self._snapshots.get(cond_id)
+
+        previous = self._report_times.get(cond_id)
+        self._report_times[cond_id] = report_time
+        if previous is None:
+            return True
+        if report_time == previous:
+            return False
+        if isinstance(report_time, (int, float)) and isinstance(previous, (int, float)):
+            sample = report_time - previous
+            if sample > 0:
+                cadence = self._cadences.get(cond_id, sample)
+                self._cadences[cond_id] = cadence + CADENCE_SMOOTHING * (sample - cadence)
+        return True
+
+    def _is_active(self, cond_id, cond):
+        rain_rate = cond.get("rain_rate_last")
+        if rain_rate is not None and rain_rate >= ADAPTIVE_RAIN_RATE_ACTIVE:
+            return True
+
+        gust = cond.get("wind_speed_hi_last_2_min")
+        if gust is None:
+            return False
+        if gust >= ADAPTIVE_WIND_SPEED_ACTIVE:
+            return True
+        previous = self._snapshots.get(cond_id, {}).get("wind_speed_hi_last_2_min")
+        return previous is not None and abs(gust - previous) >= ADAPTIVE_WIND_DELTA_ACTIVE
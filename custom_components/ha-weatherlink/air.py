@@ -0,0 +1,236 @@
+"""NowCast and air quality index from the PM samples of AirLink conditions."""
+from array import array
+import math
+import time
+
+from .models import AIRLINK
+
+NOWCAST_HOURS = 12
+
+STANDARD_US_EPA = "us_epa"
+STANDARD_EU_CAQI = "eu_caqi"
+
+# (concentration low, high, index low, high); US EPA breakpoints as revised
+# in 2024, with the concentration truncated to the precision of the table
+US_EPA_BREAKPOINTS = {
+    "pm_2p5": (
+        (0.0, 9.0, 0, 50),
+        (9.1, 35.4, 51, 100),
+        (35.5, 55.4, 101, 150),
+        (55.5, 125.4, 151, 200),
+        (125.5, 225.4, 201, 300),
+        (225.5, 325.4, 301, 500),
+    ),
+    "pm_10": (
+        (0, 54, 0, 50),
+        (55, 154, 51, 100),
+        (155, 254, 101, 150),
+        (255, 354, 151, 200),
+        (355, 424, 201, 300),
+        (425, 604, 301, 500),
+    ),
+}
+US_EPA_DIGITS = {"pm_2p5": 1, "pm_10": 0}
+US_EPA_CATEGORIES = (
+    (50, "Good"),
+    (100, "Moderate"),
+    (150, "Unhealthy for Sensitive Groups"),
+    (200, "Unhealthy"),
+    (300, "Very Unhealthy"),
+    (math.inf, "Hazardous"),
+)
+
+# Hourly CAQI grid; above the last row the index keeps the slope of it
+EU_CAQI_BREAKPOINTS = {
+    "pm_2p5": ((0, 15, 0, 25), (15, 30, 25, 50), (30, 55, 50, 75), (55, 110, 75, 100)),
+    "pm_10": ((0, 25, 0, 25), (25, 50, 25, 50), (50, 90, 50, 75), (90, 180, 75, 100)),
+}
+EU_CAQI_CATEGORIES = (
+    (25, "Very low"),
+    (50, "Low"),
+    (75, "Medium"),
+    (100, "High"),
+    (math.inf, "Very high"),
+)
+
+POLLUTANTS = ("pm_2p5", "pm_10")
+# Latest reading first, the one minute average when it is missing
+SAMPLE_KEYS = {"pm_2p5": ("pm_2p5_last", "pm_2p5"), "pm_10": ("pm_10_last", "pm_10")}
+
+AIR_QUALITY_KEYS = ("pm_2p5_nowcast_local", "pm_10_nowcast_local", "aqi", "aqi_category", "aqi_pollutant")
+
+
+def nowcast(hourly):
+    """EPA NowCast of hourly averages, newest first; None for a missing hour.
+
+    Needs two of the three most recent hours. The weight factor is the
+    ratio of the lowest to the highest hour, at least 0.5 for PM.
+    """
+    if sum(value is not None for value in hourly[:3]) < 2:
+        return None
+    values = [value for value in hourly if value is not None]
+    highest = max(values)
+    weight = max(min(values) / highest, 0.5) if highest > 0 else 1.0
+    total = norm = 0.0
+    factor = 1.0
+    for value in hourly:
+        if value is not None:
+            total += factor * value
+            norm += factor
+        factor *= weight
+    return total / norm
+
+
+def us_epa_index(pollutant, concentration):
+    digits = US_EPA_DIGITS[pollutant]
+    concentration = math.floor(concentration * 10**digits) / 10**digits
+    breakpoints = US_EPA_BREAKPOINTS[pollutant]
+    for c_low, c_high, i_low, i_high in breakpoints:
+        if concentration <= c_high:
+            return round((i_high - i_low) / (c_high - c_low) * (max(concentration, c_low) - c_low) + i_low)
+    # Beyond the scale
+    return 500
+
+
+def eu_caqi_index(pollutant, concentration):
+    breakpoints = EU_CAQI_BREAKPOINTS[pollutant]
+    for c_low, c_high, i_low, i_high in breakpoints:
+        if concentration <= c_high:
+            break
+    return round((i_high - i_low) / (c_high - c_low) * (concentration - c_low) + i_low)
+
+
+def category(categories, index):
+    return next(name for upper, name in categories if index <= upper)
+
+
+class HourlyBuckets:
+    """Sum and count of the samples of the last NOWCAST_HOURS clock hours.
+
+    A ring of plain arrays indexed by hour number, so adding a sample and
+    the hourly averages never look at individual samples again.
+    """
+
+    __slots__ = ("hour", "sums", "counts")
+
+    def __init__(self):
+        self.hour = None
+        self.sums = array("d", bytes(8 * NOWCAST_HOURS))
+        self.counts = array("L", bytes(array("L").itemsize * NOWCAST_HOURS))
+
+    def advance(self, hour):
+        if self.hour is None:
+            self.hour = hour
+            return
+        # Clear the buckets of the hours that started since, at most all of them
+        for passed in range(self.hour + 1, min(hour, self.hour + NOWCAST_HOURS) + 1):
+            self.sums[passed % NOWCAST_HOURS] = 0.0
+            self.counts[passed % NOWCAST_HOURS] = 0
+        self.hour = max(self.hour, hour)
+
+    def add(self, value):
+        slot = self.hour % NOWCAST_HOURS
+        self.sums[slot] += value
+        self.counts[slot] += 1
+
+    def hourly(self):
+        """Hourly averages, current hour first."""
+        if self.hour is None:
+            return [None] * NOWCAST_HOURS
+        averages = []
+        for age in range(NOWCAST_HOURS):
+            slot = (self.hour - age) % NOWCAST_HOURS
+            count = self.counts[slot]
+            averages.append(self.sums[slot] / count if count else None)
+        return averages
+
+
+class AirQualityEngine:
+    """NowCast and AQI per AirLink condition, computed once per update.
+
+    Samples of each update go into hourly buckets; the NowCast is taken
+    from the 12 hourly averages and the index from the NowCast (US EPA) or
+    the average of the current hour (EU CAQI).
+    """
+
+    def __init__(self, standard=STANDARD_US_EPA):
+        self.standard = standard
+        self._buckets = {}
+        self._values = {}
+
+    def keys(self, cond_id):
+        return AIR_QUALITY_KEYS if cond_id in self._buckets else ()
+
+    def value(self, cond_id, key):
+        return self._values.get(cond_id, {}).get(key)
+
+    def async_update(self, records, changed, now: float | None = None):
+        if now is None:
+            now = time.time()
+        hour = int(now // 3600)
+        for cond_id in changed:
+            record = records.get(cond_id)
+            if record is None or record.data_structure_type != AIRLINK:
+                continue
+            buckets = self._buckets.get(cond_id)
+            if buckets is None:
+                buckets = self._buckets[cond_id] = {pollutant: HourlyBuckets() for pollutant in POLLUTANTS}
+            for pollutant, bucket in buckets.items():
+                bucket.advance(hour)
+                sample = next(
+                    (record.get(key) for key in SAMPLE_KEYS[pollutant] if record.get(key) is not None), None
+                )
+                if sample is not None:
+                    bucket.add(sample)
+        # Conditions that did not report still move on to the current hour
+        for cond_id, buckets in self._buckets.items():
+            for bucket in buckets.values():
+                bucket.advance(hour)
+            self._values[cond_id] = self._compute(buckets)
+
+    def _compute(self, buckets):
+        values = {}
+        indexes = {}
+        for pollutant, bucket in buckets.items():
+            hourly = bucket.hourly()
+            concentration = nowcast(hourly)
+            values[f"{pollutant}_nowcast_local"] = round(concentration, 1) if concentration is not None else None
+            if self.standard == STANDARD_EU_CAQI:
+                concentration = hourly[0]
+                if concentration is not None:
+                    indexes[pollutant] = eu_caqi_index(pollutant, concentration)
+            elif concentration is not None:
+                indexes[pollutant] = us_epa_index(pollutant, concentration)
+        if indexes:
+            # The index is that of the worst pollutant
+            pollutant = max(indexes, key=indexes.get)
+            categories = EU_CAQI_CATEGORIES if self.standard == STANDARD_EU_CAQI else US_EPA_CATEGORIES
+            values["aqi"] = indexes[pollutant]
+            values["aqi_category"] = category(categories, indexes[pollutant])
+            values["aqi_pollutant"] = pollutant
+        return values
+
+    def as_dict(self):
+        """Hourly buckets to persist across restarts."""
+        return [
+            {
+                "id": cond_id,
+                "buckets": {
+                    pollutant: [bucket.hour, list(bucket.sums), list(bucket.counts)]
+                    for pollutant, bucket in buckets.items()
+                },
+            }
+            for cond_id, buckets in self._buckets.items()
+        ]
+
+    def restore(self, saved):
+        for item in saved or []:
+            buckets = {}
+            for pollutant in POLLUTANTS:
+                bucket = buckets[pollutant] = HourlyBuckets()
+                hour, sums, counts = item["buckets"].get(pollutant) or (None, (), ())
+                if hour is not None and len(sums) == len(counts) == NOWCAST_HOURS:
+                    bucket.hour = hour
+                    bucket.sums = array("d", sums)
+                    bucket.counts = array("L", counts)
+            self._buckets[item["id"]] = buckets
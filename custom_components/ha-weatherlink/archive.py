@@ -0,0 +1,250 @@
+"""Local append-only archive of raw station samples in SQLite."""
+from datetime import timedelta
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import (
+    ARCHIVE_COMPACT_EVERY,
+    ARCHIVE_COMPACT_RESOLUTION,
+    ARCHIVE_FLUSH_INTERVAL,
+    ARCHIVE_MAX_BATCH,
+    ARCHIVE_READ_BATCH,
+    DEFAULT_ARCHIVE_FULL_RESOLUTION_DAYS,
+    DEFAULT_ARCHIVE_RETENTION_DAYS,
+    DEFAULT_UPDATE_INTERVAL,
+)
+from .coordinator import condition_stamp
+
+_LOGGER = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    lsid INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    data_structure_type INTEGER,
+    data BLOB NOT NULL,
+    PRIMARY KEY (lsid, ts)
+)
+"""
+
+
+def encode_condition(cond) -> bytes:
+    return zlib.compress(json.dumps(cond, separators=(",", ":")).encode(), 1)
+
+
+def decode_condition(blob: bytes):
+    return json.loads(zlib.decompress(blob))
+
+
+class SampleStore:
+    """Blocking SQLite store; only used from the executor."""
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def open(self):
+        conn = sqlite3.connect(self._path, check_same_thread=False)
+        # auto_vacuum must be set before the first table is created
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(SCHEMA)
+        conn.commit()
+        self._conn = conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def write(self, rows):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO samples (lsid, ts, data_structure_type, data) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def compact(self, now: float, full_resolution_days: int, retention_days: int, resolution: int):
+        """Drop samples past retention and thin out old ones to `resolution` seconds."""
+        retention_cutoff = int(now - retention_days * 86400)
+        thin_cutoff = int(now - full_resolution_days * 86400)
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM samples WHERE ts < ?", (retention_cutoff,)
+            ).rowcount
+            removed += self._conn.execute(
+                """
+                DELETE FROM samples WHERE ts < :cutoff AND rowid NOT IN (
+                    SELECT MIN(rowid) FROM samples WHERE ts < :cutoff
+                    GROUP BY lsid, ts / :resolution
+                )
+                """,
+                {"cutoff": thin_cutoff, "resolution": resolution},
+            ).rowcount
+            self._conn.commit()
+            self._conn.execute("PRAGMA incremental_vacuum")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return removed
+
+    def read(self, lsid=None, start=None, end=None):
+        """Yield (lsid, ts, condition) tuples ordered by lsid and time.
+
+        Rows are fetched ARCHIVE_READ_BATCH at a time on a connection of
+        their own, so a long range is never all in memory and writes are
+        not blocked meanwhile (WAL gives the reader a snapshot).
+        """
+        where, params = _range(lsid, start, end)
+        conn = sqlite3.connect(f"file:{self._path}?mode=ro", uri=True)
+        try:
+            cursor = conn.execute(f"SELECT lsid, ts, data FROM samples{where} ORDER BY lsid, ts", params)
+            while rows := cursor.fetchmany(ARCHIVE_READ_BATCH):
+                for row_lsid, ts, data in rows:
+                    yield row_lsid, ts, decode_condition(data)
+        finally:
+            conn.close()
+
+    def first_times(self, start=None, end=None):
+        """Return the time of the first sample in the range per lsid."""
+        where, params = _range(None, start, end)
+        with self._lock:
+            return dict(self._conn.execute(f"SELECT lsid, MIN(ts) FROM samples{where} GROUP BY lsid", params))
+
+
+def _range(lsid, start, end):
+    clauses = []
+    params = []
+    if lsid is not None:
+        clauses.append("lsid = ?")
+        params.append(lsid)
+    if start is not None:
+        clauses.append("ts >= ?")
+        params.append(int(start))
+    if end is not None:
+        clauses.append("ts < ?")
+        params.append(int(end))
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+class WeatherlinkArchive:
+    """Collects the samples of a coordinator and writes them in batches.
+
+    Samples are queued on the event loop and flushed by an executor job every
+    `ARCHIVE_FLUSH_INTERVAL` seconds (or sooner when the batch is full).
+    Each condition is stored at most once per half poll interval, so
+    real-time packets do not multiply the archive size while the jitter of
+    the device timestamps does not drop regular polls. Once a day samples past the
+    retention are removed and older samples are thinned out.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator,
+        path: str,
+        retention_days: int = DEFAULT_ARCHIVE_RETENTION_DAYS,
+        full_resolution_days: int = DEFAULT_ARCHIVE_FULL_RESOLUTION_DAYS,
+    ):
+        self._hass = hass
+        self._coordinator = coordinator
+        self.store = SampleStore(path)
+        self._retention_days = retention_days
+        self._full_resolution_days = full_resolution_days
+        self._pending = []
+        self._last_ts = {}
+        self._unsubs = []
+        self._flush_lock = asyncio.Lock()
+        self.written = 0
+
+    async def async_start(self):
+        await self._hass.async_add_executor_job(self.store.open)
+        self._unsubs = [
+            self._coordinator.async_add_listener(self._async_handle_update),
+            async_track_time_interval(
+                self._hass, self._async_flush, timedelta(seconds=ARCHIVE_FLUSH_INTERVAL)
+            ),
+            async_track_time_interval(
+                self._hass, self._async_compact, timedelta(seconds=ARCHIVE_COMPACT_EVERY)
+            ),
+        ]
+        self._hass.async_create_task(self._async_compact())
+
+    async def async_stop(self):
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+        await self._async_flush()
+        await self._hass.async_add_executor_job(self.store.close)
+
+    @callback
+    def _async_handle_update(self):
+        coordinator = self._coordinator
+        if not coordinator.last_update_success or not coordinator.changed_conditions:
+            return
+        payload_ts = ((coordinator.data or {}).get("data") or {}).get("ts")
+        # Half the poll interval (capped at the default one, which real-time
+        # stretches): WLL timestamps of 30 s polls are often 29 s apart
+        spacing = 0.5 * min(coordinator.poll_interval.total_seconds(), DEFAULT_UPDATE_INTERVAL)
+        for cond_id in coordinator.changed_conditions:
+            cond = coordinator.conditions.get(cond_id)
+            if cond is None:
+                continue
+            ts = condition_stamp(cond) or payload_ts or time.time()
+            if not isinstance(ts, (int, float)):
+                continue
+            last = self._last_ts.get(cond_id)
+            if last is not None and ts - last < spacing:
+                continue
+            self._last_ts[cond_id] = ts
+            self._pending.append(
+                (cond_id, int(ts), cond.get("data_structure_type"), encode_condition(cond))
+            )
+        if len(self._pending) >= ARCHIVE_MAX_BATCH:
+            self._hass.async_create_task(self._async_flush())
+
+    async def _async_flush(self, _now=None):
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            rows, self._pending = self._pending, []
+            try:
+                await self._hass.async_add_executor_job(self.store.write, rows)
+            except sqlite3.Error as err:
+                _LOGGER.warning("Could not write %s samples to the archive: %s", len(rows), err)
+                return
+            self.written += len(rows)
+
+    async def _async_compact(self, _now=None):
+        try:
+            removed = await self._hass.async_add_executor_job(
+                self.store.compact,
+                time.time(),
+                self._full_resolution_days,
+                self._retention_days,
+                ARCHIVE_COMPACT_RESOLUTION,
+            )
+        except sqlite3.Error as err:
+            _LOGGER.warning("Could not compact the archive: %s", err)
+            return
+        if removed:
+            _LOGGER.debug("Removed %s old samples from the archive", removed)
+
+    async def async_read(self, start=None, end=None):
+        """Flush, then return the first sample time per lsid and a sample iterator.
+
+        The iterator blocks, consume it in the executor.
+        """
+        await self._async_flush()
+        first_times = await self._hass.async_add_executor_job(self.store.first_times, start, end)
+        return first_times, self.store.read(start=start, end=end)
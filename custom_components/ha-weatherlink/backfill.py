@@ -0,0 +1,327 @@
+"""Backfill Home Assistant long-term statistics from archived samples.
+
+Samples come from the local archive or from a file of recorded
+current_conditions payloads. They are aggregated into hourly buckets per
+sensor and imported through the recorder in one call per sensor, instead of
+replaying every sample as a state change.
+"""
+from datetime import datetime, timedelta, timezone
+import gzip
+import json
+import logging
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import async_import_statistics, statistics_during_period
+from homeassistant.components.sensor import UNIT_CONVERTERS, SensorStateClass
+from homeassistant.const import UnitOfLength
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .coordinator import condition_id, condition_stamp
+from .models import parse_condition, rain_count_keys
+from .sensor import SENSOR_TYPES, build_conversions
+
+try:
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:  # Home Assistant before 2025.4
+    StatisticMeanType = None
+
+_LOGGER = logging.getLogger(__name__)
+
+HOUR = 3600
+
+# Rain counters that only grow until the device resets them; a drop in
+# value is a reset and the new value is rain since then
+ACCUMULATING_RAIN_KEYS = {"rainfall_daily", "rainfall_monthly", "rainfall_year", "rain_storm"}
+
+# The rolling window counters (last 15 min, ...) go up and down, a sum of
+# their changes means nothing, so they get mean/min/max like measurements
+MEAN_KEYS = {
+    key for key, info in SENSOR_TYPES.items()
+    if info["state_class"] == SensorStateClass.MEASUREMENT and info["device_class"] != "timestamp"
+} | (rain_count_keys - ACCUMULATING_RAIN_KEYS)
+
+# Fields of a statistic row that carry a value in the sensor's unit
+VALUE_FIELDS = ("mean", "min", "max", "state", "sum")
+
+
+def read_payload_file(path):
+    """Read recorded current_conditions payloads, one JSON document per line."""
+    opener = gzip.open if str(path).endswith(".gz") else open
+    payloads = []
+    with opener(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                payloads.append(json.loads(line))
+    return payloads
+
+
+def samples_from_payloads(payloads, start=None, end=None):
+    """Flatten payloads into (lsid, ts, condition) tuples ordered by lsid and time."""
+    samples = []
+    for payload in payloads:
+        data = payload.get("data") or {}
+        for cond in data.get("conditions") or []:
+            cond_id = condition_id(cond)
+            ts = condition_stamp(cond) or data.get("ts")
+            if cond_id is None or not isinstance(ts, (int, float)):
+                continue
+            if (start is not None and ts < start) or (end is not None and ts >= end):
+                continue
+            samples.append((cond_id, int(ts), cond))
+    samples.sort(key=lambda sample: (sample[0], sample[1]))
+    return samples
+
+
+class _MeanBucket:
+    __slots__ = ("count", "total", "min", "max")
+
+    def __init__(self, value):
+        self.count = 1
+        self.total = value
+        self.min = value
+        self.max = value
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+
+def aggregate_hourly(samples, metric, baselines=None):
+    """Aggregate samples into hourly statistics per (lsid, key).
+
+    Returns {(lsid, key): (unit, has_sum, [statistic rows])} in the native
+    unit of the sensor. Measurements and rolling rain windows get
+    mean/min/max; accumulating rain counters get state/sum. `baselines`
+    maps (lsid, key) to the (state, sum) in mm of the last statistic before
+    the samples, so the imported sums carry on from the recorder's.
+    """
+    means = {}
+    sums = {}
+    units = {}
+    baselines = baselines or {}
+
+    for cond_id, ts, cond in samples:
+        record = parse_condition(cond)
+        conversions = build_conversions(cond.get("rain_size", 1), metric)
+        hour = ts - ts % HOUR
+        for key in record.FIELDS:
+            value = record.get(key)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            conversion = conversions[key]
+            series = (cond_id, key)
+            units[series] = conversion.unit
+            if key in ACCUMULATING_RAIN_KEYS:
+                # value is in mm here; keep the running sum in mm as well
+                state = sums.get(series)
+                if state is None:
+                    previous, total = baselines.get(series, (None, 0.0))
+                    state = sums[series] = {"previous": previous, "sum": total, "hours": {}}
+                previous = state["previous"]
+                if previous is not None:
+                    delta = value - previous
+                    if delta < 0:
+                        delta = value
+                    state["sum"] += delta
+                state["previous"] = value
+                state["hours"][hour] = (conversion.convert(value), conversion.convert(state["sum"]))
+            elif key in MEAN_KEYS:
+                value = conversion.convert(value)
+                buckets = means.setdefault(series, {})
+                bucket = buckets.get(hour)
+                if bucket is None:
+                    buckets[hour] = _MeanBucket(value)
+                else:
+                    bucket.add(value)
+
+    result = {}
+    for series, buckets in means.items():
+        result[series] = (units[series], False, [
+            {
+                "start": datetime.fromtimestamp(hour, tz=timezone.utc),
+                "mean": bucket.total / bucket.count,
+                "min": bucket.min,
+                "max": bucket.max,
+            }
+            for hour, bucket in sorted(buckets.items())
+        ])
+    for series, state in sums.items():
+        result[series] = (units[series], True, [
+            {
+                "start": datetime.fromtimestamp(hour, tz=timezone.utc),
+                "state": value,
+                "sum": total,
+            }
+            for hour, (value, total) in sorted(state["hours"].items())
+        ])
+    return result
+
+
+def _last_statistic_before(hass, statistic_id, before):
+    """State and sum of the last hourly statistic before `before`, or None.
+
+    Runs in the recorder executor. Most imports fill a recent gap, so only
+    the last week is read first and the whole history only when needed.
+    """
+    for start in (before - timedelta(days=7), datetime.fromtimestamp(0, tz=timezone.utc)):
+        rows = statistics_during_period(
+            hass, start, before, {statistic_id}, "hour", None, {"state", "sum"}
+        ).get(statistic_id)
+        if rows:
+            return rows[-1].get("state"), rows[-1].get("sum")
+    return None
+
+
+def first_times(samples):
+    """Time of the first sample per lsid, from samples ordered by lsid and time."""
+    times = {}
+    for cond_id, ts, _cond in samples:
+        times.setdefault(cond_id, ts)
+    return times
+
+
+async def _async_baselines(hass, coordinator, registry, first):
+    """Last recorded state and sum in mm of every rain counter before the samples."""
+    baselines = {}
+    for cond_id, ts in first.items():
+        hour = ts - ts % HOUR
+        for key in ACCUMULATING_RAIN_KEYS:
+            entity_id = registry.async_get_entity_id(
+                "sensor", DOMAIN, f"{coordinator.host}_{cond_id}_{key}"
+            )
+            if entity_id is None:
+                continue
+            last = await get_instance(hass).async_add_executor_job(
+                _last_statistic_before, hass, entity_id, datetime.fromtimestamp(hour, tz=timezone.utc)
+            )
+            if last is None or last[0] is None or last[1] is None:
+                continue
+            state_unit = _state_unit(hass, registry, entity_id) or UnitOfLength.MILLIMETERS
+            rows = convert_rows(
+                [{"state": last[0], "sum": last[1]}],
+                SENSOR_TYPES[key]["device_class"], state_unit, UnitOfLength.MILLIMETERS,
+            )
+            if rows is not None:
+                baselines[(cond_id, key)] = (rows[0]["state"], rows[0]["sum"])
+    return baselines
+
+
+def _state_unit(hass, registry, entity_id):
+    """The unit the recorder stores for the entity, after display conversion."""
+    state = hass.states.get(entity_id)
+    if state is not None and "unit_of_measurement" in state.attributes:
+        return state.attributes["unit_of_measurement"]
+    entry = registry.async_get(entity_id)
+    return entry.unit_of_measurement if entry is not None else None
+
+
+def convert_rows(statistics, device_class, native_unit, state_unit):
+    """Convert rows from the native unit to the state unit, or None if impossible."""
+    if native_unit == state_unit:
+        return statistics
+    converter = UNIT_CONVERTERS.get(device_class)
+    if (
+        converter is None
+        or native_unit not in converter.VALID_UNITS
+        or state_unit not in converter.VALID_UNITS
+    ):
+        return None
+    convert = converter.converter_factory(native_unit, state_unit)
+    return [
+        {field: convert(value) if field in VALUE_FIELDS else value for field, value in row.items()}
+        for row in statistics
+    ]
+
+
+def _metadata(entity_id, name, unit, has_sum):
+    metadata = {
+        "has_sum": has_sum,
+        "name": name,
+        "source": "recorder",
+        "statistic_id": entity_id,
+        "unit_of_measurement": unit,
+    }
+    if StatisticMeanType is not None:
+        metadata["mean_type"] = StatisticMeanType.NONE if has_sum else StatisticMeanType.ARITHMETIC
+    else:
+        metadata["has_mean"] = not has_sum
+    return StatisticMetaData(**metadata)
+
+
+async def async_import_entry_statistics(hass, entry_id, path=None, start=None, end=None):
+    """Import hourly statistics for one config entry; returns the number of rows."""
+    coordinator = hass.data[DOMAIN].get(entry_id)
+    if coordinator is None:
+        raise HomeAssistantError(f"Unknown Weatherlink entry {entry_id}")
+
+    if path is not None:
+        if not hass.config.is_allowed_path(path):
+            raise HomeAssistantError(f"Access to {path} is not allowed")
+        payloads = await hass.async_add_executor_job(read_payload_file, path)
+        samples = samples_from_payloads(payloads, start, end)
+        first = first_times(samples)
+    elif coordinator.archive is not None:
+        # Streamed from the archive while aggregating, never all in memory
+        first, samples = await coordinator.archive.async_read(start=start, end=end)
+    else:
+        raise HomeAssistantError(
+            f"The archive is not enabled for {coordinator.host}; pass a payload file instead"
+        )
+
+    metric = hass.config.units.length_unit == UnitOfLength.MILLIMETERS
+    registry = er.async_get(hass)
+    # Rain sums carry on from the rows the recorder already has, or a
+    # filled gap would drop to zero and jump back
+    baselines = await _async_baselines(hass, coordinator, registry, first)
+    aggregated = await hass.async_add_executor_job(aggregate_hourly, samples, metric, baselines)
+
+    rows = 0
+    for (cond_id, key), (unit, has_sum, statistics) in aggregated.items():
+        entity_id = registry.async_get_entity_id(
+            "sensor", DOMAIN, f"{coordinator.host}_{cond_id}_{key}"
+        )
+        if entity_id is None or not statistics:
+            continue
+        # Home Assistant converts the states for display, the statistics must
+        # be in that same unit or they clash with what the recorder has
+        state_unit = _state_unit(hass, registry, entity_id) or unit
+        statistics = convert_rows(statistics, SENSOR_TYPES[key]["device_class"], unit, state_unit)
+        if statistics is None:
+            _LOGGER.warning("Not importing %s: cannot convert %s to %s", entity_id, unit, state_unit)
+            continue
+        async_import_statistics(
+            hass,
+            _metadata(entity_id, SENSOR_TYPES[key]["name"], state_unit, has_sum),
+            [StatisticData(**row) for row in statistics],
+        )
+        rows += len(statistics)
+
+    _LOGGER.info(
+        "Imported %s hourly statistics for %s series of %s", rows, len(aggregated), coordinator.host
+    )
+    return rows
+
+
+async def async_handle_import_statistics(hass, call):
+    entry_ids = [call.data["entry_id"]] if call.data.get("entry_id") else [
+        entry.entry_id for entry in hass.config_entries.async_entries(DOMAIN)
+    ]
+    start = call.data.get("start")
+    end = call.data.get("end")
+    for entry_id in entry_ids:
+        await async_import_entry_statistics(
+            hass,
+            entry_id,
+            call.data.get("file"),
+            dt_util.as_utc(start).timestamp() if start else None,
+            dt_util.as_utc(end).timestamp() if end else None,
+        )
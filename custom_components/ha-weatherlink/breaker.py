@@ -0,0 +1,81 @@
+"""Circuit breaker that stops hammering an unreachable device."""
+import random
+
+from .const import (
+    BREAKER_BASE_BACKOFF,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_JITTER,
+    BREAKER_MAX_BACKOFF,
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Track consecutive failures and decide when a request may go out.
+
+    - closed: every poll goes to the device.
+    - open: after `failure_threshold` consecutive failures polls are skipped
+      until the backoff expires. The backoff doubles with every further
+      failure, up to `max_backoff`, with +/- `jitter` so that devices that
+      dropped off together do not come back in lockstep.
+    - half_open: one probe is let through; success closes the breaker and
+      restores the normal cadence, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        base_backoff: float = BREAKER_BASE_BACKOFF,
+        max_backoff: float = BREAKER_MAX_BACKOFF,
+        jitter: float = BREAKER_JITTER,
+    ):
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.state = CLOSED
+        self.failures = 0
+        self.retry_at = 0.0
+        self.opened = 0
+
+    def allow_request(self, now: float) -> bool:
+        if self.state == OPEN:
+            if now < self.retry_at:
+                return False
+            self.state = HALF_OPEN
+        return True
+
+    def record_success(self) -> bool:
+        """Close the breaker; return True if it was open or probing."""
+        recovered = self.state != CLOSED
+        self.state = CLOSED
+        self.failures = 0
+        return recovered
+
+    def record_failure(self, now: float) -> bool:
+        """Count a failure; return True if this failure opened the breaker."""
+        self.failures += 1
+        if self.state == CLOSED and self.failures < self.failure_threshold:
+            return False
+        opening = self.state == CLOSED
+        exponent = min(self.failures - self.failure_threshold, 16)
+        backoff = min(self.base_backoff * 2 ** exponent, self.max_backoff)
+        self.retry_at = now + backoff * random.uniform(1 - self.jitter, 1 + self.jitter)
+        self.state = OPEN
+        if opening:
+            self.opened += 1
+        return opening
+
+    def retry_in(self, now: float) -> float:
+        return max(self.retry_at - now, 0.0) if self.state == OPEN else 0.0
+
+    def as_dict(self, now: float):
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened": self.opened,
+            "retry_in": round(self.retry_in(now), 1),
+        }
@@ -0,0 +1,87 @@
+"""Last good payload and entity set of an entry, kept in Home Assistant storage."""
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import CACHE_KEY, CACHE_SAVE_DELAY, CACHE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _store(hass, entry_id):
+    return Store(hass, CACHE_VERSION, CACHE_KEY.format(entry_id=entry_id))
+
+
+async def async_remove_cache(hass: HomeAssistant, entry_id: str):
+    await _store(hass, entry_id).async_remove()
+
+
+class WeatherlinkCache:
+    """Lets the entry start from the previous run without waiting for the device.
+
+    The cache is written at most every CACHE_SAVE_DELAY seconds after a good
+    poll, and once more when Home Assistant stops.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator, entry_id: str):
+        self._coordinator = coordinator
+        self._store = _store(hass, entry_id)
+        self._unsub = None
+        self._pending = False
+
+    async def async_load(self):
+        """Return the cached payload, entity keys and save time, or None."""
+        try:
+            cached = await self._store.async_load()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.warning("Ignoring unreadable cache for %s: %s", self._coordinator.host, err)
+            return None
+        if not cached or cached.get("host") != self._coordinator.host or not cached.get("payload"):
+            return None
+        saved_at = dt_util.parse_datetime(cached.get("saved_at") or "")
+        if saved_at is None:
+            return None
+        return {
+            "payload": cached["payload"],
+            "entities": {tuple(key) for key in cached.get("entities") or []},
+            "saved_at": saved_at,
+            "rain": cached.get("rain"),
+            "air_quality": cached.get("air_quality"),
+        }
+
+    @callback
+    def async_start(self):
+        self._unsub = self._coordinator.async_add_listener(self._async_handle_update)
+
+    async def async_stop(self):
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        if self._pending:
+            await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _async_handle_update(self):
+        coordinator = self._coordinator
+        if self._pending or coordinator.stale or not coordinator.last_update_success:
+            return
+        if coordinator.last_good_update is None or not coordinator.data:
+            return
+        # async_delay_save restarts its timer on every call, so only schedule
+        # when no save is pending or a 30 s poll would postpone it forever
+        self._pending = True
+        self._store.async_delay_save(self._data_to_save, CACHE_SAVE_DELAY)
+
+    def _data_to_save(self):
+        self._pending = False
+        coordinator = self._coordinator
+        return {
+            "host": coordinator.host,
+            "saved_at": coordinator.last_good_update.isoformat(),
+            "payload": coordinator.data,
+            "entities": sorted([list(key) for key in coordinator.entity_keys], key=str),
+            "rain": coordinator.rain.as_dict() if coordinator.rain is not None else None,
+            "air_quality": coordinator.air_quality.as_dict() if coordinator.air_quality is not None else None,
+        }
@@ -0,0 +1,168 @@
+"""Capture raw device responses and real-time packets for replay.
+
+A capture is a gzip file with one JSON document per line: current_conditions
+payloads as returned by the device, plus a `captured_at` time, and real-time
+packets as `{"captured_at": ..., "realtime": packet}`. The payload lines are
+what `backfill.read_payload_file` expects, so captures can be imported as
+statistics as well as replayed by `benchmarks/replay.py`.
+"""
+from datetime import timedelta
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .const import CAPTURE_FILENAME, CAPTURE_FLUSH_INTERVAL, DEFAULT_CAPTURE_DURATION, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+REALTIME = "realtime"
+
+
+def encode_payload(payload, captured_at):
+    return json.dumps({"captured_at": captured_at, **payload}, separators=(",", ":"))
+
+
+def encode_packet(packet, captured_at):
+    return json.dumps({"captured_at": captured_at, REALTIME: packet}, separators=(",", ":"))
+
+
+def read_capture(path):
+    """Return (captured_at, kind, document) tuples in capture order.
+
+    `kind` is "payload" for current_conditions responses and "realtime" for
+    broadcast packets.
+    """
+    opener = gzip.open if str(path).endswith(".gz") else open
+    events = []
+    with opener(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            document = json.loads(line)
+            captured_at = document.pop("captured_at", None)
+            if REALTIME in document:
+                events.append((captured_at, REALTIME, document[REALTIME]))
+            else:
+                events.append((captured_at, "payload", document))
+    return events
+
+
+def _append_lines(path, lines):
+    # Every flush appends a gzip member; gzip readers treat them as one stream
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, "at", encoding="utf-8", compresslevel=6) as file:
+        file.write("\n".join(lines))
+        file.write("\n")
+
+
+class PayloadCapture:
+    """Records what the API receives for `duration` minutes.
+
+    Lines are encoded as they arrive, since real-time packets are merged into
+    the payload in place, and written from the executor in batches.
+    """
+
+    def __init__(self, hass: HomeAssistant, api, path: str):
+        self._hass = hass
+        self._api = api
+        self.path = path
+        self._pending = []
+        self._cancel_flush = None
+        self._cancel_expiry = None
+        self._flush_lock = asyncio.Lock()
+        self.recorded = 0
+
+    @callback
+    def async_start(self, duration: float = DEFAULT_CAPTURE_DURATION):
+        self._api.capture = self
+        self._cancel_flush = async_track_time_interval(
+            self._hass, self._async_flush, timedelta(seconds=CAPTURE_FLUSH_INTERVAL)
+        )
+        self._cancel_expiry = async_call_later(self._hass, duration * 60, self._async_expired)
+        _LOGGER.info("Capturing %s for %s minutes to %s", self._api.host, duration, self.path)
+
+    async def async_stop(self):
+        if self._api.capture is self:
+            self._api.capture = None
+        if self._cancel_flush is not None:
+            self._cancel_flush()
+            self._cancel_flush = None
+        if self._cancel_expiry is not None:
+            self._cancel_expiry()
+            self._cancel_expiry = None
+        await self._async_flush()
+        _LOGGER.info("Captured %s documents from %s to %s", self.recorded, self._api.host, self.path)
+
+    async def _async_expired(self, _now):
+        self._cancel_expiry = None
+        await self.async_stop()
+
+    @callback
+    def record_payload(self, payload):
+        self._pending.append(encode_payload(payload, time.time()))
+
+    @callback
+    def record_packet(self, packet):
+        self._pending.append(encode_packet(packet, time.time()))
+
+    async def _async_flush(self, _now=None):
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            lines, self._pending = self._pending, []
+            try:
+                await self._hass.async_add_executor_job(_append_lines, self.path, lines)
+            except OSError as err:
+                _LOGGER.warning("Could not write %s captured documents: %s", len(lines), err)
+                return
+            self.recorded += len(lines)
+
+
+def _capture_dir(hass):
+    """Default directory for captures: the first media directory.
+
+    Media directories are in allowlist_external_dirs by default, so the
+    capture can be imported or replayed without extra configuration. The
+    config directory is not, and www would be served publicly.
+    """
+    return next(iter(hass.config.media_dirs.values()), None) or hass.config.path("media")
+
+
+async def async_handle_capture(hass, call):
+    entry_ids = [call.data["entry_id"]] if call.data.get("entry_id") else [
+        entry.entry_id for entry in hass.config_entries.async_entries(DOMAIN)
+    ]
+    duration = call.data.get("duration", DEFAULT_CAPTURE_DURATION)
+    if call.data.get("file") and len(entry_ids) > 1:
+        raise HomeAssistantError("A capture file can only be given when capturing a single device")
+
+    # Check every path before starting anything
+    captures = []
+    for entry_id in entry_ids:
+        coordinator = hass.data[DOMAIN].get(entry_id)
+        if coordinator is None:
+            raise HomeAssistantError(f"Unknown Weatherlink entry {entry_id}")
+        path = call.data.get("file") or os.path.join(_capture_dir(hass), CAPTURE_FILENAME.format(
+            host=coordinator.host.replace(":", "_"),
+            stamp=dt_util.utcnow().strftime("%Y%m%d%H%M%S"),
+        ))
+        if not hass.config.is_allowed_path(path):
+            raise HomeAssistantError(
+                f"Access to {path} is not allowed, add its directory to allowlist_external_dirs"
+            )
+        captures.append((coordinator, path))
+
+    for coordinator, path in captures:
+        # A new capture replaces a running one
+        if coordinator.api.capture is not None:
+            await coordinator.api.capture.async_stop()
+        PayloadCapture(hass, coordinator.api, path).async_start(duration)
@@ -1,12 +1,67 @@
 from homeassistant import config_entries
 from homeassistant.const import CONF_NAME, CONF_HOST
+from homeassistant.core import callback
 import voluptuous as vol
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_ADAPTIVE,
+    CONF_AIR_QUALITY,
+    CONF_AQI_STANDARD,
+    CONF_ARCHIVE,
+    CONF_ARCHIVE_RETENTION_DAYS,
+    CONF_DEADBAND,
+    CONF_DEADBANDS,
+    CONF_DERIVED,
+    CONF_RAIN,
+    CONF_RAIN_DAY_START,
+    CONF_RAIN_WINDOWS,
+    CONF_HEARTBEAT,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_METRICS,
+    CONF_PROXY,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_HUB_MODE,
+    CONF_REALTIME,
+    CONF_REQUEST_TIMEOUT,
+    CONF_STALENESS_WINDOW,
+    CONF_STATISTICS,
+    CONF_STATISTICS_WINDOWS,
+    DEFAULT_ADAPTIVE,
+    DEFAULT_AIR_QUALITY,
+    DEFAULT_AQI_STANDARD,
+    DEFAULT_ARCHIVE,
+    DEFAULT_ARCHIVE_RETENTION_DAYS,
+    DEFAULT_DEADBAND,
+    DEFAULT_DEADBANDS,
+    DEFAULT_DERIVED,
+    DEFAULT_RAIN,
+    DEFAULT_RAIN_DAY_START,
+    DEFAULT_RAIN_WINDOWS,
+    DEFAULT_HEARTBEAT,
+    DEFAULT_HUB_MODE,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_METRICS,
+    DEFAULT_PROXY,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_REALTIME,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_STALENESS_WINDOW,
+    DEFAULT_STATISTICS,
+    DEFAULT_STATISTICS_WINDOWS,
+)
+from .air import STANDARD_EU_CAQI, STANDARD_US_EPA
+from .deadband import parse_deadbands
+from .stats import parse_windows
 
 
 class WeatherlinkConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return WeatherlinkOptionsFlow()
+
     async def async_step_user(self, user_input=None):
         if user_input is not None:
             return self.async_create_entry(
@@ -25,3 +80,155 @@ class WeatherlinkConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 "host": "192.168.1.100"
             }
         )
+
+
+class WeatherlinkOptionsFlow(config_entries.OptionsFlow):
+    async def async_step_init(self, user_input=None):
+        errors = {}
+        if user_input is not None:
+            if user_input.get(CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL) > user_input.get(
+                CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+            ):
+                errors["base"] = "invalid_interval_bounds"
+            elif not _valid_windows(user_input.get(CONF_STATISTICS_WINDOWS, DEFAULT_STATISTICS_WINDOWS)):
+                errors[CONF_STATISTICS_WINDOWS] = "invalid_windows"
+            elif not _valid_windows(user_input.get(CONF_RAIN_WINDOWS, DEFAULT_RAIN_WINDOWS)):
+                errors[CONF_RAIN_WINDOWS] = "invalid_windows"
+            elif not _valid_deadbands(user_input.get(CONF_DEADBANDS, DEFAULT_DEADBANDS)):
+                errors[CONF_DEADBANDS] = "invalid_deadbands"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Optional(
+                    CONF_REALTIME,
+                    default=options.get(CONF_REALTIME, DEFAULT_REALTIME),
+                    description="Listen for the 2.5 s real-time UDP broadcast (Weatherlink Live only)",
+                ): bool,
+                vol.Optional(
+                    CONF_HUB_MODE,
+                    default=options.get(CONF_HUB_MODE, DEFAULT_HUB_MODE),
+                    description="Poll this device from the shared scheduler used by all hub-mode devices",
+                ): bool,
+                vol.Optional(
+                    CONF_REQUEST_TIMEOUT,
+                    default=options.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT),
+                    description="Seconds to wait for the device before a poll fails",
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=60)),
+                vol.Optional(
+                    CONF_STALENESS_WINDOW,
+                    default=options.get(CONF_STALENESS_WINDOW, DEFAULT_STALENESS_WINDOW),
+                    description="Seconds to keep showing the last data while the device is unreachable",
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=86400)),
+                vol.Optional(
+                    CONF_ADAPTIVE,
+                    default=options.get(CONF_ADAPTIVE, DEFAULT_ADAPTIVE),
+                    description="Adapt the poll interval to the device report cadence and the weather",
+                ): bool,
+                vol.Optional(
+                    CONF_MIN_UPDATE_INTERVAL,
+                    default=options.get(CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL),
+                    description="Shortest adaptive poll interval in seconds",
+                ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                vol.Optional(
+                    CONF_MAX_UPDATE_INTERVAL,
+                    default=options.get(CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL),
+                    description="Longest adaptive poll interval in seconds",
+                ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                vol.Optional(
+                    CONF_STATISTICS,
+                    default=options.get(CONF_STATISTICS, DEFAULT_STATISTICS),
+                    description="Add rolling min/max/mean/p95 sensors for temperature, wind and PM",
+                ): bool,
+                vol.Optional(
+                    CONF_STATISTICS_WINDOWS,
+                    default=options.get(CONF_STATISTICS_WINDOWS, DEFAULT_STATISTICS_WINDOWS),
+                    description="Comma separated window lengths in minutes",
+                ): str,
+                vol.Optional(
+                    CONF_DERIVED,
+                    default=options.get(CONF_DERIVED, DEFAULT_DERIVED),
+                    description="Add feels-like, wet bulb, absolute humidity, cloud base, air density and ET sensors",
+                ): bool,
+                vol.Optional(
+                    CONF_RAIN,
+                    default=options.get(CONF_RAIN, DEFAULT_RAIN),
+                    description="Add rain day, rain event, last hours and rate sensors computed from the rain counters",
+                ): bool,
+                vol.Optional(
+                    CONF_RAIN_DAY_START,
+                    default=options.get(CONF_RAIN_DAY_START, DEFAULT_RAIN_DAY_START),
+                    description="Local hour at which the rain day starts",
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=23)),
+                vol.Optional(
+                    CONF_RAIN_WINDOWS,
+                    default=options.get(CONF_RAIN_WINDOWS, DEFAULT_RAIN_WINDOWS),
+                    description="Comma separated rain window lengths in hours",
+                ): str,
+                vol.Optional(
+                    CONF_AIR_QUALITY,
+                    default=options.get(CONF_AIR_QUALITY, DEFAULT_AIR_QUALITY),
+                    description="Add NowCast and air quality index sensors computed from the AirLink PM samples",
+                ): bool,
+                vol.Optional(
+                    CONF_AQI_STANDARD,
+                    default=options.get(CONF_AQI_STANDARD, DEFAULT_AQI_STANDARD),
+                    description="Air quality index: US EPA AQI or European CAQI",
+                ): vol.In([STANDARD_US_EPA, STANDARD_EU_CAQI]),
+                vol.Optional(
+                    CONF_ARCHIVE,
+                    default=options.get(CONF_ARCHIVE, DEFAULT_ARCHIVE),
+                    description="Keep an on-disk archive of the raw samples",
+                ): bool,
+                vol.Optional(
+                    CONF_ARCHIVE_RETENTION_DAYS,
+                    default=options.get(CONF_ARCHIVE_RETENTION_DAYS, DEFAULT_ARCHIVE_RETENTION_DAYS),
+                    description="Days to keep archived samples",
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3650)),
+                vol.Optional(
+                    CONF_DEADBAND,
+                    default=options.get(CONF_DEADBAND, DEFAULT_DEADBAND),
+                    description="Only write a state when the value moved by more than its deadband",
+                ): bool,
+                vol.Optional(
+                    CONF_DEADBANDS,
+                    default=options.get(CONF_DEADBANDS, DEFAULT_DEADBANDS),
+                    description="Comma separated device_class=deadband pairs, in the sensor's unit",
+                ): str,
+                vol.Optional(
+                    CONF_HEARTBEAT,
+                    default=options.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT),
+                    description="Seconds after which a change within the deadband is written anyway",
+                ): vol.All(vol.Coerce(int), vol.Range(min=30, max=86400)),
+                vol.Optional(
+                    CONF_PROXY,
+                    default=options.get(CONF_PROXY, DEFAULT_PROXY),
+                    description="Serve the last payload to other local consumers at /api/ha-weatherlink/<host>/v1/current_conditions",
+                ): bool,
+                vol.Optional(
+                    CONF_METRICS,
+                    default=options.get(CONF_METRICS, DEFAULT_METRICS),
+                    description="Time the polling hot path and add diagnostic sensors for it",
+                ): bool,
+            }),
+            errors=errors,
+        )
+
+
+def _valid_windows(text):
+    try:
+        parse_windows(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _valid_deadbands(text):
+    try:
+        parse_deadbands(text)
+    except ValueError:
+        return False
+    return True
@@ -4,7 +4,145 @@ VERSION = "1.0.0"
 CONF_UPDATE_INTERVAL = "update_interval"
 CONF_HOST = "host"
 CONF_NAME = "Name"
+CONF_REALTIME = "realtime"
+CONF_HUB_MODE = "hub_mode"
+CONF_REQUEST_TIMEOUT = "request_timeout"
+CONF_ADAPTIVE = "adaptive"
+CONF_MIN_UPDATE_INTERVAL = "min_update_interval"
+CONF_MAX_UPDATE_INTERVAL = "max_update_interval"
+CONF_STATISTICS = "statistics"
+CONF_STATISTICS_WINDOWS = "statistics_windows"
+CONF_ARCHIVE = "archive"
+CONF_ARCHIVE_RETENTION_DAYS = "archive_retention_days"
+CONF_METRICS = "metrics"
+CONF_STALENESS_WINDOW = "staleness_window"
+CONF_DEADBAND = "deadband"
+CONF_DEADBANDS = "deadbands"
+CONF_HEARTBEAT = "heartbeat"
+CONF_PROXY = "proxy"
+CONF_DERIVED = "derived"
+CONF_RAIN = "rain"
+CONF_RAIN_DAY_START = "rain_day_start"
+CONF_RAIN_WINDOWS = "rain_windows"
+CONF_AIR_QUALITY = "air_quality"
+CONF_AQI_STANDARD = "aqi_standard"
+
+SERVICE_IMPORT_STATISTICS = "import_statistics"
 
 DEFAULT_UPDATE_INTERVAL = 30
 
+# Adaptive polling: the interval moves between these bounds depending on how
+# often the device reports new data and how active the weather is
+DEFAULT_ADAPTIVE = False
+DEFAULT_MIN_UPDATE_INTERVAL = 10
+DEFAULT_MAX_UPDATE_INTERVAL = 300
+ADAPTIVE_BACKOFF_FACTOR = 1.5
+ADAPTIVE_RAIN_RATE_ACTIVE = 1  # bucket tips per hour
+ADAPTIVE_WIND_SPEED_ACTIVE = 20  # mph
+ADAPTIVE_WIND_DELTA_ACTIVE = 5  # mph change between polls
+DEFAULT_REQUEST_TIMEOUT = 10
+
+# The Weatherlink Live / AirLink only handle a couple of sockets at a time,
+# so keep the pool per host small and reuse the connection between polls.
+DEFAULT_CONNECTION_LIMIT_PER_HOST = 2
+DEFAULT_KEEPALIVE_TIMEOUT = 2 * DEFAULT_UPDATE_INTERVAL
+# Refresh requests this many seconds after a completed poll reuse its result
+DEFAULT_COALESCE_WINDOW = 2
+
 API_URL = "http://{host}/v1/current_conditions"
+REALTIME_URL = "http://{host}/v1/real_time?duration={duration}"
+
+# Real-time UDP broadcast (Weatherlink Live only). The device sends a packet
+# every 2.5 s for `duration` seconds after each real_time request.
+REALTIME_PORT = 22222
+DEFAULT_REALTIME = False
+DEFAULT_REALTIME_DURATION = 1200
+REALTIME_RENEW_MARGIN = 60
+REALTIME_STALE_AFTER = 10
+# HTTP poll interval while the UDP stream is healthy
+REALTIME_POLL_INTERVAL = 300
+
+# Hub mode: entries that opt in are polled from one shared scheduler with a
+# bounded number of requests in flight, spread evenly over the interval
+HUB = "hub"
+DEFAULT_HUB_MODE = False
+DEFAULT_HUB_MAX_CONCURRENCY = 4
+
+# Rolling statistics: tracked fields and window lengths in minutes
+DEFAULT_STATISTICS = False
+DEFAULT_STATISTICS_WINDOWS = "5, 60, 1440"
+DEFAULT_STATISTICS_KEYS = ("temp", "temp_in", "wind_speed_last", "pm_2p5", "pm_10")
+# Time buckets kept per window; 30 s buckets over 24 h
+DEFAULT_STATISTICS_CAPACITY = 2880
+
+# Local archive of raw samples (SQLite in the config directory)
+DEFAULT_ARCHIVE = False
+DEFAULT_ARCHIVE_RETENTION_DAYS = 730
+# Samples older than this are thinned out to one per ARCHIVE_COMPACT_RESOLUTION
+DEFAULT_ARCHIVE_FULL_RESOLUTION_DAYS = 30
+ARCHIVE_COMPACT_RESOLUTION = 600
+ARCHIVE_COMPACT_EVERY = 86400
+ARCHIVE_FLUSH_INTERVAL = 60
+ARCHIVE_MAX_BATCH = 500
+# Rows fetched at a time when reading the archive back
+ARCHIVE_READ_BATCH = 1000
+ARCHIVE_FILENAME = "ha-weatherlink_{entry_id}.db"
+
+# Hot-path instrumentation, exposed in diagnostics and optional sensors
+DEFAULT_METRICS = False
+# Upper bounds of the latency histogram buckets in milliseconds
+METRICS_LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+METRICS_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Circuit breaker for unreachable devices: after BREAKER_FAILURE_THRESHOLD
+# failed polls the device is only probed, with exponential backoff
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_BASE_BACKOFF = DEFAULT_UPDATE_INTERVAL
+BREAKER_MAX_BACKOFF = 900
+BREAKER_JITTER = 0.2
+# Seconds the last good data is served while the device is unreachable
+DEFAULT_STALENESS_WINDOW = 600
+
+# Last good payload and entity set, kept in .storage for a fast startup
+CACHE_VERSION = 1
+CACHE_KEY = "ha-weatherlink.{entry_id}"
+CACHE_SAVE_DELAY = 300
+
+# Deadbands: a state is only written when the value moved by at least the
+# deadband of its device class (in the sensor's native unit), or when it has
+# not been written for the heartbeat interval
+DEFAULT_DEADBAND = False
+DEFAULT_DEADBANDS = (
+    "temperature=0.1, humidity=0.5, pressure=0.003, wind_speed=0.5, "
+    "wind_direction=5, illuminance=5, uv_index=0.1, pm1=1, pm25=1, pm10=1"
+)
+DEFAULT_HEARTBEAT = 900
+
+# Local proxy serving the last payload to other consumers through Home
+# Assistant's HTTP server
+PROXY = "proxy"
+DEFAULT_PROXY = False
+PROXY_URL = "/api/ha-weatherlink/{host}/v1/current_conditions"
+
+# Capture of raw responses and real-time packets for replay
+SERVICE_CAPTURE = "capture"
+DEFAULT_CAPTURE_DURATION = 60
+CAPTURE_FILENAME = "ha-weatherlink_capture_{host}_{stamp}.jsonl.gz"
+CAPTURE_FLUSH_INTERVAL = 10
+
+# Derived values (feels-like, wet bulb, cloud base, ...) as extra sensors
+DEFAULT_DERIVED = False
+
+# Local rain accumulation from the counters: rain day starting at a local
+# hour, last-N-hour windows, events separated by a dry spell, and a rate
+# from the spacing of the tips
+DEFAULT_RAIN = False
+DEFAULT_RAIN_DAY_START = 0
+DEFAULT_RAIN_WINDOWS = "1, 3, 24"
+RAIN_EVENT_DRY_GAP = 6 * 3600
+# With no tip for this long the rate drops to zero
+RAIN_RATE_TIMEOUT = 15 * 60
+
+# NowCast and air quality index computed from the AirLink PM samples
+DEFAULT_AIR_QUALITY = False
+DEFAULT_AQI_STANDARD = "us_epa"
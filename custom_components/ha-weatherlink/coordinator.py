@@ -1,15 +1,56 @@
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from homeassistant.core import HomeAssistant
-from .const import DOMAIN, DEFAULT_UPDATE_INTERVAL
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+from .const import (
+    DOMAIN,
+    DEFAULT_HEARTBEAT,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_STALENESS_WINDOW,
+    DEFAULT_UPDATE_INTERVAL,
+    REALTIME_POLL_INTERVAL,
+)
 from datetime import timedelta
+from .breaker import CircuitBreaker
 from .davis import DavisWeatherlinkApi
+from .metrics import NULL_METRICS
+from .models import parse_condition, parse_conditions
+from .realtime import merge_realtime_packet
+import aiohttp
 import logging
+import time
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def condition_id(cond):
+    """Return the id that identifies a condition object across polls."""
+    return cond.get("lsid") or cond.get("txid")
+
+
+def condition_stamp(cond):
+    """Return the report time of a condition, if the device sends one."""
+    return cond.get("ts") or cond.get("last_report_time")
+
+
+def index_conditions(data):
+    """Index the condition objects of a payload by lsid (or txid)."""
+    conditions = ((data or {}).get("data") or {}).get("conditions") or []
+    index = {}
+    for cond in conditions:
+        cond_id = condition_id(cond)
+        if cond_id is not None:
+            index[cond_id] = cond
+    return index
+
+
 class WeatherlinkCoordinator(DataUpdateCoordinator):
-    def __init__(self, hass: HomeAssistant, host: str):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        session: aiohttp.ClientSession | None = None,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+    ):
         super().__init__(
             hass,
             _LOGGER,
@@ -17,11 +58,272 @@ class WeatherlinkCoordinator(DataUpdateCoordinator):
             # Set your desired update interval
             update_interval=timedelta(seconds=DEFAULT_UPDATE_INTERVAL),
         )
-        self._api = DavisWeatherlinkApi(host)
+        self._api = DavisWeatherlinkApi(host, session, request_timeout)
         self._host = host
+        self.realtime = None
+        # Set when the entry is polled by the shared WeatherlinkHub, which
+        # then takes over scheduling from the coordinator's own timer
+        self.hub = None
+        self.poll_interval = timedelta(seconds=DEFAULT_UPDATE_INTERVAL)
+        # Duration of the last HTTP round trip, in milliseconds
+        self.last_poll_latency = None
+        # AdaptivePollInterval when adaptive polling is enabled
+        self.adaptive = None
+        # Last stream state passed to async_set_realtime_healthy
+        self._realtime_streaming = False
+        # Engines computing extra values from the records (statistics, ...);
+        # each gets async_update(records, changed) after every update
+        self.engines = []
+        self.statistics = None
+        self.derived = None
+        self.rain = None
+        self.air_quality = None
+        self.archive = None
+        # Condition objects of the latest payload, keyed by lsid (or txid),
+        # and the same conditions parsed into records for the entities
+        self.conditions = {}
+        self.records = {}
+        # Ids of the conditions that changed in the latest update; entities
+        # of other conditions skip their update entirely
+        self.changed_conditions = set()
+        self.polls = 0
+        self.unchanged_payloads = 0
+        self.parsed_conditions = 0
+        self.skipped_conditions = 0
+        # Metrics when instrumentation is enabled; shared with the API
+        self.metrics = NULL_METRICS
+        self.breaker = CircuitBreaker()
+        # While the device is unreachable the last good data is served for
+        # up to staleness_window seconds, with the entities marked stale
+        self.staleness_window = DEFAULT_STALENESS_WINDOW
+        self.stale = False
+        self.last_good_update = None
+        self._last_good_at = None
+        # (condition id, key) of every entity the sensor platform created,
+        # persisted by the WeatherlinkCache together with the last payload
+        self.entity_keys = set()
+        self.cache = None
+        self.proxy = None
+        # Deadband per device class when deadband reporting is enabled, and
+        # the longest a suppressed change may go unwritten
+        self.deadbands = {}
+        self.heartbeat = DEFAULT_HEARTBEAT
+
+    @property
+    def api(self) -> DavisWeatherlinkApi:
+        return self._api
+
+    @property
+    def host(self) -> str:
+        return self._host
 
     async def _async_update_data(self):
+        now = time.monotonic()
+        if not self.breaker.allow_request(now):
+            # Skip the request entirely instead of waiting out another timeout
+            self.metrics.increment("short_circuited_polls")
+            return self._async_serve_stale(
+                f"{self._host} is unreachable, next attempt in {self.breaker.retry_in(now):.0f}s"
+            )
+        started = time.perf_counter()
         try:
-            return await self._api.async_get_current_conditions()
+            data = await self._api.async_get_current_conditions()
         except Exception as err:
-            raise UpdateFailed(f"Error communicating with API: {err}")
+            self.metrics.increment("failed_polls")
+            if self.breaker.record_failure(time.monotonic()):
+                _LOGGER.warning(
+                    "%s is unreachable, retrying in %.0fs: %s",
+                    self._host, self.breaker.retry_in(time.monotonic()), err,
+                )
+            return self._async_serve_stale(f"Error communicating with API: {err}")
+        if self.breaker.record_success():
+            _LOGGER.info("%s is reachable again", self._host)
+        self.stale = False
+        self.last_good_update = dt_util.utcnow()
+        self._last_good_at = time.monotonic()
+        self.last_poll_latency = round((time.perf_counter() - started) * 1000, 1)
+        self.metrics.observe("poll_ms", self.last_poll_latency)
+        self.polls += 1
+
+        if self._api.payload_unchanged and data is self.data:
+            # Byte-identical response, nothing to parse or write
+            self.unchanged_payloads += 1
+            self.skipped_conditions += len(self.conditions)
+            self.changed_conditions = set()
+        else:
+            self._async_parse_conditions(index_conditions(data))
+
+        if self.adaptive is not None and not self.realtime_healthy:
+            seconds = self.adaptive.update(self.conditions)
+            self.async_set_poll_interval(timedelta(seconds=seconds))
+        self.metrics.observe_since("update_ms", started)
+        return data
+
+    @callback
+    def async_restore(self, cached):
+        """Start from a cached payload until the first poll comes back.
+
+        The restored data is served as stale, and only for what is left of
+        the staleness window since it was saved. Engines are not fed, they
+        only see live data; only the rain totals and the hourly PM buckets
+        are restored.
+        """
+        self.data = cached["payload"]
+        self.conditions = index_conditions(self.data)
+        self.records = parse_conditions(self.conditions)
+        self.entity_keys = set(cached["entities"])
+        self.stale = True
+        self.last_good_update = cached["saved_at"]
+        age = (dt_util.utcnow() - cached["saved_at"]).total_seconds()
+        self._last_good_at = time.monotonic() - max(age, 0)
+        if self.rain is not None:
+            self.rain.restore(cached.get("rain"))
+        if self.air_quality is not None:
+            self.air_quality.restore(cached.get("air_quality"))
+
+    def _async_serve_stale(self, reason):
+        # Keep the entities on the last good data while it is younger than
+        # the staleness window, so a short outage does not flip every entity
+        # to unavailable and back
+        if (
+            self.data is None
+            or self._last_good_at is None
+            or time.monotonic() - self._last_good_at > self.staleness_window
+        ):
+            self.stale = False
+            raise UpdateFailed(reason)
+        self.stale = True
+        self.changed_conditions = set()
+        return self.data
+
+    def _async_parse_conditions(self, conditions):
+        # Only parse the conditions whose report time (or, for conditions
+        # without one, content) changed since the previous poll
+        started = time.perf_counter()
+        previous = self.conditions
+        records = {}
+        changed = set()
+        for cond_id, cond in conditions.items():
+            record = self.records.get(cond_id)
+            old = previous.get(cond_id)
+            if record is not None and old is not None:
+                stamp = condition_stamp(cond)
+                if (stamp is not None and stamp == condition_stamp(old)) or cond == old:
+                    records[cond_id] = record
+                    self.skipped_conditions += 1
+                    continue
+            records[cond_id] = parse_condition(cond)
+            changed.add(cond_id)
+            self.parsed_conditions += 1
+
+        self.conditions = conditions
+        self.records = records
+        self.changed_conditions = changed
+        self.metrics.observe_since("parse_ms", started)
+        self._async_update_engines()
+
+    def _async_update_engines(self):
+        if not self.engines:
+            return
+        started = time.perf_counter()
+        for engine in self.engines:
+            engine.async_update(self.records, self.changed_conditions)
+        self.metrics.observe_since("engines_ms", started)
+
+    @callback
+    def async_update_listeners(self):
+        metrics = self.metrics
+        if not metrics.enabled:
+            super().async_update_listeners()
+            return
+        # Entities count their own state writes; the difference is the
+        # number written by this update
+        writes = metrics.counters["entity_writes"]
+        started = time.perf_counter()
+        super().async_update_listeners()
+        metrics.observe_since("fan_out_ms", started)
+        metrics.observe_count("entities_written", metrics.counters["entity_writes"] - writes)
+
+    @property
+    def skip_ratios(self):
+        parsed = self.parsed_conditions + self.skipped_conditions
+        return {
+            "unchanged_payloads": self.unchanged_payloads / self.polls if self.polls else 0.0,
+            "skipped_conditions": self.skipped_conditions / parsed if parsed else 0.0,
+        }
+
+    @property
+    def realtime_healthy(self) -> bool:
+        return self.realtime is not None and self.realtime.healthy
+
+    @callback
+    def async_merge_realtime(self, packet) -> bool:
+        """Merge a UDP broadcast packet into the current data and notify listeners."""
+        merged = merge_realtime_packet(self.data, packet)
+        if not merged:
+            return False
+        for cond_id in merged:
+            if cond_id in self.conditions:
+                self.records[cond_id] = parse_condition(self.conditions[cond_id])
+        self.changed_conditions = merged
+        self._async_update_engines()
+        # Not async_set_updated_data: that would push back the HTTP poll on
+        # every packet and the full payload would never be refreshed
+        self.async_update_listeners()
+        return True
+
+    @callback
+    def async_set_realtime_healthy(self, healthy: bool):
+        # The watchdog reports a down stream on every tick, only act when
+        # the state flips
+        if healthy == self._realtime_streaming:
+            return
+        self._realtime_streaming = healthy
+        if healthy:
+            seconds = REALTIME_POLL_INTERVAL
+        elif self.adaptive is not None:
+            seconds = self.adaptive.update(self.conditions)
+        else:
+            seconds = DEFAULT_UPDATE_INTERVAL
+        interval = timedelta(seconds=seconds)
+        _LOGGER.debug(
+            "Real-time stream for %s is %s, polling every %ss",
+            self._host, "healthy" if healthy else "down", seconds,
+        )
+        self.async_set_poll_interval(interval)
+        if not healthy:
+            # Pick the fast cadence back up right away instead of waiting
+            # out the remainder of the slow interval
+            self.async_poll_soon()
+
+    @callback
+    def async_set_poll_interval(self, interval: timedelta):
+        self.poll_interval = interval
+        if self.hub is None:
+            self.update_interval = interval
+
+    @callback
+    def async_poll_soon(self):
+        if self.hub is not None:
+            self.hub.async_poll_soon(self)
+        else:
+            self.hass.async_create_task(self.async_request_refresh())
+
+    async def async_close(self):
+        if self.hub is not None:
+            self.hub.async_remove(self)
+        if self.proxy is not None:
+            self.proxy.async_remove(self)
+            self.proxy = None
+        if self._api.capture is not None:
+            await self._api.capture.async_stop()
+        if self.cache is not None:
+            await self.cache.async_stop()
+            self.cache = None
+        if self.archive is not None:
+            await self.archive.async_stop()
+            self.archive = None
+        if self.realtime is not None:
+            await self.realtime.async_stop()
+            self.realtime = None
+        await self._api.async_close()
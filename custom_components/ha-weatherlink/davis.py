@@ -1,15 +1,153 @@
+import asyncio
+import hashlib
+import json
+import time
 import aiohttp
 import async_timeout
-from .const import API_URL
+from .const import (
+    API_URL,
+    REALTIME_URL,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_CONNECTION_LIMIT_PER_HOST,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_REQUEST_TIMEOUT,
+)
+from .metrics import NULL_METRICS
+
+try:
+    # Home Assistant ships orjson; fall back to the stdlib when it is missing
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(body: bytes):
+    """Decode a JSON response body straight from bytes."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def create_session(
+    limit_per_host: int = DEFAULT_CONNECTION_LIMIT_PER_HOST,
+    keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+) -> aiohttp.ClientSession:
+    """Create a keep-alive session for polling Weatherlink devices."""
+    connector = aiohttp.TCPConnector(
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+    )
+    return aiohttp.ClientSession(connector=connector)
 
 
 class DavisWeatherlinkApi:
-    def __init__(self, host: str):
+    def __init__(
+        self,
+        host: str,
+        session: aiohttp.ClientSession | None = None,
+        timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        coalesce_window: float = DEFAULT_COALESCE_WINDOW,
+    ):
         self._host = host
+        self._timeout = timeout
+        self._coalesce_window = coalesce_window
+        self._inflight = None
+        self._last_result = None
+        self._last_result_at = 0.0
+        # Number of callers that were served by another caller's request
+        self.coalesced = 0
+        # Digest of the last response body; when the next body hashes the
+        # same, the previous decoded payload is returned as is
+        self._last_digest = None
+        self._last_payload = None
+        self.payload_unchanged = False
+        self.metrics = NULL_METRICS
+        # PayloadCapture while a capture is running
+        self.capture = None
+        self._url = API_URL.format(host=host)
+        # The session is kept open between polls so the connection to the
+        # device is reused; it is closed in async_close
+        self._session = session
+
+    @property
+    def host(self) -> str:
+        return self._host
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = create_session()
+        return self._session
 
     async def async_get_current_conditions(self):
-        async with async_timeout.timeout(10):
-            async with aiohttp.ClientSession() as session:
-                async with session.get(API_URL.format(host=self._host)) as response:
+        """Return the current conditions, sharing requests between callers.
+
+        Callers arriving while a request is in flight wait for that request,
+        and callers within `coalesce_window` seconds of a successful one get
+        its result. The device never sees more than one request at a time.
+        """
+        if self._inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(self._inflight)
+        if (
+            self._last_result is not None
+            and time.monotonic() - self._last_result_at < self._coalesce_window
+        ):
+            self.coalesced += 1
+            return self._last_result
+
+        # A task so that a cancelled caller does not cancel the request for
+        # everyone else waiting on it
+        self._inflight = asyncio.ensure_future(self._async_fetch_current_conditions())
+        self._inflight.add_done_callback(self._fetch_done)
+        return await asyncio.shield(self._inflight)
+
+    def _fetch_done(self, task):
+        self._inflight = None
+        if not task.cancelled() and task.exception() is None:
+            self._last_result = task.result()
+            self._last_result_at = time.monotonic()
+
+    async def _async_fetch_current_conditions(self):
+        metrics = self.metrics
+        started = time.perf_counter()
+        try:
+            async with async_timeout.timeout(self._timeout):
+                async with self.session.get(self._url) as response:
                     response.raise_for_status()
-                    return await response.json()
+                    body = await response.read()
+        except Exception as err:
+            metrics.increment(f"errors.{type(err).__name__}")
+            raise
+        metrics.observe_since("fetch_ms", started)
+        metrics.increment("bytes_received", len(body))
+
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        self.payload_unchanged = digest == self._last_digest and self._last_payload is not None
+        if not self.payload_unchanged:
+            started = time.perf_counter()
+            self._last_digest = digest
+            self._last_payload = json_loads(body)
+            metrics.observe_since("decode_ms", started)
+        if self.capture is not None:
+            # Real-time merges change the cached payload in place, record
+            # what the device sent instead. Encoded right away, so a payload
+            # decoded just now is still untouched.
+            self.capture.record_payload(json_loads(body) if self.payload_unchanged else self._last_payload)
+        return self._last_payload
+
+    async def async_start_realtime(self, duration: int):
+        """Ask the device to broadcast live data over UDP for `duration` seconds."""
+        url = REALTIME_URL.format(host=self._host, duration=duration)
+        async with async_timeout.timeout(self._timeout):
+            async with self.session.get(url) as response:
+                response.raise_for_status()
+                result = json_loads(await response.read())
+        if result.get("error"):
+            raise aiohttp.ClientError(f"real_time request failed: {result['error']}")
+        return result.get("data") or {}
+
+    async def async_close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -0,0 +1,49 @@
+"""Deadband filtering of small state changes."""
+import time
+
+
+def parse_deadbands(text):
+    """Parse "device_class=deadband, ..." into a dict."""
+    deadbands = {}
+    for part in str(text).replace(";", ",").split(","):
+        if not part.strip():
+            continue
+        device_class, sep, value = part.partition("=")
+        if not sep or not device_class.strip():
+            raise ValueError(f"Expected device_class=deadband, got {part.strip()!r}")
+        deadband = float(value)
+        if deadband < 0:
+            raise ValueError("Deadbands must not be negative")
+        deadbands[device_class.strip().lower()] = deadband
+    return deadbands
+
+
+def within_deadband(written, value, deadband, circular=False):
+    """Return True if `value` is too close to the written value to report."""
+    if not isinstance(value, (int, float)) or not isinstance(written, (int, float)):
+        return False
+    delta = abs(value - written)
+    if circular:
+        # Wind direction wraps around, 358° and 2° are 4° apart
+        delta = min(delta % 360, 360 - delta % 360)
+    # Tolerance so that a step of exactly the deadband is still reported
+    return delta < deadband - 1e-9
+
+
+def deadband_suppressed(entity, signature):
+    """Return True if the new signature only moved the value within the deadband.
+
+    The value comes first in the signature; a change in anything else, or a
+    due heartbeat, is always written.
+    """
+    written = entity._written
+    return (
+        entity._deadband is not None
+        and written is not None
+        and signature[1:] == written[1:]
+        and within_deadband(
+            written[0], signature[0], entity._deadband,
+            entity._attr_device_class == "wind_direction",
+        )
+        and time.monotonic() - entity._written_at < entity.coordinator.heartbeat
+    )
@@ -0,0 +1,170 @@
+"""Derived meteorological values computed once per coordinator update.
+
+Records already hold temperatures in °C (see models.py), so everything here
+works in SI units; wind arrives in mph and pressure in inHg as the device
+reports them.
+"""
+import math
+
+from .models import BARO, ISS, TEMP_HUM
+
+MPH_TO_MS = 0.44704
+INHG_TO_HPA = 33.8638866667
+# Gas constants of dry air and water vapour, J/(kg·K)
+R_DRY = 287.058
+R_VAPOUR = 461.495
+# Albedo of the FAO-56 grass reference surface
+ALBEDO = 0.23
+
+DERIVED_KEYS = (
+    "feels_like",
+    "wet_bulb_temperature",
+    "absolute_humidity",
+    "cloud_base",
+    "air_density",
+    "evapotranspiration",
+)
+
+# Fields of each structure type: (temperature, humidity); only the ISS is
+# outside, so cloud base and ET are only computed for it
+INPUTS = {ISS: ("temp", "hum"), TEMP_HUM: ("temp_in", "hum_in")}
+
+
+def saturation_vapour_pressure(temp):
+    """hPa over water, Magnus formula with the Sonntag constants."""
+    return 6.112 * math.exp(17.62 * temp / (243.12 + temp))
+
+
+def dew_point(temp, hum):
+    gamma = math.log(hum / 100) + 17.62 * temp / (243.12 + temp)
+    return 243.12 * gamma / (17.62 - gamma)
+
+
+def wet_bulb(temp, hum):
+    """Stull (2011), within ±1 °C for 5-99 % humidity at sea level pressure."""
+    return (
+        temp * math.atan(0.151977 * math.sqrt(hum + 8.313659))
+        + math.atan(temp + hum)
+        - math.atan(hum - 1.676331)
+        + 0.00391838 * hum ** 1.5 * math.atan(0.023101 * hum)
+        - 4.686035
+    )
+
+
+def absolute_humidity(temp, hum):
+    """g/m³."""
+    return 216.7 * (hum / 100 * saturation_vapour_pressure(temp)) / (273.15 + temp)
+
+
+def heat_index(temp, hum):
+    """NWS heat index (Rothfusz regression) in °C."""
+    f = temp * 9 / 5 + 32
+    index = 0.5 * (f + 61 + (f - 68) * 1.2 + hum * 0.094)
+    if (index + f) / 2 >= 80:
+        index = (
+            -42.379 + 2.04901523 * f + 10.14333127 * hum - 0.22475541 * f * hum
+            - 0.00683783 * f * f - 0.05481717 * hum * hum + 0.00122874 * f * f * hum
+            + 0.00085282 * f * hum * hum - 0.00000199 * f * f * hum * hum
+        )
+    return (index - 32) * 5 / 9
+
+
+def wind_chill(temp, wind_kmh):
+    """JAG/TI wind chill in °C."""
+    factor = wind_kmh ** 0.16
+    return 13.12 + 0.6215 * temp - 11.37 * factor + 0.3965 * temp * factor
+
+
+def feels_like(temp, hum, wind_ms):
+    # Heat index when hot and humid, wind chill when cold and windy
+    wind_kmh = (wind_ms or 0) * 3.6
+    if temp >= 26.7 and hum >= 40:
+        return heat_index(temp, hum)
+    if temp <= 10 and wind_kmh > 4.8:
+        return wind_chill(temp, wind_kmh)
+    return temp
+
+
+def air_density(temp, hum, pressure_hpa):
+    """kg/m³ of moist air."""
+    vapour = hum / 100 * saturation_vapour_pressure(temp)
+    kelvin = temp + 273.15
+    return ((pressure_hpa - vapour) * 100 / (R_DRY * kelvin)) + (vapour * 100 / (R_VAPOUR * kelvin))
+
+
+def evapotranspiration(temp, hum, wind_ms, solar_rad, pressure_hpa):
+    """Hourly FAO-56 Penman-Monteith reference ET in mm/h.
+
+    Net radiation is estimated from the shortwave radiation alone (no
+    longwave term), which is the usual simplification for a station without
+    a net radiometer.
+    """
+    es = saturation_vapour_pressure(temp) / 10
+    ea = es * hum / 100
+    delta = 4098 * es / (temp + 237.3) ** 2
+    gamma = 0.000665 * pressure_hpa / 10
+    net = (1 - ALBEDO) * solar_rad * 0.0036
+    soil = 0.1 * net if solar_rad > 0 else 0.5 * net
+    wind = wind_ms or 0
+    et = (
+        0.408 * delta * (net - soil) + gamma * 37 / (temp + 273) * wind * (es - ea)
+    ) / (delta + gamma * (1 + 0.34 * wind))
+    return max(et, 0.0)
+
+
+class DerivedEngine:
+    """Derived values for every ISS and Temp/Hum condition.
+
+    Computed in one pass over the conditions that changed; when the barometer
+    changed every condition is recomputed, since density and ET depend on the
+    station pressure.
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._pressure = None
+
+    def keys(self, cond_id):
+        return tuple(self._values.get(cond_id, ()))
+
+    def value(self, cond_id, key):
+        return self._values.get(cond_id, {}).get(key)
+
+    def async_update(self, records, changed):
+        pressure = self._pressure
+        for record in records.values():
+            if record.data_structure_type == BARO and record.get("bar_absolute") is not None:
+                pressure = record.get("bar_absolute") * INHG_TO_HPA
+                break
+        targets = records if pressure != self._pressure else changed
+        self._pressure = pressure
+        for cond_id in targets:
+            record = records.get(cond_id)
+            if record is not None and record.data_structure_type in INPUTS:
+                self._values[cond_id] = self._compute(record, pressure)
+
+    def _compute(self, record, pressure):
+        temp_key, hum_key = INPUTS[record.data_structure_type]
+        temp = record.get(temp_key)
+        hum = record.get(hum_key)
+        if not isinstance(temp, (int, float)) or not isinstance(hum, (int, float)) or not 0 < hum <= 100:
+            return {}
+        values = {
+            "wet_bulb_temperature": round(wet_bulb(temp, hum), 1),
+            "absolute_humidity": round(absolute_humidity(temp, hum), 2),
+        }
+        if pressure is not None:
+            values["air_density"] = round(air_density(temp, hum, pressure), 4)
+        if record.data_structure_type != ISS:
+            return values
+
+        wind = record.get("wind_speed_last")
+        wind_ms = wind * MPH_TO_MS if isinstance(wind, (int, float)) else None
+        values["feels_like"] = round(feels_like(temp, hum, wind_ms), 1)
+        values["cloud_base"] = round(max(125 * (temp - dew_point(temp, hum)), 0), 0)
+        solar_rad = record.get("solar_rad")
+        if pressure is not None and isinstance(solar_rad, (int, float)):
+            values["evapotranspiration"] = round(
+                evapotranspiration(temp, hum, wind_ms, solar_rad, pressure), 3
+            )
+        return values
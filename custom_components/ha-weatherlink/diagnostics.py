@@ -0,0 +1,26 @@
+"""Diagnostics support for the Weatherlink integration."""
+import time
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(hass, entry):
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "host": coordinator.host,
+        "options": dict(entry.options),
+        "last_update_success": coordinator.last_update_success,
+        "stale": coordinator.stale,
+        "last_good_update": coordinator.last_good_update,
+        "breaker": coordinator.breaker.as_dict(time.monotonic()),
+        "poll_interval": coordinator.poll_interval.total_seconds(),
+        "last_poll_latency_ms": coordinator.last_poll_latency,
+        "coalesced_requests": coordinator.api.coalesced,
+        "polls": coordinator.polls,
+        "unchanged_payloads": coordinator.unchanged_payloads,
+        "parsed_conditions": coordinator.parsed_conditions,
+        "skipped_conditions": coordinator.skipped_conditions,
+        "skip_ratios": coordinator.skip_ratios,
+        "metrics": coordinator.metrics.as_dict(),
+        "data": coordinator.data,
+    }
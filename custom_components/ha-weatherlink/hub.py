@@ -0,0 +1,125 @@
+"""Shared scheduler that polls many Weatherlink devices from one loop."""
+from dataclasses import dataclass
+import asyncio
+import logging
+import time
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, DEFAULT_HUB_MAX_CONCURRENCY, HUB
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_get_hub(hass: HomeAssistant):
+    hub = hass.data[DOMAIN].get(HUB)
+    if hub is None:
+        hub = hass.data[DOMAIN][HUB] = WeatherlinkHub(hass)
+    return hub
+
+
+@dataclass
+class HubMember:
+    coordinator: object
+    next_due: float = 0.0
+    polling: bool = False
+
+
+class WeatherlinkHub:
+    """Polls every hub-mode coordinator from a single scheduler.
+
+    Members are spread evenly over the poll interval so their requests do not
+    line up on the same tick, and at most `max_concurrency` requests are in
+    flight at once. Each coordinator keeps its own request timeout, so a slow
+    device only ever holds one slot.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_concurrency: int = DEFAULT_HUB_MAX_CONCURRENCY):
+        self._hass = hass
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._members = {}
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    @property
+    def members(self):
+        return [member.coordinator for member in self._members.values()]
+
+    async def async_first_refresh(self, coordinator):
+        # Many entries are set up at the same time on boot, so the first
+        # refresh goes through the same concurrency limit as the polls
+        async with self._semaphore:
+            await coordinator.async_config_entry_first_refresh()
+
+    @callback
+    def async_add(self, coordinator):
+        coordinator.hub = self
+        coordinator.update_interval = None
+        self._members[coordinator.host] = HubMember(coordinator)
+        self._stagger()
+        if self._task is None:
+            self._task = self._hass.async_create_background_task(
+                self._async_run(), "ha-weatherlink hub"
+            )
+        self._wakeup.set()
+
+    @callback
+    def async_remove(self, coordinator):
+        self._members.pop(coordinator.host, None)
+        coordinator.hub = None
+        if not self._members and self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._wakeup.set()
+
+    @callback
+    def async_poll_soon(self, coordinator):
+        member = self._members.get(coordinator.host)
+        if member is not None and not member.polling:
+            member.next_due = time.monotonic()
+            self._wakeup.set()
+
+    def _stagger(self):
+        # Give every member its own phase within its poll interval
+        now = time.monotonic()
+        count = len(self._members)
+        for index, member in enumerate(self._members.values()):
+            interval = member.coordinator.poll_interval.total_seconds()
+            member.next_due = now + interval * (index + 1) / count
+
+    async def _async_run(self):
+        while self._members:
+            now = time.monotonic()
+            for member in self._members.values():
+                if not member.polling and member.next_due <= now:
+                    member.polling = True
+                    self._hass.async_create_background_task(
+                        self._async_poll(member),
+                        f"ha-weatherlink hub poll {member.coordinator.host}",
+                    )
+
+            waiting = [m.next_due for m in self._members.values() if not m.polling]
+            delay = max(min(waiting) - now, 0) if waiting else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _async_poll(self, member):
+        coordinator = member.coordinator
+        try:
+            async with self._semaphore:
+                await coordinator.async_refresh()
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Unexpected error polling %s", coordinator.host)
+        finally:
+            member.polling = False
+            interval = coordinator.poll_interval.total_seconds()
+            # Keep the member on its phase unless it fell a full interval behind
+            member.next_due += interval
+            now = time.monotonic()
+            if member.next_due <= now:
+                member.next_due = now + interval
+            self._wakeup.set()
@@ -0,0 +1,126 @@
+"""Low-overhead timers and counters for the polling hot path.
+
+Entries without instrumentation share NULL_METRICS, whose methods do nothing,
+so the instrumented code paths only pay for a method call.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+import time
+
+from .const import METRICS_COUNT_BUCKETS, METRICS_LATENCY_BUCKETS
+
+
+class Histogram:
+    """Fixed-bucket histogram; percentiles are the upper bound of a bucket."""
+
+    __slots__ = ("bounds", "buckets", "count", "total", "max", "last")
+
+    def __init__(self, bounds=METRICS_LATENCY_BUCKETS):
+        self.bounds = bounds
+        # One extra bucket for values above the last bound
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = None
+        self.last = None
+
+    def observe(self, value):
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.last = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percent):
+        if not self.count:
+            return None
+        rank = percent / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                if index == len(self.bounds):
+                    return self.max
+                return min(self.bounds[index], self.max)
+        return self.max
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "max": self.max,
+            "last": self.last,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": dict(zip((*map(str, self.bounds), "inf"), self.buckets)),
+        }
+
+
+class Metrics:
+    enabled = True
+
+    def __init__(self):
+        self.counters = defaultdict(int)
+        self.histograms = {}
+
+    def increment(self, name, amount=1):
+        self.counters[name] += amount
+
+    def observe(self, name, value, bounds=METRICS_LATENCY_BUCKETS):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(bounds)
+        histogram.observe(value)
+
+    def observe_count(self, name, value):
+        self.observe(name, value, METRICS_COUNT_BUCKETS)
+
+    def observe_since(self, name, started):
+        """Record the milliseconds elapsed since a time.perf_counter() reading."""
+        self.observe(name, (time.perf_counter() - started) * 1000)
+
+    def percentile(self, name, percent):
+        histogram = self.histograms.get(name)
+        return None if histogram is None else histogram.percentile(percent)
+
+    def last(self, name):
+        histogram = self.histograms.get(name)
+        return None if histogram is None else histogram.last
+
+    @property
+    def errors(self):
+        return sum(count for name, count in self.counters.items() if name.startswith("errors."))
+
+    def as_dict(self):
+        return {
+            "counters": dict(self.counters),
+            "histograms": {name: histogram.as_dict() for name, histogram in self.histograms.items()},
+        }
+
+
+class NullMetrics:
+    enabled = False
+
+    def increment(self, name, amount=1):
+        pass
+
+    def observe(self, name, value, bounds=None):
+        pass
+
+    def observe_count(self, name, value):
+        pass
+
+    def observe_since(self, name, started):
+        pass
+
+    def as_dict(self):
+        return None
+
+
+NULL_METRICS = NullMetrics()
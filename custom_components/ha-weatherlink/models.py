@@ -0,0 +1,193 @@
+"""Compact, typed records for the condition objects of a payload.
+
+Each condition of `data.conditions` is parsed once per poll into a record
+with `__slots__` for the fields of its `data_structure_type`. Values are
+normalized while parsing: temperatures to °C, rain counts and rates to mm
+(per hour), timestamps to aware datetimes. Entities read fields by attribute.
+"""
+from datetime import datetime, timezone
+
+ISS = 1
+BARO = 3
+TEMP_HUM = 4
+AIRLINK = 6
+
+# Size of one bucket tip in mm per rain_size code (0.01 in, 0.2 mm, 0.1 mm, 0.001 in)
+RAIN_TIP_MM = {1: 0.254, 2: 0.2, 3: 0.1, 4: 0.0254}
+
+TEMPERATURE_KEYS = {
+    "temp", "temp_in", "dew_point", "dew_point_in", "heat_index", "heat_index_in",
+    "wet_bulb", "wind_chill", "thw_index", "thsw_index",
+}
+
+TIMESTAMP_KEYS = {"last_report_time", "rain_storm_last_start_at", "rain_storm_last_end_at"}
+
+rain_count_keys = {
+    "rainfall_daily",
+    "rainfall_year",
+    "rainfall_monthly",
+    "rainfall_last_15_min",
+    "rainfall_last_60_min",
+    "rainfall_last_24_hr",
+    "rain_storm",
+    "rain_storm_last",
+    # Add more rain count fields if needed
+}
+
+rain_rate_keys = {"rain_rate_last", "rain_rate_hi", "rain_rate_hi_last_15_min"}
+
+
+def fahrenheit_to_celsius(f):
+    """Convert Fahrenheit to Celsius."""
+    if f is None:
+        return None
+    return (f - 32) * 5.0 / 9.0
+
+
+def to_datetime(value):
+    # Convert to timezone-aware datetime in UTC
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+    if isinstance(value, str):
+        try:
+            dt = datetime.fromisoformat(value)
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return dt
+        except Exception:
+            return value
+    return value
+
+
+def _normalize_temperature(value, tip_mm):
+    return round(fahrenheit_to_celsius(value), 1)
+
+
+def _normalize_rain(value, tip_mm):
+    if tip_mm is None:
+        return value
+    return value * tip_mm
+
+
+def _normalize_timestamp(value, tip_mm):
+    return to_datetime(value)
+
+
+NORMALIZERS = {
+    **{key: _normalize_temperature for key in TEMPERATURE_KEYS},
+    **{key: _normalize_rain for key in rain_count_keys | rain_rate_keys},
+    **{key: _normalize_timestamp for key in TIMESTAMP_KEYS},
+}
+
+
+class ConditionRecord:
+    """Base record; subclasses list the sensor fields of one structure type."""
+
+    __slots__ = ("lsid", "txid", "data_structure_type", "ts")
+    FIELDS = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Resolve the normalizer of every field once, not on every parse
+        cls._PLAN = tuple((key, NORMALIZERS.get(key)) for key in cls.FIELDS)
+
+    @classmethod
+    def from_dict(cls, cond):
+        record = cls.__new__(cls)
+        record.lsid = cond.get("lsid")
+        record.txid = cond.get("txid")
+        record.data_structure_type = cond.get("data_structure_type")
+        record.ts = cond.get("ts")
+        tip_mm = RAIN_TIP_MM.get(cond.get("rain_size", 1))
+        for key, normalize in cls._PLAN:
+            value = cond.get(key)
+            if normalize is not None and value is not None:
+                value = normalize(value, tip_mm)
+            setattr(record, key, value)
+        return record
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __repr__(self):
+        fields = ", ".join(f"{key}={getattr(self, key)!r}" for key in self.FIELDS)
+        return f"{type(self).__name__}(lsid={self.lsid!r}, {fields})"
+
+
+ISS_FIELDS = (
+    "temp", "hum", "dew_point", "wet_bulb", "heat_index", "wind_chill",
+    "thw_index", "thsw_index",
+    "wind_speed_last", "wind_dir_last",
+    "wind_speed_avg_last_1_min", "wind_dir_scalar_avg_last_1_min",
+    "wind_speed_avg_last_2_min", "wind_dir_scalar_avg_last_2_min",
+    "wind_speed_hi_last_2_min", "wind_dir_at_hi_speed_last_2_min",
+    "wind_speed_avg_last_10_min", "wind_dir_scalar_avg_last_10_min",
+    "wind_speed_hi_last_10_min", "wind_dir_at_hi_speed_last_10_min",
+    "rain_size", "rain_rate_last", "rain_rate_hi", "rain_rate_hi_last_15_min",
+    "rainfall_last_15_min", "rainfall_last_60_min", "rainfall_last_24_hr",
+    "rainfall_daily", "rainfall_monthly", "rainfall_year",
+    "rain_storm", "rain_storm_start_at",
+    "rain_storm_last", "rain_storm_last_start_at", "rain_storm_last_end_at",
+    "solar_rad", "uv_index", "rx_state", "trans_battery_flag",
+)
+
+BARO_FIELDS = ("bar_sea_level", "bar_trend", "bar_absolute")
+
+TEMP_HUM_FIELDS = ("temp_in", "hum_in", "dew_point_in", "heat_index_in")
+
+AIRLINK_FIELDS = (
+    "temp", "hum", "dew_point", "wet_bulb", "heat_index",
+    "pm_1_last", "pm_2p5_last", "pm_10_last", "pm_1", "pm_2p5", "pm_10",
+    "pm_2p5_last_1_hour", "pm_2p5_last_3_hours", "pm_2p5_last_24_hours", "pm_2p5_nowcast",
+    "pm_10_last_1_hour", "pm_10_last_3_hours", "pm_10_last_24_hours", "pm_10_nowcast",
+    "pct_pm_data_last_1_hour", "pct_pm_data_last_3_hours",
+    "pct_pm_data_last_24_hours", "pct_pm_data_nowcast",
+    "last_report_time",
+)
+
+
+class IssRecord(ConditionRecord):
+    __slots__ = ISS_FIELDS
+    FIELDS = ISS_FIELDS
+
+
+class BaroRecord(ConditionRecord):
+    __slots__ = BARO_FIELDS
+    FIELDS = BARO_FIELDS
+
+
+class TempHumRecord(ConditionRecord):
+    __slots__ = TEMP_HUM_FIELDS
+    FIELDS = TEMP_HUM_FIELDS
+
+
+class AirLinkRecord(ConditionRecord):
+    __slots__ = AIRLINK_FIELDS
+    FIELDS = AIRLINK_FIELDS
+
+
+# Unknown structure types (e.g. leaf/soil stations) keep every known field
+GENERIC_FIELDS = tuple(dict.fromkeys(ISS_FIELDS + BARO_FIELDS + TEMP_HUM_FIELDS + AIRLINK_FIELDS))
+
+
+class GenericRecord(ConditionRecord):
+    __slots__ = GENERIC_FIELDS
+    FIELDS = GENERIC_FIELDS
+
+
+RECORD_TYPES = {
+    ISS: IssRecord,
+    BARO: BaroRecord,
+    TEMP_HUM: TempHumRecord,
+    AIRLINK: AirLinkRecord,
+}
+
+
+def parse_condition(cond):
+    record_type = RECORD_TYPES.get(cond.get("data_structure_type"), GenericRecord)
+    return record_type.from_dict(cond)
+
+
+def parse_conditions(conditions):
+    """Parse an index of condition dicts into records with the same keys."""
+    return {cond_id: parse_condition(cond) for cond_id, cond in conditions.items()}
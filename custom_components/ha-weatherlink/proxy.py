@@ -0,0 +1,71 @@
+"""Serve the last polled payload to other local consumers of a device."""
+from email.utils import formatdate
+from http import HTTPStatus
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.json import json_bytes
+
+from .const import DOMAIN, PROXY, PROXY_URL
+
+
+@callback
+def async_get_proxy(hass: HomeAssistant):
+    proxy = hass.data[DOMAIN].get(PROXY)
+    if proxy is None:
+        # Views cannot be unregistered, so there is one for all entries and
+        # it only answers for the hosts currently added to it
+        proxy = hass.data[DOMAIN][PROXY] = WeatherlinkProxyView()
+        hass.http.register_view(proxy)
+    return proxy
+
+
+class WeatherlinkProxyView(HomeAssistantView):
+    """GET /api/ha-weatherlink/<host>/v1/current_conditions.
+
+    Returns the coordinator's latest payload in the device's own format, so
+    exporters and upload scripts can read it without polling the device.
+    The body is encoded once per device update and reused until the
+    payload's `ts` changes; clients can revalidate with If-None-Match.
+    """
+
+    url = PROXY_URL.format(host="{host}")
+    name = "api:ha-weatherlink:current_conditions"
+
+    def __init__(self):
+        self._coordinators = {}
+        self._bodies = {}
+
+    @callback
+    def async_add(self, coordinator):
+        self._coordinators[coordinator.host] = coordinator
+
+    @callback
+    def async_remove(self, coordinator):
+        self._coordinators.pop(coordinator.host, None)
+        self._bodies.pop(coordinator.host, None)
+
+    async def get(self, request, host):
+        coordinator = self._coordinators.get(host)
+        if coordinator is None:
+            return self.json_message("Unknown device", HTTPStatus.NOT_FOUND)
+        data = coordinator.data
+        if not data or not coordinator.last_update_success:
+            return self.json_message("No data from the device", HTTPStatus.SERVICE_UNAVAILABLE)
+
+        ts = (data.get("data") or {}).get("ts") or 0
+        etag = f'"{ts}"'
+        headers = {
+            "ETag": etag,
+            # Clients may keep the body but have to revalidate, which is cheap
+            "Cache-Control": "no-cache",
+            "Last-Modified": formatdate(ts, usegmt=True),
+        }
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+        cached = self._bodies.get(host)
+        if cached is None or cached[0] != ts or cached[1] is not data:
+            cached = self._bodies[host] = (ts, data, json_bytes(data))
+        return web.Response(body=cached[2], content_type="application/json", headers=headers)
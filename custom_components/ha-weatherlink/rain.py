@@ -0,0 +1,216 @@
+"""Rain accumulation and rate from the deltas of the device's rain counters."""
+from collections import deque
+from datetime import date, datetime, timedelta
+import time
+
+from .const import DEFAULT_RAIN_DAY_START, RAIN_EVENT_DRY_GAP, RAIN_RATE_TIMEOUT
+from .models import ISS, RAIN_TIP_MM
+
+# Counters in order of preference; the longer a counter runs between resets
+# the fewer resets there are to detect
+COUNTER_KEYS = ("rainfall_year", "rainfall_monthly", "rainfall_daily")
+
+RAIN_KEYS = ("rain_day", "rain_event", "rain_event_start", "rain_rate_local")
+
+
+def window_key(hours):
+    return f"rain_last_{hours}h"
+
+
+class RainWindow:
+    """Rain over the last `hours`, as a running sum over the tips it holds."""
+
+    __slots__ = ("seconds", "tips", "total")
+
+    def __init__(self, hours, tips=()):
+        self.seconds = hours * 3600
+        self.tips = deque(tips)
+        self.total = sum((amount for _, amount in self.tips), 0.0)
+
+    def add(self, amount, now):
+        self.tips.append((now, amount))
+        self.total += amount
+
+    def expire(self, now):
+        tips = self.tips
+        cutoff = now - self.seconds
+        while tips and tips[0][0] <= cutoff:
+            self.total -= tips.popleft()[1]
+        if not tips:
+            # Drop the float residue of the additions and subtractions
+            self.total = 0.0
+
+
+class RainState:
+    """Counter baseline and accumulations of one ISS."""
+
+    def __init__(self, windows):
+        self.counter_key = None
+        self.counter = None
+        self.day = None
+        self.day_total = 0.0
+        self.event_total = 0.0
+        self.event_start = None
+        self.last_tip_at = None
+        self.updated_at = None
+        self.rate = 0.0
+        self.tip = RAIN_TIP_MM[1]
+        self.windows = {hours: RainWindow(hours) for hours in windows}
+
+
+class RainEngine:
+    """Local rain day, last-N-hour windows, event totals and rate per ISS.
+
+    Every update adds the increase of the rain counter since the previous
+    update; a counter that went down was reset by the device and the new
+    value is the rain since the reset. Each update is O(1) per ISS (amortized
+    for the windows). Amounts are in mm like the records.
+    """
+
+    def __init__(self, windows, day_start=DEFAULT_RAIN_DAY_START, tzinfo=None):
+        # Window lengths in hours
+        self.windows = tuple(windows)
+        self._day_start = timedelta(hours=day_start)
+        self._tzinfo = tzinfo
+        self._states = {}
+
+    def keys(self, cond_id):
+        if cond_id not in self._states:
+            return ()
+        return RAIN_KEYS + tuple(window_key(hours) for hours in self.windows)
+
+    def value(self, cond_id, key):
+        state = self._states.get(cond_id)
+        if state is None:
+            return None
+        if key == "rain_day":
+            return round(state.day_total, 2)
+        if key == "rain_event":
+            return round(state.event_total, 2)
+        if key == "rain_event_start":
+            return datetime.fromtimestamp(state.event_start, self._tzinfo) if state.event_start else None
+        if key == "rain_rate_local":
+            return round(state.rate, 2)
+        for hours, window in state.windows.items():
+            if key == window_key(hours):
+                return round(max(window.total, 0.0), 2)
+        return None
+
+    def as_dict(self):
+        """State to persist across restarts, so a rain day survives them."""
+        return [
+            {
+                "id": cond_id,
+                "counter_key": state.counter_key,
+                "counter": state.counter,
+                "day": state.day.isoformat() if state.day else None,
+                "day_total": state.day_total,
+                "event_total": state.event_total,
+                "event_start": state.event_start,
+                "last_tip_at": state.last_tip_at,
+                "windows": {str(hours): list(window.tips) for hours, window in state.windows.items()},
+            }
+            for cond_id, state in self._states.items()
+        ]
+
+    def restore(self, saved):
+        """Restore the state of as_dict(); windows that no longer exist are dropped."""
+        for item in saved or []:
+            state = RainState(())
+            state.counter_key = item.get("counter_key")
+            state.counter = item.get("counter")
+            state.day = date.fromisoformat(item["day"]) if item.get("day") else None
+            state.day_total = item.get("day_total", 0.0)
+            state.event_total = item.get("event_total", 0.0)
+            state.event_start = item.get("event_start")
+            state.last_tip_at = item.get("last_tip_at")
+            windows = item.get("windows") or {}
+            state.windows = {
+                hours: RainWindow(hours, (tuple(tip) for tip in windows.get(str(hours), ())))
+                for hours in self.windows
+            }
+            # The counter moved on while Home Assistant was down, which
+            # cannot be told apart from a reset; resume from a new baseline
+            state.counter_key = None
+            self._states[item["id"]] = state
+
+    def _rain_day(self, now):
+        return (datetime.fromtimestamp(now, self._tzinfo) - self._day_start).date()
+
+    def async_update(self, records, changed, now: float | None = None):
+        if now is None:
+            now = time.time()
+        # Time moves on for every ISS, also those without a new report
+        day = self._rain_day(now)
+        for state in self._states.values():
+            self._advance(state, day, now)
+        for cond_id in changed:
+            record = records.get(cond_id)
+            if record is not None and record.data_structure_type == ISS:
+                self._add_counter(cond_id, record, now, day)
+
+    def _add_counter(self, cond_id, record, now, day):
+        state = self._states.get(cond_id)
+        counter_key = next((key for key in COUNTER_KEYS if record.get(key) is not None), None)
+        if counter_key is None:
+            return
+        if state is None:
+            state = self._states[cond_id] = RainState(self.windows)
+            state.day = day
+        counter = record.get(counter_key)
+        if counter_key != state.counter_key or state.counter is None:
+            # First sample, or the device stopped sending the counter we
+            # followed: only take a new baseline
+            state.counter_key = counter_key
+            state.counter = counter
+            state.updated_at = now
+            return
+
+        delta = counter - state.counter if counter >= state.counter else counter
+        state.counter = counter
+        delta = round(delta, 4)
+        state.tip = RAIN_TIP_MM.get(record.get("rain_size"), RAIN_TIP_MM[1])
+        if delta > 0:
+            self._add_rain(state, delta, now)
+        state.updated_at = now
+
+    def _add_rain(self, state, amount, now):
+        if state.last_tip_at is None or now - state.last_tip_at > RAIN_EVENT_DRY_GAP:
+            state.event_total = 0.0
+            state.event_start = now
+        state.event_total += amount
+        state.day_total += amount
+        for window in state.windows.values():
+            window.add(amount, now)
+
+        # Rate from the spacing of the tips: the amount over the time since
+        # the previous tip, at most RAIN_RATE_TIMEOUT. Like the Davis rate,
+        # the first tip after a dry spell counts over the whole timeout, not
+        # over one poll, or every shower would start with a spike
+        if state.last_tip_at is not None:
+            interval = min(now - state.last_tip_at, RAIN_RATE_TIMEOUT)
+        else:
+            interval = RAIN_RATE_TIMEOUT
+        if interval > 0:
+            state.rate = amount / interval * 3600
+        state.last_tip_at = now
+
+    def _advance(self, state, day, now):
+        if state.day != day:
+            if state.day is not None:
+                state.day_total = 0.0
+            state.day = day
+        for window in state.windows.values():
+            window.expire(now)
+        if state.last_tip_at is None:
+            return
+        elapsed = now - state.last_tip_at
+        if elapsed > RAIN_EVENT_DRY_GAP:
+            state.event_total = 0.0
+            state.event_start = None
+        if elapsed >= RAIN_RATE_TIMEOUT:
+            state.rate = 0.0
+        elif elapsed > 0 and state.rate > 0:
+            # No tip since: the rate is at most one tip over the time since
+            # the last one, so it decays instead of holding the last value
+            state.rate = min(state.rate, state.tip / elapsed * 3600)
@@ -0,0 +1,175 @@
+"""Real-time UDP broadcast support for the Weatherlink Live."""
+from datetime import timedelta
+import asyncio
+import logging
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+
+from .const import (
+    DEFAULT_REALTIME_DURATION,
+    DEFAULT_UPDATE_INTERVAL,
+    REALTIME_PORT,
+    REALTIME_RENEW_MARGIN,
+    REALTIME_STALE_AFTER,
+)
+from .davis import json_loads
+
+_LOGGER = logging.getLogger(__name__)
+
+# The broadcast uses shorter names for the rain windows than current_conditions
+REALTIME_KEY_MAP = {
+    "rain_15_min": "rainfall_last_15_min",
+    "rain_60_min": "rainfall_last_60_min",
+    "rain_24_hr": "rainfall_last_24_hr",
+}
+
+
+def merge_realtime_packet(data, packet):
+    """Merge a broadcast packet into a current_conditions payload by lsid.
+
+    Returns the set of lsids that were updated.
+    """
+    merged = set()
+    if not data or "data" not in data:
+        return merged
+    current = data["data"]
+    if packet.get("did") != current.get("did"):
+        return merged
+
+    by_lsid = {cond.get("lsid"): cond for cond in current.get("conditions") or []}
+    for update in packet.get("conditions") or []:
+        lsid = update.get("lsid")
+        target = by_lsid.get(lsid)
+        if target is None:
+            continue
+        for key, value in update.items():
+            target[REALTIME_KEY_MAP.get(key, key)] = value
+        merged.add(lsid)
+
+    if merged and packet.get("ts"):
+        current["ts"] = packet["ts"]
+    return merged
+
+
+class WeatherlinkRealtimeProtocol(asyncio.DatagramProtocol):
+    def __init__(self, on_packet):
+        self._on_packet = on_packet
+
+    def datagram_received(self, data, addr):
+        try:
+            packet = json_loads(data)
+        except ValueError:
+            _LOGGER.debug("Ignoring malformed real-time packet from %s", addr)
+            return
+        if isinstance(packet, dict):
+            self._on_packet(packet)
+
+    def error_received(self, exc):
+        _LOGGER.debug("Real-time listener error: %s", exc)
+
+
+class WeatherlinkRealtime:
+    """Keeps a real-time broadcast session open and feeds it to the coordinator.
+
+    The session is renewed shortly before the device stops broadcasting. While
+    packets keep arriving the coordinator drops to a slow HTTP poll.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator, duration: int = DEFAULT_REALTIME_DURATION):
+        self._hass = hass
+        self._coordinator = coordinator
+        self._duration = duration
+        self._transport = None
+        self._port = None
+        self._cancel_renew = None
+        self._cancel_watchdog = None
+        self._renew_task = None
+        self._renew_failed = False
+        self.last_packet = None
+        self.packets = 0
+
+    @property
+    def healthy(self) -> bool:
+        return (
+            self.last_packet is not None
+            and time.monotonic() - self.last_packet < REALTIME_STALE_AFTER
+        )
+
+    async def async_start(self):
+        self._cancel_watchdog = async_track_time_interval(
+            self._hass, self._async_watchdog, timedelta(seconds=REALTIME_STALE_AFTER)
+        )
+        # The first request runs in the background so an unreachable device
+        # does not hold up the entry setup
+        self._renew_task = self._hass.async_create_background_task(
+            self._async_renew(), f"ha-weatherlink real-time {self._coordinator.host}"
+        )
+
+    async def async_stop(self):
+        if self._renew_task is not None:
+            self._renew_task.cancel()
+            self._renew_task = None
+        if self._cancel_renew is not None:
+            self._cancel_renew()
+            self._cancel_renew = None
+        if self._cancel_watchdog is not None:
+            self._cancel_watchdog()
+            self._cancel_watchdog = None
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    async def _async_renew(self, _now=None):
+        self._cancel_renew = None
+        try:
+            info = await self._coordinator.api.async_start_realtime(self._duration)
+        except Exception as err:
+            # AirLink units and older firmware do not support real_time
+            log = _LOGGER.debug if self._renew_failed else _LOGGER.warning
+            log("Could not start real-time broadcast on %s: %s", self._coordinator.host, err)
+            self._renew_failed = True
+            self._schedule_renew(DEFAULT_UPDATE_INTERVAL)
+            return
+
+        self._renew_failed = False
+        port = info.get("broadcast_port") or REALTIME_PORT
+        duration = info.get("duration") or self._duration
+        if self._transport is None or port != self._port:
+            await self._async_listen(port)
+        self._schedule_renew(max(duration - REALTIME_RENEW_MARGIN, REALTIME_RENEW_MARGIN))
+
+    def _schedule_renew(self, delay):
+        self._cancel_renew = async_call_later(self._hass, delay, self._async_renew)
+
+    async def _async_listen(self, port):
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        # Several Weatherlink Live units broadcast on the same port, so every
+        # entry binds with SO_REUSEPORT and filters packets by device id
+        self._transport, _ = await self._hass.loop.create_datagram_endpoint(
+            lambda: WeatherlinkRealtimeProtocol(self._async_handle_packet),
+            local_addr=("0.0.0.0", port),
+            reuse_port=True,
+            allow_broadcast=True,
+        )
+        self._port = port
+
+    @callback
+    def _async_handle_packet(self, packet):
+        capture = self._coordinator.api.capture
+        if capture is not None:
+            capture.record_packet(packet)
+        if self._coordinator.async_merge_realtime(packet):
+            self.packets += 1
+            was_healthy = self.healthy
+            self.last_packet = time.monotonic()
+            if not was_healthy:
+                self._coordinator.async_set_realtime_healthy(True)
+
+    @callback
+    def _async_watchdog(self, _now=None):
+        if not self.healthy:
+            self._coordinator.async_set_realtime_healthy(False)
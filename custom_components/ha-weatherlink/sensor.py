@@ -1,10 +1,17 @@
-from homeassistant.const import UnitOfLength, UnitOfTemperature, UnitOfPressure, UnitOfSpeed, CONCENTRATION_MICROGRAMS_PER_CUBIC_METER
+from homeassistant.const import UnitOfTime, UnitOfInformation, UnitOfLength, UnitOfTemperature, UnitOfPressure, UnitOfSpeed, CONCENTRATION_GRAMS_PER_CUBIC_METER, CONCENTRATION_MICROGRAMS_PER_CUBIC_METER
 from homeassistant.components.sensor import SensorStateClass, SensorDeviceClass, SensorEntity
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from datetime import datetime, timezone
+from homeassistant.const import EVENT_CORE_CONFIG_UPDATE
+from homeassistant.core import callback
+from functools import lru_cache
+from typing import Any, Callable, NamedTuple
 from .const import DOMAIN
+from .deadband import deadband_suppressed
+from .models import rain_count_keys, rain_rate_keys
+from .stats import AGGREGATES, window_label
 import logging
+import time
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -531,22 +538,248 @@ SENSOR_TYPES = {
     },
 }
 
-rain_count_keys = {
-    "rainfall_daily",
-    "rainfall_year",
-    "rainfall_monthly",
-    "rainfall_last_15_min",
-    "rainfall_last_60_min",
-    "rainfall_last_24_hr",
-    "rain_storm",
-    "rain_storm_last",
-    # Add more rain count fields if needed
+# Sensors about the connection to the device rather than the weather
+HOST_SENSOR_TYPES = {
+    "poll_latency": {
+        "name": "Poll Latency",
+        "device_class": SensorDeviceClass.DURATION,
+        "icon": "mdi:timer-outline",
+        "state_class": SensorStateClass.MEASUREMENT,
+        "unit": UnitOfTime.MILLISECONDS,
+        "value": lambda coordinator: coordinator.last_poll_latency,
+    },
+    "coalesced_requests": {
+        "name": "Coalesced Requests",
+        "device_class": None,
+        "icon": "mdi:call-merge",
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+        "unit": None,
+        "value": lambda coordinator: coordinator.api.coalesced,
+    },
 }
 
+# Values of the DerivedEngine, computed from the records of each update
+DERIVED_SENSOR_TYPES = {
+    "feels_like": {
+        "name": "Feels Like",
+        "device_class": SensorDeviceClass.TEMPERATURE,
+        "icon": "mdi:thermometer-lines",
+        "unit": UnitOfTemperature.CELSIUS,
+        "precision": 1,
+    },
+    "wet_bulb_temperature": {
+        "name": "Wet Bulb Temperature",
+        "device_class": SensorDeviceClass.TEMPERATURE,
+        "icon": "mdi:thermometer-water",
+        "unit": UnitOfTemperature.CELSIUS,
+        "precision": 1,
+    },
+    "absolute_humidity": {
+        "name": "Absolute Humidity",
+        "device_class": None,
+        "icon": "mdi:water",
+        "unit": CONCENTRATION_GRAMS_PER_CUBIC_METER,
+        "precision": 1,
+    },
+    "cloud_base": {
+        "name": "Cloud Base",
+        "device_class": SensorDeviceClass.DISTANCE,
+        "icon": "mdi:weather-cloudy",
+        "unit": UnitOfLength.METERS,
+        "precision": 0,
+    },
+    "air_density": {
+        "name": "Air Density",
+        "device_class": None,
+        "icon": "mdi:weight",
+        "unit": "kg/m³",
+        "precision": 3,
+    },
+    "evapotranspiration": {
+        "name": "Evapotranspiration",
+        "device_class": None,
+        "icon": "mdi:sprout",
+        "unit": f"{UnitOfLength.MILLIMETERS}/h",
+        "precision": 2,
+    },
+}
+
+# Values of the RainEngine; amounts in mm, converted by Home Assistant
+RAIN_SENSOR_TYPES = {
+    "rain_day": {
+        "name": "Rain Day",
+        "device_class": "precipitation",
+        "icon": "mdi:weather-rainy",
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+        "unit": UnitOfLength.MILLIMETERS,
+        "precision": 1,
+    },
+    "rain_event": {
+        "name": "Rain Event",
+        "device_class": "precipitation",
+        "icon": "mdi:weather-rainy",
+        "state_class": SensorStateClass.TOTAL,
+        "unit": UnitOfLength.MILLIMETERS,
+        "precision": 1,
+    },
+    "rain_event_start": {
+        "name": "Rain Event Start",
+        "device_class": SensorDeviceClass.TIMESTAMP,
+        "icon": "mdi:clock-start",
+        "state_class": None,
+        "unit": None,
+        "precision": None,
+    },
+    "rain_rate_local": {
+        "name": "Rain Rate Local",
+        "device_class": "precipitation_intensity",
+        "icon": "mdi:weather-pouring",
+        "state_class": SensorStateClass.MEASUREMENT,
+        "unit": f"{UnitOfLength.MILLIMETERS}/h",
+        "precision": 1,
+    },
+}
+
+
+def rain_sensor_info(key):
+    """Sensor info for a key of the RainEngine, including its windows."""
+    if key in RAIN_SENSOR_TYPES:
+        return RAIN_SENSOR_TYPES[key]
+    hours = key.removeprefix("rain_last_").removesuffix("h")
+    return {
+        "name": f"Rain Last {hours}h",
+        "device_class": "precipitation",
+        "icon": "mdi:weather-rainy",
+        "state_class": SensorStateClass.MEASUREMENT,
+        "unit": UnitOfLength.MILLIMETERS,
+        "precision": 1,
+    }
+
+
+# Values of the AirQualityEngine
+AIR_QUALITY_SENSOR_TYPES = {
+    "pm_2p5_nowcast_local": {
+        "name": "PM 2.5 Nowcast Local",
+        "device_class": SensorDeviceClass.PM25,
+        "icon": None,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "unit": CONCENTRATION_MICROGRAMS_PER_CUBIC_METER,
+        "precision": 1,
+    },
+    "pm_10_nowcast_local": {
+        "name": "PM 10 Nowcast Local",
+        "device_class": SensorDeviceClass.PM10,
+        "icon": None,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "unit": CONCENTRATION_MICROGRAMS_PER_CUBIC_METER,
+        "precision": 1,
+    },
+    "aqi": {
+        "name": "Air Quality Index",
+        "device_class": SensorDeviceClass.AQI,
+        "icon": None,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "unit": None,
+        "precision": 0,
+    },
+    "aqi_category": {
+        "name": "Air Quality Category",
+        "device_class": None,
+        "icon": "mdi:air-filter",
+        "state_class": None,
+        "unit": None,
+        "precision": None,
+    },
+    "aqi_pollutant": {
+        "name": "Air Quality Main Pollutant",
+        "device_class": None,
+        "icon": "mdi:molecule",
+        "state_class": None,
+        "unit": None,
+        "precision": None,
+    },
+}
+
+# Instrumentation sensors, only added when metrics are enabled
+METRIC_SENSOR_TYPES = {
+    "poll_latency_p95": {
+        "name": "Poll Latency P95",
+        "device_class": SensorDeviceClass.DURATION,
+        "icon": "mdi:timer-outline",
+        "state_class": SensorStateClass.MEASUREMENT,
+        "unit": UnitOfTime.MILLISECONDS,
+        "value": lambda coordinator: coordinator.metrics.percentile("poll_ms", 95),
+    },
+    "decode_time": {
+        "name": "Decode Time",
+        "device_class": SensorDeviceClass.DURATION,
+        "icon": "mdi:code-json",
+        "state_class": SensorStateClass.MEASUREMENT,
+        "unit": UnitOfTime.MILLISECONDS,
+        "value": lambda coordinator: _round_metric(coordinator.metrics.last("decode_ms")),
+    },
+    "parse_time": {
+        "name": "Parse Time",
+        "device_class": SensorDeviceClass.DURATION,
+        "icon": "mdi:cog-outline",
+        "state_class": SensorStateClass.MEASUREMENT,
+        "unit": UnitOfTime.MILLISECONDS,
+        "value": lambda coordinator: _round_metric(coordinator.metrics.last("parse_ms")),
+    },
+    "fan_out_time": {
+        "name": "Entity Update Time",
+        "device_class": SensorDeviceClass.DURATION,
+        "icon": "mdi:call-split",
+        "state_class": SensorStateClass.MEASUREMENT,
+        "unit": UnitOfTime.MILLISECONDS,
+        "value": lambda coordinator: _round_metric(coordinator.metrics.last("fan_out_ms")),
+    },
+    "entities_written": {
+        "name": "Entities Written",
+        "device_class": None,
+        "icon": "mdi:pencil-outline",
+        "state_class": SensorStateClass.MEASUREMENT,
+        "unit": None,
+        "value": lambda coordinator: coordinator.metrics.last("entities_written"),
+    },
+    "bytes_received": {
+        "name": "Bytes Received",
+        "device_class": SensorDeviceClass.DATA_SIZE,
+        "icon": "mdi:download-network-outline",
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+        "unit": UnitOfInformation.BYTES,
+        "value": lambda coordinator: coordinator.metrics.counters["bytes_received"],
+    },
+    "poll_errors": {
+        "name": "Poll Errors",
+        "device_class": None,
+        "icon": "mdi:alert-circle-outline",
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+        "unit": None,
+        "value": lambda coordinator: coordinator.metrics.errors,
+    },
+}
+
+
+def _round_metric(value):
+    return None if value is None else round(value, 2)
+
 
 async def async_setup_entry(hass, entry, async_add_entities):
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    sensors = []
+    host_sensors = []
+    # Poll latency changes on nearly every poll; only worth the recorder
+    # writes when hub mode or metrics were asked for
+    if coordinator.hub is not None or coordinator.metrics.enabled:
+        host_sensors.extend(
+            WeatherlinkHostSensor(coordinator, key, info) for key, info in HOST_SENSOR_TYPES.items()
+        )
+    if coordinator.metrics.enabled:
+        host_sensors.extend(
+            WeatherlinkHostSensor(coordinator, key, info) for key, info in METRIC_SENSOR_TYPES.items()
+        )
+    if host_sensors:
+        async_add_entities(host_sensors)
 
     if (
         not coordinator.data
@@ -555,32 +788,89 @@ async def async_setup_entry(hass, entry, async_add_entities):
     ):
         _LOGGER.warning(
             "Weatherlink API did not return 'data.conditions'. Data: %s", coordinator.data)
-        return
 
-    conditions = coordinator.data["data"]["conditions"]
+    # Entities created on a previous run are kept even if their field is
+    # null in the payload the entry started from
+    known = set(coordinator.entity_keys)
+    coordinator.entity_keys = set()
+    engine_keys = set()
+    async_add_entities(
+        _new_sensors(coordinator, coordinator.records, known, engine_keys)
+    )
+
+    @callback
+    def _async_discover():
+        # New transmitters and fields that were null so far can only show up
+        # in conditions that changed, so the rest are not looked at
+        if coordinator.changed_conditions:
+            sensors = _new_sensors(coordinator, coordinator.changed_conditions, (), engine_keys)
+            if sensors:
+                _LOGGER.debug("Adding %d new sensors for %s", len(sensors), coordinator.host)
+                async_add_entities(sensors)
+
+    entry.async_on_unload(coordinator.async_add_listener(_async_discover))
 
-    # Create a separate device for each condition object
-    for cond in conditions:
-        # Use a unique device_id for each condition (e.g., lsid or txid)
-        device_id = cond.get("lsid") or cond.get("txid") or id(cond)
+
+def _new_sensors(coordinator, device_ids, known, engine_keys):
+    """Create the sensors for (condition, key) pairs that have none yet."""
+    # Create a separate device for each condition object, keyed by lsid (or txid)
+    sensors = []
+    entity_keys = coordinator.entity_keys
+    statistics = coordinator.statistics
+    engines = [
+        (engine, kind, sensor_info)
+        for engine, kind, sensor_info in (
+            (coordinator.derived, "derived", DERIVED_SENSOR_TYPES.get),
+            (coordinator.rain, "rain", rain_sensor_info),
+            (coordinator.air_quality, "air_quality", AIR_QUALITY_SENSOR_TYPES.get),
+        )
+        if engine is not None
+    ]
+    for device_id in device_ids:
+        record = coordinator.records.get(device_id)
+        if record is None:
+            continue
         for key in SENSOR_TYPES:
-            value = cond.get(key)
-            if value not in (None, "Unknown", "null"):
+            if (device_id, key) in entity_keys:
+                continue
+            value = record.get(key)
+            if value not in (None, "Unknown", "null") or (device_id, key) in known:
                 sensors.append(
-                    WeatherlinkSensor(coordinator, key, cond, device_id)
+                    WeatherlinkSensor(coordinator, key, record, device_id)
                 )
+                entity_keys.add((device_id, key))
+
+        for engine, kind, sensor_info in engines:
+            for key in engine.keys(device_id):
+                if (kind, device_id, key) not in engine_keys:
+                    engine_keys.add((kind, device_id, key))
+                    sensors.append(WeatherlinkDerivedSensor(
+                        coordinator, engine, key, sensor_info(key), record, device_id
+                    ))
 
-    async_add_entities(sensors)
+        if statistics is None:
+            continue
+        for key in statistics.keys:
+            if ("statistics", device_id, key) in engine_keys or record.get(key) is None:
+                continue
+            engine_keys.add(("statistics", device_id, key))
+            for minutes in statistics.windows:
+                for aggregate in AGGREGATES:
+                    sensors.append(WeatherlinkStatisticSensor(
+                        coordinator, key, record, device_id, minutes, aggregate
+                    ))
+    return sensors
 
 
-class WeatherlinkSensor(SensorEntity):
+class WeatherlinkSensor(CoordinatorEntity, SensorEntity):
     has_entity_name = True
 
-    def __init__(self, coordinator, key, data, device_id=None):
-        self.coordinator = coordinator
+    def __init__(self, coordinator, key, record, device_id=None):
+        super().__init__(coordinator)
         self._key = key
-        self._data = data
+        self._record = record
         self._device_id = device_id
+        self._written = self._change_signature()
         sensor_info = SENSOR_TYPES.get(key, {})
         self._attr_name = sensor_info.get("name", key)
         self._attr_device_class = sensor_info.get("device_class")
@@ -588,6 +878,15 @@ class WeatherlinkSensor(SensorEntity):
         self._attr_state_class = sensor_info.get("state_class")
         self._attr_unit = sensor_info.get("unit")
         self._attr_entity_category = sensor_info.get("entity_category")
+        self._deadband = coordinator.deadbands.get(self._attr_device_class)
+        self._written_at = time.monotonic()
+        self._resolve_conversion()
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.hass.bus.async_listen(EVENT_CORE_CONFIG_UPDATE, self._async_core_config_updated)
+        )
 
     @property
     def unique_id(self):
@@ -603,158 +902,369 @@ class WeatherlinkSensor(SensorEntity):
         return self._attr_state_class
 
     @property
-    def suggested_display_precision(self):
-        if self.device_class == SensorDeviceClass.PRECIPITATION:
-            if self.hass and self.hass.config.units.length_unit == UnitOfLength.MILLIMETERS:
-                return 1
-            return 2
-        if self.device_class in [SensorDeviceClass.PM1, SensorDeviceClass.PM25, SensorDeviceClass.PM10]:
-            return 1
-        # if self.device_class == SensorDeviceClass.HUMIDITY:
-        #    return 1
-        if self.device_class == SensorDeviceClass.PRESSURE:
-            return 1
-        if self.device_class == SensorDeviceClass.WIND_SPEED:
-            return 1
-        return None
+    def device_info(self):
+        return condition_device_info(self.coordinator, self._device_id, self._record)
+
+    def _resolve_conversion(self):
+        # Unit, precision and converter only depend on the collector size and
+        # the unit system, so they are resolved when one of those changes
+        # rather than on every state write
+        self._rain_size = self._record.get("rain_size", 1)
+        self._conversion = build_conversions(self._rain_size, metric_units(self.coordinator.hass))[self._key]
+        self._attr_native_unit_of_measurement = self._conversion.unit
+        self._attr_suggested_display_precision = self._conversion.precision
+
+    @callback
+    def _async_core_config_updated(self, _event):
+        self._resolve_conversion()
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self):
+        if self._key == "rain_size":
+            return self._conversion.convert(None)
+        return self._conversion.convert(self._record.get(self._key))
+
+    def _change_signature(self):
+        # rain_size feeds the conversion of every rain field, so a change of
+        # collector has to be written even if the raw count stayed the same
+        return (
+            self._record.get(self._key),
+            self._record.get("rain_size"),
+            self.coordinator.last_update_success,
+            self.coordinator.stale,
+            self._device_id in self.coordinator.records,
+        )
+
+    @callback
+    def _handle_coordinator_update(self):
+        # Follow the condition to the freshly parsed record; conditions that
+        # did not change keep their record
+        if self._device_id in self.coordinator.changed_conditions:
+            self._record = self.coordinator.records.get(self._device_id, self._record)
+            if self._record.get("rain_size", 1) != self._rain_size:
+                self._resolve_conversion()
+        signature = self._change_signature()
+        if signature == self._written or deadband_suppressed(self, signature):
+            return
+        self._written = signature
+        self._written_at = time.monotonic()
+        self.coordinator.metrics.increment("entity_writes")
+        self.async_write_ha_state()
+
+    @property
+    def available(self):
+        # Conditions that dropped out of the payload (a removed transmitter)
+        # keep their entity, unavailable until they come back
+        return self.coordinator.last_update_success and self._device_id in self.coordinator.records
+
+    @property
+    def extra_state_attributes(self):
+        return stale_attributes(self.coordinator) or None
+
+
+class WeatherlinkStatisticSensor(CoordinatorEntity, SensorEntity):
+    """Rolling min/max/mean/percentile of a field over a window."""
+
+    has_entity_name = True
+
+    def __init__(self, coordinator, key, record, device_id, minutes, aggregate):
+        super().__init__(coordinator)
+        self._key = key
+        self._record = record
+        self._device_id = device_id
+        self._minutes = minutes
+        self._aggregate = aggregate
+        sensor_info = SENSOR_TYPES[key]
+        label = aggregate.upper() if aggregate.startswith("p") else aggregate.capitalize()
+        self._attr_unique_id = f"{coordinator.host}_{device_id}_{key}_{aggregate}_{minutes}"
+        self._attr_name = f"{sensor_info['name']} {label} {window_label(minutes)}"
+        self._attr_device_class = sensor_info.get("device_class")
+        self._attr_icon = sensor_info.get("icon")
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._deadband = coordinator.deadbands.get(self._attr_device_class)
+        self._written = None
+        self._written_at = 0.0
+        self._resolve_conversion()
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.hass.bus.async_listen(EVENT_CORE_CONFIG_UPDATE, self._async_core_config_updated)
+        )
 
     @property
     def device_info(self):
-        # Each condition object gets its own device
-        device_id = self._device_id or self.coordinator._host
-        data_structure_type = self._data.get("data_structure_type", 0)
-        txid = self._data.get("txid", 0)
-        if data_structure_type == 1:
-            name = f"ISS{txid}"
-            model = "Weatherlink Live"
-        elif data_structure_type == 3:
-            name = f"WLL Baro"
-            model = "Weatherlink Live"
-        elif data_structure_type == 4:
-            name = f"WLL Temp/Hum"
-            model = "Weatherlink Live"
-        elif data_structure_type == 6:
-            name = f"Airlink"
-            model = "Airlink"
-        else:
-            name = f"Weatherlink Device {device_id}"
-            model = "Weatherlink Live"
+        return condition_device_info(self.coordinator, self._device_id, self._record)
 
-        return {
-            "identifiers": {(DOMAIN, device_id)},
-            "name": name,
-            "manufacturer": "Davis Instruments",
-            "model": {model},
-            "sw_version": None,
-            "configuration_url": f"http://{self.coordinator._host}/",
-        }
+    def _resolve_conversion(self):
+        self._rain_size = self._record.get("rain_size", 1)
+        self._conversion = build_conversions(self._rain_size, metric_units(self.coordinator.hass))[self._key]
+        self._attr_native_unit_of_measurement = self._conversion.unit
+        self._attr_suggested_display_precision = self._conversion.precision
+
+    @callback
+    def _async_core_config_updated(self, _event):
+        self._resolve_conversion()
+        self.async_write_ha_state()
 
     @property
-    def native_unit_of_measurement(self):
-        if self.device_class == SensorDeviceClass.PRECIPITATION:
-            if self.hass and self.hass.config.units.length_unit == UnitOfLength.MILLIMETERS:
-                return UnitOfLength.MILLIMETERS
-            return UnitOfLength.INCHES
-        if self.device_class == SensorDeviceClass.PRECIPITATION_INTENSITY:
-            if self.hass and self.hass.config.units.length_unit == UnitOfLength.MILLIMETERS:
-                return f"{UnitOfLength.MILLIMETERS}/h"
-            return f"{UnitOfLength.INCHES}/h"
-        if self._key == "rain_size":
-            rain_size = self._data.get("rain_size", 1)
-            return calculate_rain_size_unit(rain_size)
-        return self._attr_unit
+    def native_value(self):
+        value = self.coordinator.statistics.value(self._device_id, self._key, self._minutes, self._aggregate)
+        if value is None:
+            return None
+        return self._conversion.convert(round(value, 2))
+
+    @callback
+    def _handle_coordinator_update(self):
+        if self._device_id in self.coordinator.changed_conditions:
+            self._record = self.coordinator.records.get(self._device_id, self._record)
+            if self._record.get("rain_size", 1) != self._rain_size:
+                self._resolve_conversion()
+        signature = (
+            self.native_value,
+            self.coordinator.last_update_success,
+            self.coordinator.stale,
+            self._device_id in self.coordinator.records,
+        )
+        if signature == self._written or deadband_suppressed(self, signature):
+            return
+        self._written = signature
+        self._written_at = time.monotonic()
+        self.coordinator.metrics.increment("entity_writes")
+        self.async_write_ha_state()
+
+    @property
+    def available(self):
+        return self.coordinator.last_update_success and self._device_id in self.coordinator.records
+
+    @property
+    def extra_state_attributes(self):
+        return stale_attributes(self.coordinator) or None
+
+
+class WeatherlinkDerivedSensor(CoordinatorEntity, SensorEntity):
+    """A value of an engine of the coordinator, such as feels-like or rain day."""
+
+    has_entity_name = True
+
+    def __init__(self, coordinator, engine, key, sensor_info, record, device_id):
+        super().__init__(coordinator)
+        self._engine = engine
+        self._key = key
+        self._record = record
+        self._device_id = device_id
+        self._attr_unique_id = f"{coordinator.host}_{device_id}_{key}"
+        self._attr_name = sensor_info["name"]
+        self._attr_device_class = sensor_info["device_class"]
+        self._attr_icon = sensor_info["icon"]
+        self._attr_state_class = sensor_info.get("state_class", SensorStateClass.MEASUREMENT)
+        self._attr_native_unit_of_measurement = sensor_info["unit"]
+        self._attr_suggested_display_precision = sensor_info["precision"]
+        self._deadband = coordinator.deadbands.get(self._attr_device_class)
+        self._written = None
+        self._written_at = 0.0
+
+    @property
+    def device_info(self):
+        return condition_device_info(self.coordinator, self._device_id, self._record)
 
     @property
     def native_value(self):
-        if self._key == "rain_size":
-            rain_size = self._data.get("rain_size", 1)
-            return calculate_rain_size(rain_size)
-        if self._key in self._data:
-            if self._key in rain_count_keys:
-                rain_size = self._data.get("rain_size", 1)
-                count = self._data[self._key]
-                to_mm = self.hass and self.hass.config.units.length_unit == UnitOfLength.MILLIMETERS
-                return calculate_rain_amount(count, rain_size, to_mm)
-            if self.device_class == SensorDeviceClass.TEMPERATURE:
-                return round(fahrenheit_to_celsius(self._data[self._key]), 1)
-            if self.device_class == SensorDeviceClass.TIMESTAMP:
-                value = self._data[self._key]
-                # Convert to timezone-aware datetime in UTC
-                if isinstance(value, (int, float)):
-                    return datetime.fromtimestamp(value, tz=timezone.utc)
-                if isinstance(value, str):
-                    try:
-                        dt = datetime.fromisoformat(value)
-                        if dt.tzinfo is None:
-                            dt = dt.replace(tzinfo=timezone.utc)
-                        return dt
-                    except Exception:
-                        return value
-                return value
-            return self._data[self._key]
-        return None
+        return self._engine.value(self._device_id, self._key)
 
-    async def async_update(self):
-        await self.coordinator.async_request_refresh()
+    @callback
+    def _handle_coordinator_update(self):
+        if self._device_id in self.coordinator.changed_conditions:
+            self._record = self.coordinator.records.get(self._device_id, self._record)
+        signature = (
+            self.native_value,
+            self.coordinator.last_update_success,
+            self.coordinator.stale,
+            self._device_id in self.coordinator.records,
+        )
+        if signature == self._written or deadband_suppressed(self, signature):
+            return
+        self._written = signature
+        self._written_at = time.monotonic()
+        self.coordinator.metrics.increment("entity_writes")
+        self.async_write_ha_state()
 
     @property
     def available(self):
-        return self.coordinator.last_update_success
+        return self.coordinator.last_update_success and self._device_id in self.coordinator.records
 
     @property
     def extra_state_attributes(self):
+        return stale_attributes(self.coordinator) or None
+
+
+class WeatherlinkHostSensor(CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor about the connection to the device itself."""
+
+    has_entity_name = True
+
+    def __init__(self, coordinator, key, sensor_info):
+        super().__init__(coordinator)
+        self._key = key
+        self._value = sensor_info["value"]
+        self._attr_unique_id = f"{coordinator.host}_{key}"
+        self._attr_name = sensor_info["name"]
+        self._attr_icon = sensor_info["icon"]
+        self._attr_device_class = sensor_info["device_class"]
+        self._attr_state_class = sensor_info["state_class"]
+        self._attr_native_unit_of_measurement = sensor_info["unit"]
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._written = None
+
+    @callback
+    def _handle_coordinator_update(self):
+        # Real-time packets notify listeners too, only write after a change
+        signature = (self.native_value, self.coordinator.last_update_success)
+        if signature == self._written:
+            return
+        self._written = signature
+        self.coordinator.metrics.increment("entity_writes")
+        self.async_write_ha_state()
+
+    @property
+    def device_info(self):
         return {
-            "native_unit_of_measurement": self.native_unit_of_measurement,
+            "identifiers": {(DOMAIN, self.coordinator.host)},
+            "name": f"Weatherlink {self.coordinator.host}",
+            "manufacturer": "Davis Instruments",
+            "configuration_url": f"http://{self.coordinator.host}/",
         }
 
+    @property
+    def native_value(self):
+        return self._value(self.coordinator)
+
+
+def metric_units(hass):
+    return hass is not None and hass.config.units.length_unit == UnitOfLength.MILLIMETERS
+
+
+def stale_attributes(coordinator):
+    # Only present while the device is unreachable and the last good data
+    # is being served, so normal states carry no extra attributes
+    if not coordinator.stale:
+        return {}
+    return {"stale": True, "last_good_update": coordinator.last_good_update.isoformat()}
+
+
+def condition_device_info(coordinator, device_id, record):
+    # Each condition object gets its own device
+    device_id = device_id or coordinator.host
+    data_structure_type = record.data_structure_type or 0
+    txid = record.txid or 0
+    if data_structure_type == 1:
+        name = f"ISS{txid}"
+        model = "Weatherlink Live"
+    elif data_structure_type == 3:
+        name = f"WLL Baro"
+        model = "Weatherlink Live"
+    elif data_structure_type == 4:
+        name = f"WLL Temp/Hum"
+        model = "Weatherlink Live"
+    elif data_structure_type == 6:
+        name = f"Airlink"
+        model = "Airlink"
+    else:
+        name = f"Weatherlink Device {device_id}"
+        model = "Weatherlink Live"
+
+    return {
+        "identifiers": {(DOMAIN, device_id)},
+        "name": name,
+        "manufacturer": "Davis Instruments",
+        "model": {model},
+        "sw_version": None,
+        "configuration_url": f"http://{coordinator.host}/",
+    }
+
+
+class SensorConversion(NamedTuple):
+    convert: Callable[[Any], Any]
+    unit: str | None
+    precision: int | None
+
+
+# Size of one bucket tip per rain_size code, and the unit it is given in
+RAIN_COLLECTORS = {
+    1: (0.01, UnitOfLength.INCHES),
+    2: (0.2, UnitOfLength.MILLIMETERS),
+    3: (0.1, UnitOfLength.MILLIMETERS),
+    4: (0.001, UnitOfLength.INCHES),
+}
+
+MM_PER_INCH = 25.4
+
+PM_DEVICE_CLASSES = {SensorDeviceClass.PM1, SensorDeviceClass.PM25, SensorDeviceClass.PM10}
+
+
+@lru_cache(maxsize=16)
+def build_conversions(rain_size, metric):
+    """Build the converter, unit and precision of every key in SENSOR_TYPES.
+
+    Values arrive already normalized by the record parser (°C, mm, datetimes),
+    so only the rain fields still depend on the unit system. The result is
+    cached on the rain collector size and whether Home Assistant uses metric
+    lengths and shared by all entities; nothing is re-evaluated on a state
+    write.
+    """
+    return {
+        key: _build_conversion(key, info, rain_size, metric)
+        for key, info in SENSOR_TYPES.items()
+    }
+
 
-def fahrenheit_to_celsius(f):
-    """Convert Fahrenheit to Celsius."""
-    if f is None:
+def _build_conversion(key, info, rain_size, metric):
+    device_class = info.get("device_class")
+    unit = info.get("unit")
+    precision = None
+    convert = _passthrough
+
+    if device_class == SensorDeviceClass.PRECIPITATION:
+        unit = UnitOfLength.MILLIMETERS if metric else UnitOfLength.INCHES
+        precision = 1 if metric else 2
+    elif device_class == SensorDeviceClass.PRECIPITATION_INTENSITY:
+        unit = f"{UnitOfLength.MILLIMETERS}/h" if metric else f"{UnitOfLength.INCHES}/h"
+    elif device_class in PM_DEVICE_CLASSES:
+        precision = 1
+    elif device_class in (SensorDeviceClass.PRESSURE, SensorDeviceClass.WIND_SPEED):
+        precision = 1
+
+    if key == "rain_size":
+        size = calculate_rain_size(rain_size)
+        unit = calculate_rain_size_unit(rain_size)
+        convert = lambda _value: size  # noqa: E731
+    elif key in rain_count_keys or key in rain_rate_keys:
+        # Records carry rain in mm (per hour)
+        convert = _mm_to_mm if metric else _mm_to_inches
+
+    return SensorConversion(convert, unit, precision)
+
+
+def _passthrough(value):
+    return value
+
+
+def _mm_to_mm(value):
+    if value is None:
         return None
-    return (f - 32) * 5.0 / 9.0
+    return round(value, 2)
+
+
+def _mm_to_inches(value):
+    if value is None:
+        return None
+    return round(value / MM_PER_INCH, 3)
 
 
 def calculate_rain_size(rain_size):
-    if rain_size == 1:
-        return 0.01
-    elif rain_size == 2:
-        return 0.2
-    elif rain_size == 3:
-        return 0.1
-    elif rain_size == 4:
-        return 0.001
+    return RAIN_COLLECTORS.get(rain_size, (None, None))[0]
 
 
 def calculate_rain_size_unit(rain_size):
-    if rain_size == 1:
-        return UnitOfLength.INCHES
-    elif rain_size == 2:
-        return UnitOfLength.MILLIMETERS
-    elif rain_size == 3:
-        return UnitOfLength.MILLIMETERS
-    elif rain_size == 4:
-        return UnitOfLength.INCHES
-
-
-def calculate_rain_amount(count, rain_size, to_mm):
-    """Calculate rain amount based on count, rain_size, and target unit."""
-    if to_mm:
-        if rain_size == 1:
-            return round(count * 0.254, 2)  # 0.01 inch to mm
-        elif rain_size == 2:
-            return round(count * 0.2, 2)
-        elif rain_size == 3:
-            return round(count * 0.1, 2)
-        elif rain_size == 4:
-            return round(count * 0.0254, 3)  # 0.001 inch to mm
-    else:
-        if rain_size == 1:
-            return round(count * 0.01, 3)
-        elif rain_size == 2:
-            return round(count * 0.00787, 3)  # 0.2 mm to inch
-        elif rain_size == 3:
-            return round(count * 0.00394, 3)  # 0.1 mm to inch
-        elif rain_size == 4:
-            return round(count * 0.001, 3)
-    return count
+    return RAIN_COLLECTORS.get(rain_size, (None, None))[1]
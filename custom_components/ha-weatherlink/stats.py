@@ -0,0 +1,220 @@
+"""Incremental rolling-window statistics for selected sensor fields."""
+from bisect import bisect_left, insort
+from collections import deque
+import time
+
+from .const import DEFAULT_STATISTICS_CAPACITY
+
+AGGREGATES = ("min", "max", "mean", "p95")
+
+
+def parse_windows(text):
+    """Parse a comma separated list of window lengths in minutes."""
+    windows = sorted({int(part) for part in str(text).replace(";", ",").split(",") if part.strip()})
+    if not windows or windows[0] <= 0:
+        raise ValueError("Windows must be positive whole minutes")
+    return tuple(windows)
+
+
+def window_label(minutes):
+    if minutes % 1440 == 0:
+        return f"{minutes // 1440}d"
+    if minutes % 60 == 0:
+        return f"{minutes // 60}h"
+    return f"{minutes}m"
+
+
+class RollingWindow:
+    """Min, max, mean and percentiles over the samples of the last `window` seconds.
+
+    Time is cut into buckets of `window / capacity` seconds, kept in a
+    fixed-size ring buffer with the min, max, sum and count of their samples,
+    so no sample is lost however often the window is fed. Min and max come
+    from monotonic deques over the buckets and the mean from running sums,
+    all O(1) amortized per sample. Percentiles are taken over the bucket
+    means, from a sorted copy kept up to date with bisect; that is O(n) per
+    sample, but a memmove over at most `capacity` floats.
+    """
+
+    def __init__(self, window: float, capacity: int = DEFAULT_STATISTICS_CAPACITY):
+        self.window = window
+        self._capacity = capacity
+        self._spacing = window / capacity
+        # Per bucket: number, time of the last sample, min, max, sum, count
+        self._buckets = [0] * capacity
+        self._times = [0.0] * capacity
+        self._mins = [0.0] * capacity
+        self._maxs = [0.0] * capacity
+        self._sums = [0.0] * capacity
+        self._counts = [0] * capacity
+        self._head = 0
+        self._count = 0
+        self._seq = 0
+        self._sum = 0.0
+        self._samples = 0
+        # (seq, value) pairs with increasing / decreasing values
+        self._min = deque()
+        self._max = deque()
+        self._sorted = []
+
+    def __len__(self):
+        return self._samples
+
+    def add(self, value: float, now: float | None = None):
+        if now is None:
+            now = time.monotonic()
+        self.expire(now)
+        bucket = int(now // self._spacing)
+        self._sum += value
+        self._samples += 1
+        if self._count:
+            newest = (self._head + self._count - 1) % self._capacity
+            if self._buckets[newest] == bucket:
+                self._add_to_newest(newest, value, now)
+                return
+        if self._count == self._capacity:
+            self._evict()
+
+        tail = (self._head + self._count) % self._capacity
+        self._buckets[tail] = bucket
+        self._times[tail] = now
+        self._mins[tail] = value
+        self._maxs[tail] = value
+        self._sums[tail] = value
+        self._counts[tail] = 1
+        self._count += 1
+        seq = self._seq
+        self._seq += 1
+
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((seq, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((seq, value))
+        insort(self._sorted, value)
+
+    def _add_to_newest(self, index, value, now):
+        # The newest bucket is always last in both deques, and its min only
+        # goes down and its max only up, so the deques stay monotonic
+        seq = self._seq - 1
+        self._times[index] = now
+        if value < self._mins[index]:
+            self._mins[index] = value
+            self._min.pop()
+            while self._min and self._min[-1][1] >= value:
+                self._min.pop()
+            self._min.append((seq, value))
+        if value > self._maxs[index]:
+            self._maxs[index] = value
+            self._max.pop()
+            while self._max and self._max[-1][1] <= value:
+                self._max.pop()
+            self._max.append((seq, value))
+        old_mean = self._sums[index] / self._counts[index]
+        self._sums[index] += value
+        self._counts[index] += 1
+        del self._sorted[bisect_left(self._sorted, old_mean)]
+        insort(self._sorted, self._sums[index] / self._counts[index])
+
+    def expire(self, now: float):
+        cutoff = now - self.window
+        while self._count and self._times[self._head] < cutoff:
+            self._evict()
+
+    def _evict(self):
+        head = self._head
+        # Sequence number of the bucket being evicted
+        seq = self._seq - self._count
+        self._head = (head + 1) % self._capacity
+        self._count -= 1
+        self._samples -= self._counts[head]
+
+        if self._count:
+            self._sum -= self._sums[head]
+        else:
+            # Reset instead of subtracting so float error cannot build up
+            self._sum = 0.0
+        if self._min and self._min[0][0] == seq:
+            self._min.popleft()
+        if self._max and self._max[0][0] == seq:
+            self._max.popleft()
+        del self._sorted[bisect_left(self._sorted, self._sums[head] / self._counts[head])]
+
+    @property
+    def min(self):
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self):
+        return self._max[0][1] if self._max else None
+
+    @property
+    def mean(self):
+        return self._sum / self._samples if self._samples else None
+
+    def percentile(self, q: float):
+        if not self._sorted:
+            return None
+        position = (len(self._sorted) - 1) * q / 100
+        lower = int(position)
+        upper = min(lower + 1, len(self._sorted) - 1)
+        fraction = position - lower
+        return self._sorted[lower] + (self._sorted[upper] - self._sorted[lower]) * fraction
+
+    def aggregate(self, name: str):
+        if name == "min":
+            return self.min
+        if name == "max":
+            return self.max
+        if name == "mean":
+            return self.mean
+        if name.startswith("p"):
+            return self.percentile(float(name[1:]))
+        raise ValueError(f"Unknown aggregate {name}")
+
+
+class StatisticsEngine:
+    """Rolling windows for the tracked keys of every condition.
+
+    Fed with the records of each coordinator update; only conditions that
+    reported something new add a sample.
+    """
+
+    def __init__(self, keys, windows, capacity: int = DEFAULT_STATISTICS_CAPACITY):
+        self.keys = tuple(keys)
+        # Window lengths in minutes
+        self.windows = tuple(windows)
+        self._capacity = capacity
+        self._series = {}
+
+    def series(self, cond_id, key):
+        return self._series.get((cond_id, key))
+
+    def async_update(self, records, changed, now: float | None = None):
+        if now is None:
+            now = time.monotonic()
+        for cond_id in changed:
+            record = records.get(cond_id)
+            if record is None:
+                continue
+            for key in self.keys:
+                value = record.get(key)
+                if not isinstance(value, (int, float)):
+                    continue
+                windows = self._series.get((cond_id, key))
+                if windows is None:
+                    windows = self._series[(cond_id, key)] = {
+                        minutes: RollingWindow(minutes * 60, self._capacity)
+                        for minutes in self.windows
+                    }
+                for window in windows.values():
+                    window.add(value, now)
+
+    def value(self, cond_id, key, minutes, aggregate):
+        windows = self._series.get((cond_id, key))
+        if windows is None:
+            return None
+        window = windows[minutes]
+        window.expire(time.monotonic())
+        return window.aggregate(aggregate)
@@ -0,0 +1,28 @@
+"""Shared helpers for the tests.
+
+The package __init__ needs Home Assistant. When it is not installed the
+package is registered without running it, so the modules that do not need
+Home Assistant (stats, rain, air, ...) can still be tested.
+"""
+import importlib
+import importlib.util
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1] / "custom_components"
+PACKAGE = "ha-weatherlink"
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def load(module):
+    if PACKAGE not in sys.modules:
+        try:
+            importlib.import_module(PACKAGE)
+        except ImportError:
+            spec = importlib.util.spec_from_file_location(
+                PACKAGE, ROOT / PACKAGE / "__init__.py", submodule_search_locations=[str(ROOT / PACKAGE)]
+            )
+            sys.modules[PACKAGE] = importlib.util.module_from_spec(spec)
+    return importlib.import_module(f"{PACKAGE}.{module}")
@@ -0,0 +1,158 @@
+"""NowCast, AQI breakpoints and the hourly PM buckets."""
+import pytest
+
+from common import load
+
+air = load("air")
+
+HOUR = 3600
+START = 1_700_000_000 - 1_700_000_000 % HOUR
+
+
+@pytest.mark.parametrize(
+    ("concentration", "index"),
+    [
+        (0.0, 0),
+        (9.0, 50),
+        # Truncated to one decimal, so still in the first band
+        (9.09, 50),
+        (9.1, 51),
+        (35.4, 100),
+        (35.5, 101),
+        (55.4, 150),
+        (55.5, 151),
+        (125.4, 200),
+        (125.5, 201),
+        (225.4, 300),
+        (225.5, 301),
+        (325.4, 500),
+        (600.0, 500),
+    ],
+)
+def test_us_epa_pm_2p5_breakpoints(concentration, index):
+    assert air.us_epa_index("pm_2p5", concentration) == index
+
+
+@pytest.mark.parametrize(
+    ("concentration", "index"),
+    [
+        (54, 50),
+        (54.9, 50),
+        (55, 51),
+        (154, 100),
+        (155, 101),
+        (254, 150),
+        (255, 151),
+        (354, 200),
+        (355, 201),
+        (424, 300),
+        (425, 301),
+        (604, 500),
+    ],
+)
+def test_us_epa_pm_10_breakpoints(concentration, index):
+    assert air.us_epa_index("pm_10", concentration) == index
+
+
+@pytest.mark.parametrize(
+    ("pollutant", "concentration", "index"),
+    [
+        ("pm_2p5", 0, 0),
+        ("pm_2p5", 15, 25),
+        ("pm_2p5", 30, 50),
+        ("pm_2p5", 55, 75),
+        ("pm_2p5", 110, 100),
+        # Past the grid the slope of the last band carries on
+        ("pm_2p5", 165, 125),
+        ("pm_10", 25, 25),
+        ("pm_10", 50, 50),
+        ("pm_10", 90, 75),
+        ("pm_10", 180, 100),
+    ],
+)
+def test_eu_caqi_bands(pollutant, concentration, index):
+    assert air.eu_caqi_index(pollutant, concentration) == index
+
+
+@pytest.mark.parametrize(
+    ("index", "category"),
+    [(50, "Good"), (51, "Moderate"), (100, "Moderate"), (101, "Unhealthy for Sensitive Groups"), (301, "Hazardous")],
+)
+def test_us_epa_categories(index, category):
+    assert air.category(air.US_EPA_CATEGORIES, index) == category
+
+
+def hours(*values):
+    return list(values) + [None] * (air.NOWCAST_HOURS - len(values))
+
+
+@pytest.mark.parametrize(
+    ("hourly", "expected"),
+    [
+        # Steady air: the NowCast is that value
+        (hours(*[12.0] * 12), 12.0),
+        # Weight 20/30, the missing hour drops out of both sums
+        (hours(30.0, None, 20.0), (30 + (2 / 3) ** 2 * 20) / (1 + (2 / 3) ** 2)),
+        # Current hour missing, weight 0.5 from 10/20
+        (hours(None, 10.0, 20.0), (0.5 * 10 + 0.25 * 20) / 0.75),
+        # Weight floored at 0.5
+        (hours(100.0, 10.0, 10.0), (100 + 0.5 * 10 + 0.25 * 10) / 1.75),
+        # Needs two of the three most recent hours
+        (hours(10.0, None, None, 10.0), None),
+        (hours(None, None, 10.0), None),
+    ],
+)
+def test_nowcast(hourly, expected):
+    if expected is None:
+        assert air.nowcast(hourly) is None
+    else:
+        assert air.nowcast(hourly) == pytest.approx(expected)
+
+
+def test_hourly_buckets_roll_over_and_expire():
+    buckets = air.HourlyBuckets()
+    buckets.advance(100)
+    buckets.add(10.0)
+    buckets.add(20.0)
+    buckets.advance(101)
+    buckets.add(5.0)
+    assert buckets.hourly()[:3] == [5.0, 15.0, None]
+    # Skipped hours are cleared, the old ones are still there
+    buckets.advance(105)
+    assert buckets.hourly()[:6] == [None, None, None, None, 5.0, 15.0]
+    # Once 12 hours have passed nothing is left
+    buckets.advance(117)
+    assert buckets.hourly() == [None] * air.NOWCAST_HOURS
+
+
+class AirLink(dict):
+    data_structure_type = 6
+
+
+def test_engine_us_epa():
+    engine = air.AirQualityEngine()
+    for minute in range(0, 180, 5):
+        engine.async_update({1: AirLink(pm_2p5_last=20.0, pm_10_last=40.0)}, {1}, START + minute * 60)
+    assert engine.value(1, "pm_2p5_nowcast_local") == 20.0
+    assert engine.value(1, "aqi") == air.us_epa_index("pm_2p5", 20.0)
+    assert engine.value(1, "aqi_category") == "Moderate"
+    assert engine.value(1, "aqi_pollutant") == "pm_2p5"
+
+
+def test_engine_eu_caqi_uses_current_hour():
+    engine = air.AirQualityEngine(air.STANDARD_EU_CAQI)
+    engine.async_update({1: AirLink(pm_2p5_last=30.0, pm_10=100.0)}, {1}, START)
+    # Falls back to the one minute average for PM 10
+    assert engine.value(1, "aqi") == air.eu_caqi_index("pm_10", 100.0)
+    assert engine.value(1, "aqi_pollutant") == "pm_10"
+    assert engine.value(1, "aqi_category") == "High"
+
+
+def test_engine_restore():
+    engine = air.AirQualityEngine()
+    for hour in range(3):
+        engine.async_update({1: AirLink(pm_2p5_last=10.0, pm_10_last=10.0)}, {1}, START + hour * HOUR)
+    restored = air.AirQualityEngine()
+    restored.restore(engine.as_dict())
+    restored.async_update({}, set(), START + 2 * HOUR + 60)
+    assert restored.value(1, "pm_2p5_nowcast_local") == 10.0
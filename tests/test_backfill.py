@@ -0,0 +1,49 @@
+"""Rain sums of a backfill carry on from the recorder's statistics."""
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from common import load  # noqa: E402
+
+backfill = load("backfill")
+
+HOUR = 3600
+START = 1_700_000_000 - 1_700_000_000 % HOUR
+
+
+def iss(counts):
+    # rain_size 2 is 0.2 mm per count
+    return {"lsid": 1, "data_structure_type": 1, "rain_size": 2, "rainfall_year": counts}
+
+
+def gap_samples():
+    counts = [26, 27, 27, 30, 2, 4]
+    return [(1, START + index * 1800, iss(count)) for index, count in enumerate(counts)]
+
+
+def test_gap_continues_from_last_statistic():
+    # The recorder has 5.0 mm of counter and 40.0 mm of sum before the gap
+    aggregated = backfill.aggregate_hourly(
+        gap_samples(), True, {(1, "rainfall_year"): (5.0, 40.0)}
+    )
+    _unit, has_sum, rows = aggregated[(1, "rainfall_year")]
+    assert has_sum
+    sums = [row["sum"] for row in rows]
+    assert sums[0] >= 40.0
+    assert sums == sorted(sums)
+    # 5.0 -> 6.0 mm, then a reset to 0.4 and 0.8 mm
+    assert sums[-1] == pytest.approx(40.0 + 1.0 + 0.8)
+
+
+def test_without_statistics_sums_start_at_zero():
+    _unit, _has_sum, rows = backfill.aggregate_hourly(gap_samples(), True)[(1, "rainfall_year")]
+    sums = [row["sum"] for row in rows]
+    assert sums[0] == pytest.approx(0.2)
+    assert sums == sorted(sums)
+
+
+def test_rolling_windows_have_no_sum():
+    samples = [(1, START + index * 600, {**iss(10), "rainfall_last_60_min": index}) for index in range(4)]
+    _unit, has_sum, rows = backfill.aggregate_hourly(samples, True)[(1, "rainfall_last_60_min")]
+    assert not has_sum
+    assert "sum" not in rows[0]
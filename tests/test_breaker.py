@@ -0,0 +1,104 @@
+"""Circuit breaker transitions with an injected clock, and the staleness window."""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from common import load
+
+breaker = load("breaker")
+
+
+def make(threshold=3, base=30, maximum=900):
+    # No jitter, so the backoff is exact
+    return breaker.CircuitBreaker(threshold, base, maximum, 0.0)
+
+
+def fail(circuit, times, now=0.0):
+    return [circuit.record_failure(now) for _ in range(times)]
+
+
+def test_opens_after_threshold():
+    circuit = make()
+    assert fail(circuit, 2) == [False, False]
+    assert circuit.state == breaker.CLOSED
+    assert circuit.allow_request(0)
+    assert circuit.record_failure(100) is True
+    assert circuit.state == breaker.OPEN
+    assert circuit.opened == 1
+    assert circuit.retry_in(100) == 30
+
+
+def test_open_blocks_until_backoff_then_half_opens():
+    circuit = make()
+    fail(circuit, 3, now=100)
+    assert not circuit.allow_request(129.9)
+    assert circuit.state == breaker.OPEN
+    assert circuit.allow_request(130)
+    assert circuit.state == breaker.HALF_OPEN
+    assert circuit.retry_in(130) == 0.0
+
+
+def test_half_open_success_closes():
+    circuit = make()
+    fail(circuit, 3)
+    circuit.allow_request(30)
+    assert circuit.record_success() is True
+    assert circuit.state == breaker.CLOSED
+    assert circuit.failures == 0
+    # A success while closed is not a recovery
+    assert circuit.record_success() is False
+
+
+def test_half_open_failure_reopens_with_doubled_backoff():
+    circuit = make()
+    fail(circuit, 3)
+    now = 0.0
+    expected = [60, 120, 240, 480, 900, 900]
+    for backoff in expected:
+        now = circuit.retry_at
+        assert circuit.allow_request(now)
+        assert circuit.state == breaker.HALF_OPEN
+        # Reopening is not a new opening
+        assert circuit.record_failure(now) is False
+        assert circuit.state == breaker.OPEN
+        assert circuit.retry_in(now) == backoff
+    assert circuit.opened == 1
+
+
+def test_jitter_stays_in_bounds():
+    circuit = breaker.CircuitBreaker(1, 100, 900, 0.2)
+    for _ in range(50):
+        circuit.state = breaker.CLOSED
+        circuit.failures = 0
+        circuit.record_failure(0)
+        assert 80 <= circuit.retry_in(0) <= 120
+
+
+def test_as_dict():
+    circuit = make()
+    fail(circuit, 3, now=10)
+    assert circuit.as_dict(20) == {"state": "open", "failures": 3, "opened": 1, "retry_in": 20.0}
+
+
+def test_stale_data_is_served_within_the_window_only():
+    pytest.importorskip("homeassistant")
+    from homeassistant.helpers.update_coordinator import UpdateFailed
+
+    coordinator = load("coordinator")
+    serve_stale = coordinator.WeatherlinkCoordinator._async_serve_stale
+    fake = SimpleNamespace(
+        data={"data": {}},
+        staleness_window=600,
+        _last_good_at=time.monotonic() - 300,
+        stale=False,
+        changed_conditions={1},
+    )
+    assert serve_stale(fake, "down") is fake.data
+    assert fake.stale
+    assert fake.changed_conditions == set()
+
+    fake._last_good_at = time.monotonic() - 601
+    with pytest.raises(UpdateFailed):
+        serve_stale(fake, "down")
+    assert not fake.stale
@@ -0,0 +1,88 @@
+"""Deadband suppression of small changes and the heartbeat."""
+from types import SimpleNamespace
+
+import pytest
+
+from common import load
+
+deadband = load("deadband")
+const = load("const")
+
+NOW = 10_000.0
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    monkeypatch.setattr(deadband.time, "monotonic", lambda: NOW)
+
+
+def entity(device_class, written_value, written_at=NOW - 60, heartbeat=900):
+    deadbands = deadband.parse_deadbands(const.DEFAULT_DEADBANDS)
+    return SimpleNamespace(
+        _attr_device_class=device_class,
+        _deadband=deadbands.get(device_class),
+        _written=(written_value, True, False, True),
+        _written_at=written_at,
+        coordinator=SimpleNamespace(heartbeat=heartbeat),
+    )
+
+
+def suppressed(item, value, *rest):
+    return deadband.deadband_suppressed(item, (value, *(rest or (True, False, True))))
+
+
+def test_parse_deadbands():
+    assert deadband.parse_deadbands("Temperature=0.1; humidity = 0.5") == {"temperature": 0.1, "humidity": 0.5}
+    for text in ("temperature", "=1", "temperature=-1", "temperature=x"):
+        with pytest.raises(ValueError):
+            deadband.parse_deadbands(text)
+
+
+@pytest.mark.parametrize(
+    ("device_class", "written", "value", "expected"),
+    [
+        # Below the threshold of the device class
+        ("temperature", 20.0, 20.05, True),
+        ("humidity", 50.0, 50.4, True),
+        # Exactly at the threshold is written
+        ("temperature", 20.0, 20.1, False),
+        ("humidity", 50.0, 50.5, False),
+        ("humidity", 50.0, 49.5, False),
+        # Above
+        ("temperature", 20.0, 20.3, False),
+        # Device classes without a deadband are always written
+        (None, 1.0, 1.0001, False),
+    ],
+)
+def test_thresholds(device_class, written, value, expected):
+    assert suppressed(entity(device_class, written), value) is expected
+
+
+def test_wind_direction_wraps():
+    step = deadband.parse_deadbands(const.DEFAULT_DEADBANDS)["wind_direction"]
+    assert suppressed(entity("wind_direction", 359.0), (359.0 + step / 2) % 360)
+    assert not suppressed(entity("wind_direction", 359.0), (359.0 + step) % 360)
+
+
+def test_heartbeat_forces_a_write():
+    assert suppressed(entity("temperature", 20.0, written_at=NOW - 899), 20.05)
+    assert not suppressed(entity("temperature", 20.0, written_at=NOW - 900), 20.05)
+
+
+def test_change_in_anything_else_is_written():
+    item = entity("temperature", 20.0)
+    # Availability flipped
+    assert not suppressed(item, 20.05, False, False, True)
+    # Stale flipped
+    assert not suppressed(item, 20.05, True, True, True)
+
+
+def test_nothing_written_yet():
+    item = entity("temperature", 20.0)
+    item._written = None
+    assert not suppressed(item, 20.0)
+
+
+def test_non_numeric_values_are_written():
+    assert not deadband.within_deadband("N", "NE", 1.0)
+    assert not deadband.within_deadband(None, 1.0, 1.0)
@@ -0,0 +1,103 @@
+"""Derived values against published reference values."""
+import pytest
+
+from common import load
+
+derived = load("derived")
+
+
+def test_wet_bulb_stull_example():
+    # Stull (2011): 20 °C and 50 % give 13.7 °C
+    assert derived.wet_bulb(20, 50) == pytest.approx(13.7, abs=0.05)
+
+
+@pytest.mark.parametrize(
+    ("temp", "hum", "expected"),
+    [(20, 50, 9.3), (30, 80, 26.2), (0, 100, 0.0), (-10, 60, -16.3)],
+)
+def test_dew_point(temp, hum, expected):
+    assert derived.dew_point(temp, hum) == pytest.approx(expected, abs=0.1)
+
+
+@pytest.mark.parametrize(("temp", "expected"), [(0, 6.11), (20, 23.37), (30, 42.46)])
+def test_saturation_vapour_pressure(temp, expected):
+    assert derived.saturation_vapour_pressure(temp) == pytest.approx(expected, rel=0.005)
+
+
+def test_absolute_humidity():
+    # 20 °C and 50 % hold about 8.6 g/m³
+    assert derived.absolute_humidity(20, 50) == pytest.approx(8.65, abs=0.05)
+
+
+def test_heat_index_nws_table():
+    # NWS table: 90 °F and 70 % feel like 106 °F
+    fahrenheit = derived.heat_index((90 - 32) * 5 / 9, 70) * 9 / 5 + 32
+    assert fahrenheit == pytest.approx(106, abs=0.5)
+
+
+def test_wind_chill_table():
+    # Environment Canada table: -10 °C at 30 km/h is -20
+    assert derived.wind_chill(-10, 30) == pytest.approx(-19.5, abs=0.1)
+
+
+@pytest.mark.parametrize(
+    ("temp", "hum", "wind_ms", "expected"),
+    [
+        # Mild: the temperature itself
+        (20, 50, 1, 20),
+        # Cold and windy: wind chill
+        (-10, 50, 30 / 3.6, -19.5),
+        # Cold but calm: no wind chill below 4.8 km/h
+        (-10, 50, 1, -10),
+    ],
+)
+def test_feels_like(temp, hum, wind_ms, expected):
+    assert derived.feels_like(temp, hum, wind_ms) == pytest.approx(expected, abs=0.1)
+
+
+def test_air_density_standard_atmosphere():
+    # ISA sea level: 15 °C, 1013.25 hPa, dry
+    assert derived.air_density(15, 0, 1013.25) == pytest.approx(1.225, abs=0.001)
+
+
+def test_evapotranspiration_fao56_example_19():
+    # FAO-56 example 19, 14-15 h: 38 °C, 52 %, 3.3 m/s, Rn 1.749 MJ/m²/h
+    # gives 0.63 mm/h; solar radiation chosen to give that net radiation
+    solar_rad = 1.749 / ((1 - derived.ALBEDO) * 0.0036)
+    assert derived.evapotranspiration(38, 52, 3.3, solar_rad, 1012) == pytest.approx(0.63, abs=0.01)
+
+
+def test_evapotranspiration_not_negative_at_night():
+    assert derived.evapotranspiration(10, 100, 0, 0, 1013) == 0.0
+
+
+def test_pressure_conversion():
+    assert 29.921 * derived.INHG_TO_HPA == pytest.approx(1013.25, abs=0.02)
+    assert 10 * derived.MPH_TO_MS == pytest.approx(4.4704)
+
+
+class Record(dict):
+    def __init__(self, data_structure_type, **fields):
+        super().__init__(**fields)
+        self.data_structure_type = data_structure_type
+
+
+def test_engine_recomputes_on_pressure_change():
+    engine = derived.DerivedEngine()
+    records = {
+        1: Record(derived.ISS, temp=20.0, hum=50.0, wind_speed_last=0.0, solar_rad=0),
+        2: Record(derived.BARO, bar_absolute=29.921),
+    }
+    engine.async_update(records, {1, 2})
+    assert engine.value(1, "wet_bulb_temperature") == pytest.approx(13.7)
+    density = engine.value(1, "air_density")
+    # Only the barometer changed, the ISS still gets a new density
+    records[2]["bar_absolute"] = 28.0
+    engine.async_update(records, {2})
+    assert engine.value(1, "air_density") < density
+
+
+def test_engine_skips_invalid_humidity():
+    engine = derived.DerivedEngine()
+    engine.async_update({1: Record(derived.ISS, temp=20.0, hum=0)}, {1})
+    assert engine.keys(1) == ()
@@ -0,0 +1,155 @@
+"""RainEngine fed with synthetic counter sequences."""
+from datetime import timezone
+
+import pytest
+
+from common import load
+
+rain = load("rain")
+const = load("const")
+
+# 2023-11-14 00:00 UTC
+MIDNIGHT = 1_699_920_000
+TIP = 0.2
+
+
+class Record(dict):
+    data_structure_type = 1
+
+
+def feed(engine, steps, counter_key="rainfall_year", start=MIDNIGHT + 6 * 3600):
+    """Feed (seconds after start, counter in mm) steps, return the engine."""
+    record = Record(rain_size=2)
+    for offset, counter in steps:
+        record[counter_key] = counter
+        engine.async_update({1: record}, {1}, start + offset)
+    return engine
+
+
+def engine(windows=(1, 3), day_start=0):
+    return rain.RainEngine(windows, day_start, timezone.utc)
+
+
+@pytest.mark.parametrize(
+    ("steps", "expected"),
+    [
+        # The first counter only sets the baseline
+        ([(0, 10.0)], 0.0),
+        ([(0, 10.0), (60, 10.2), (120, 10.6)], 0.6),
+        # A counter that goes down was reset, its value is the rain since
+        ([(0, 10.0), (60, 10.4), (120, 0.2), (180, 0.4)], 0.8),
+        # A reset to zero adds nothing
+        ([(0, 10.0), (60, 0.0), (120, 0.2)], 0.2),
+    ],
+)
+def test_counter_deltas_and_resets(steps, expected):
+    assert feed(engine(), steps).value(1, "rain_day") == pytest.approx(expected)
+
+
+def test_switching_counter_takes_a_new_baseline():
+    result = engine()
+    feed(result, [(0, 10.0), (60, 10.2)])
+    feed(result, [(120, 3.0)], counter_key="rainfall_monthly")
+    # Only the first delta; the switch to another counter adds nothing
+    assert result.value(1, "rain_day") == pytest.approx(0.2)
+
+
+@pytest.mark.parametrize(
+    ("day_start", "hours", "expected"),
+    [
+        # Rain at 06:00 and 10:00; day from midnight keeps both
+        (0, (6, 10), 0.4),
+        # A 09:00 rain day only keeps the rain after 09:00
+        (9, (6, 10), 0.2),
+    ],
+)
+def test_rain_day_rollover(day_start, hours, expected):
+    result = engine(day_start=day_start)
+    steps = [(0, 10.0)]
+    counter = 10.0
+    for hour in hours:
+        counter += TIP
+        steps.append(((hour - 6) * 3600 + 60, counter))
+    feed(result, steps)
+    assert result.value(1, "rain_day") == pytest.approx(expected)
+
+
+def test_rain_day_resets_without_new_reports():
+    result = feed(engine(), [(0, 10.0), (60, 10.2)])
+    result.async_update({}, set(), MIDNIGHT + 86400 + 60)
+    assert result.value(1, "rain_day") == 0.0
+
+
+def test_rolling_windows():
+    result = feed(engine(windows=(1, 3)), [(0, 10.0), (60, 10.2), (3600, 10.4), (7200, 10.6)])
+    assert result.value(1, "rain_last_1h") == pytest.approx(0.2)
+    assert result.value(1, "rain_last_3h") == pytest.approx(0.6)
+    result.async_update({}, set(), MIDNIGHT + 6 * 3600 + 4 * 3600)
+    assert result.value(1, "rain_last_1h") == 0.0
+    assert result.value(1, "rain_last_3h") == pytest.approx(0.2)
+
+
+def test_events_split_on_dry_gap():
+    gap = const.RAIN_EVENT_DRY_GAP
+    result = feed(engine(), [(0, 10.0), (60, 10.2), (120, 10.4)])
+    assert result.value(1, "rain_event") == pytest.approx(0.4)
+    start = result.value(1, "rain_event_start")
+    assert start.timestamp() == MIDNIGHT + 6 * 3600 + 60
+
+    # Still the same event just before the gap ends
+    feed(result, [(120 + gap - 60, 10.6)])
+    assert result.value(1, "rain_event") == pytest.approx(0.6)
+
+    # Over the gap without a tip the event ends
+    result.async_update({}, set(), MIDNIGHT + 6 * 3600 + 3 * gap)
+    assert result.value(1, "rain_event") == 0.0
+    assert result.value(1, "rain_event_start") is None
+
+    # The next tip starts a new event
+    feed(result, [(3 * gap + 60, 10.8)])
+    assert result.value(1, "rain_event") == pytest.approx(0.2)
+
+
+@pytest.mark.parametrize(
+    ("steps", "expected"),
+    [
+        # First tip after a dry spell counts over the whole timeout
+        ([(0, 10.0), (30, 10.2)], TIP / const.RAIN_RATE_TIMEOUT * 3600),
+        # Next tips over the time since the previous tip
+        ([(0, 10.0), (30, 10.2), (90, 10.4)], TIP / 60 * 3600),
+        ([(0, 10.0), (30, 10.2), (60, 10.6)], 2 * TIP / 30 * 3600),
+        # Tips further apart than the timeout count over the timeout
+        ([(0, 10.0), (30, 10.2), (1830, 10.4)], TIP / const.RAIN_RATE_TIMEOUT * 3600),
+    ],
+)
+def test_rate_from_tip_intervals(steps, expected):
+    assert feed(engine(), steps).value(1, "rain_rate_local") == pytest.approx(expected, abs=0.01)
+
+
+def test_rate_decays_and_drops_to_zero():
+    result = feed(engine(), [(0, 10.0), (30, 10.2), (60, 10.4)])
+    assert result.value(1, "rain_rate_local") == pytest.approx(24.0)
+    # No tip for 120 s: at most one tip over that time
+    feed(result, [(180, 10.4)])
+    assert result.value(1, "rain_rate_local") == pytest.approx(TIP / 120 * 3600)
+    feed(result, [(60 + const.RAIN_RATE_TIMEOUT, 10.4)])
+    assert result.value(1, "rain_rate_local") == 0.0
+
+
+def test_restore_keeps_totals_and_takes_a_new_baseline():
+    result = feed(engine(), [(0, 10.0), (60, 10.2), (120, 10.4)])
+    restored = engine()
+    restored.restore(result.as_dict())
+    feed(restored, [(180, 12.0), (240, 12.2)])
+    # The jump while down is not counted, the tip after it is
+    assert restored.value(1, "rain_day") == pytest.approx(0.6)
+    assert restored.value(1, "rain_last_1h") == pytest.approx(0.6)
+
+
+def test_other_conditions_are_ignored():
+    class Baro(dict):
+        data_structure_type = 3
+
+    result = engine()
+    result.async_update({2: Baro(rainfall_year=1.0)}, {2}, MIDNIGHT)
+    assert result.keys(2) == ()
@@ -0,0 +1,58 @@
+"""Poll interval while real-time is enabled but the UDP stream is down."""
+from datetime import timedelta
+import importlib
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom_components"))
+adaptive = importlib.import_module("ha-weatherlink.adaptive")
+coordinator = importlib.import_module("ha-weatherlink.coordinator")
+const = importlib.import_module("ha-weatherlink.const")
+
+
+def make_coordinator(interval):
+    polls = []
+    fake = SimpleNamespace(
+        _host="192.0.2.1",
+        _realtime_streaming=False,
+        adaptive=adaptive.AdaptivePollInterval(10, 600),
+        conditions={1: {"lsid": 1, "ts": 100}},
+        poll_interval=timedelta(seconds=interval),
+        polls=polls,
+    )
+    fake.adaptive.interval = interval
+    # Nothing new since the last poll, so the adaptive interval backs off
+    fake.adaptive._report_times = {1: 100}
+    fake.async_set_poll_interval = lambda value: setattr(fake, "poll_interval", value)
+    fake.async_poll_soon = lambda: polls.append(True)
+    return fake
+
+
+def set_healthy(fake, healthy):
+    coordinator.WeatherlinkCoordinator.async_set_realtime_healthy(fake, healthy)
+
+
+def test_watchdog_ticks_keep_adaptive_interval():
+    fake = make_coordinator(120)
+    # Stream never came up: every watchdog tick reports it down
+    for _ in range(10):
+        set_healthy(fake, False)
+    assert fake.poll_interval == timedelta(seconds=120)
+    assert fake.polls == []
+
+
+def test_stream_loss_falls_back_to_adaptive_interval():
+    fake = make_coordinator(120)
+    set_healthy(fake, True)
+    assert fake.poll_interval == timedelta(seconds=const.REALTIME_POLL_INTERVAL)
+
+    set_healthy(fake, False)
+    set_healthy(fake, False)
+    assert fake.poll_interval != timedelta(seconds=const.DEFAULT_UPDATE_INTERVAL)
+    assert fake.poll_interval == timedelta(seconds=fake.adaptive.interval)
+    assert len(fake.polls) == 1
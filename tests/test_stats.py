@@ -0,0 +1,95 @@
+"""Rolling window statistics against a brute force reference."""
+import random
+import statistics
+
+import pytest
+
+from common import load
+
+stats = load("stats")
+
+
+def reference(samples, now, window):
+    return [value for at, value in samples if at >= now - window]
+
+
+def test_polls_closer_than_the_spacing_are_kept():
+    window = stats.RollingWindow(24 * 3600, 2880)
+    # 29.9 s apart, just under the 30 s bucket spacing
+    values = [10.0, 2.0, 7.0, 30.0, 5.0]
+    for index, value in enumerate(values):
+        window.add(value, 1_000_000 + index * 29.9)
+    assert len(window) == len(values)
+    assert window.min == 2.0
+    assert window.max == 30.0
+    assert window.mean == pytest.approx(statistics.fmean(values))
+
+
+def test_expiry():
+    window = stats.RollingWindow(300, 10)
+    window.add(1.0, 0)
+    window.add(100.0, 60)
+    window.add(5.0, 120)
+    window.expire(361)
+    assert window.min == 5.0
+    assert window.max == 5.0
+    assert window.mean == 5.0
+    window.expire(1000)
+    assert len(window) == 0
+    assert window.min is None
+    assert window.mean is None
+    assert window.percentile(95) is None
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_brute_force_across_ring_wrap(seed):
+    rng = random.Random(seed)
+    window = stats.RollingWindow(600, 20)
+    samples = []
+    now = 0.0
+    # Many times the capacity, so the ring wraps over and over
+    for _ in range(500):
+        now += rng.uniform(5, 60)
+        value = rng.uniform(-20, 40)
+        samples.append((now, value))
+        window.add(value, now)
+        inside = reference(samples, now, 600)
+        # Buckets expire by their last sample, at most one spacing late
+        kept = reference(samples, now, 600 + 30)
+        assert min(kept) <= window.min <= min(inside)
+        assert max(inside) <= window.max <= max(kept)
+        assert min(kept) <= window.mean <= max(kept)
+
+
+def test_percentile():
+    window = stats.RollingWindow(3600, 3600)
+    for index in range(101):
+        window.add(float(index), index * 2)
+    assert window.percentile(0) == 0.0
+    assert window.percentile(50) == 50.0
+    assert window.percentile(95) == pytest.approx(95.0)
+    assert window.percentile(100) == 100.0
+    assert window.aggregate("p95") == pytest.approx(95.0)
+
+
+def test_percentile_uses_bucket_means():
+    window = stats.RollingWindow(100, 10)
+    # Both in the same 10 s bucket
+    window.add(2.0, 1)
+    window.add(4.0, 2)
+    window.add(10.0, 15)
+    assert window.percentile(0) == 3.0
+    assert window.percentile(100) == 10.0
+    assert window.min == 2.0
+
+
+def test_engine_tracks_changed_conditions_only():
+    engine = stats.StatisticsEngine(("temp",), (5,))
+
+    class Record(dict):
+        pass
+
+    records = {1: Record(temp=20.0), 2: Record(temp=5.0)}
+    engine.async_update(records, {1}, now=0)
+    assert engine.series(1, "temp") is not None
+    assert engine.series(2, "temp") is None